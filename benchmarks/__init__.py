@@ -0,0 +1 @@
+"""Benchmarks for comeit. Run them with `python -m benchmarks` from the repository root."""
@@ -0,0 +1,244 @@
+"""Run the benchmarks and compare them against the stored baselines.
+
+Usage:
+    python -m benchmarks [--quick] [--only NAME ...] [--save] [--tolerance 0.25]
+
+Every benchmark reports the best time of several repeats, which is the least noisy estimate of
+what the code costs. A benchmark that is slower than its baseline by more than the tolerance is
+reported as a regression and makes the run exit with 1. Baselines are only comparable on the
+machine they were recorded on, so record them again with `--save` after switching machines.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from comeit import Component, Rule, RuleCreator, RuleLoader, RuleManager, parse_commit_message
+from comeit.__main__ import create_commit_types
+from comeit.checks.body import Body
+from comeit.checks.footer import Footer
+from comeit.checks.header import Header
+
+from . import corpus
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINES = Path(__file__).with_name("baselines.json")
+
+HISTORY_COMMITS = 100_000
+QUICK_HISTORY_COMMITS = 5_000
+LARGE_RULE_SET = 1_000
+
+
+def measure(func: Callable[[], object], repeat: int = 5, number: int = 1) -> float:
+    """Return the best time in seconds of `repeat` runs of `number` calls to `func`, per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _env(cache_dir: str) -> dict[str, str]:
+    # Run the working tree rather than an installed version, with its own rule cache
+    return dict(os.environ, PYTHONPATH=str(ROOT), XDG_CACHE_HOME=cache_dir)
+
+
+def bench_parse(quick: bool) -> dict[str, float]:
+    rng = random.Random(0)
+    small = corpus.small_message(rng)
+    large = corpus.large_message(rng)
+    results = {
+        "parse.small": measure(lambda: parse_commit_message(small), number=10_000),
+        "parse.large": measure(lambda: parse_commit_message(large), number=1_000),
+    }
+    for name, message in corpus.pathological_messages(2_000 if quick else 20_000).items():
+        results[f"parse.pathological.{name}"] = measure(
+            lambda message=message: parse_commit_message(message).trailers, number=10
+        )
+    return results
+
+
+def _default_rule_manager() -> RuleManager:
+    header = Header(types=create_commit_types(), max_length=52)
+    rule_creator = RuleCreator(
+        rule_configs=RuleLoader().load_rules(), header=header, body=Body(), footer=Footer()
+    )
+    return RuleManager(rule_creator.create_rules())
+
+
+def _large_rule_manager(size: int) -> RuleManager:
+    """A synthetic rule set cycling through the header checks, where most rules depend on two."""
+    header = Header(types=create_commit_types(), max_length=52)
+    checks = [
+        header.length,
+        header.has_type,
+        header.type_empty,
+        header.type_in_type_set,
+        header.type_case,
+        header.scope_chars,
+        header.has_summary,
+        header.summary_case,
+    ]
+    rules = {}
+    for index in range(size):
+        check = checks[index % len(checks)]
+        rule_id = f"{index:04d}"
+        rules[rule_id] = Rule(
+            id=rule_id,
+            description=check.__name__,
+            check=check,
+            component=Component.HEADER,
+            dependencies=sorted({f"{(index - 1) // 2:04d}", f"{(index - 1) // 3:04d}"})
+            if index
+            else None,
+            check_many=getattr(header, f"{check.__name__}_many", None),
+        )
+    return RuleManager(rules)
+
+
+def bench_rules(quick: bool) -> dict[str, float]:
+    commit_msgs = [parse_commit_message(m) for m in corpus.generate_messages(512, seed=1)]
+    default = _default_rule_manager()
+    large = _large_rule_manager(LARGE_RULE_SET)
+
+    def apply_each(rule_manager):
+        for commit_msg in commit_msgs:
+            rule_manager.apply_rules(commit_msg)
+
+    return {
+        "rules.default": measure(lambda: apply_each(default)) / len(commit_msgs),
+        "rules.default.batch": measure(lambda: default.apply_rules_many(commit_msgs))
+        / len(commit_msgs),
+        "rules.large": measure(lambda: apply_each(large), repeat=3) / len(commit_msgs),
+        "rules.large.batch": measure(lambda: large.apply_rules_many(commit_msgs), repeat=3)
+        / len(commit_msgs),
+    }
+
+
+def bench_startup(quick: bool) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = _env(cache_dir)
+
+        def run(*args):
+            subprocess.run(
+                [sys.executable, *args], cwd=cache_dir, env=env, capture_output=True, check=False
+            )
+
+        run("-m", "comeit", "--format", "plain")  # Precompiles the default rules
+        return {
+            "startup.import": measure(lambda: run("-c", "import comeit"), repeat=10),
+            "startup.cli": measure(lambda: run("-m", "comeit", "--format", "plain"), repeat=10),
+        }
+
+
+def bench_history(quick: bool) -> dict[str, float]:
+    commits = QUICK_HISTORY_COMMITS if quick else HISTORY_COMMITS
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = corpus.create_repository(Path(tmp) / "repo", commits)
+        env = _env(tmp)
+
+        def lint(*args):
+            subprocess.run(
+                [sys.executable, "-m", "comeit", "--all", "--format", "plain", *args],
+                cwd=repo,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                check=False,
+            )
+
+        return {
+            "history.lint": measure(lint, repeat=3) / commits,
+            "history.lint.jobs4": measure(lambda: lint("--jobs", "4"), repeat=3) / commits,
+            "history.lint.python_reader": measure(lambda: lint("--reader", "python"), repeat=3)
+            / commits,
+        }
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "rules": bench_rules,
+    "startup": bench_startup,
+    "history": bench_history,
+}
+
+
+def _machine() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+    }
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in [("s", 1), ("ms", 1e-3), ("us", 1e-6)]:
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Use smaller inputs, e.g. to check nothing is broken."
+    )
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Run only these groups.")
+    parser.add_argument("--save", action="store_true", help="Store the results as the baselines.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The slowdown relative to the baseline reported as a regression. Defaults to 0.25.",
+    )
+    args = parser.parse_args(argv)
+
+    # Quick and full runs measure different inputs, so each has its own baselines
+    mode = "quick" if args.quick else "full"
+    stored = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    baselines = stored.get("results", {}).get(mode, {})
+
+    results = {}
+    regressions = []
+    for group in args.only or BENCHMARKS:
+        for name, seconds in BENCHMARKS[group](args.quick).items():
+            results[name] = seconds
+            change = ""
+            if name in baselines:
+                ratio = seconds / baselines[name]
+                change = f"{ratio - 1:+7.1%}"
+                if ratio > 1 + args.tolerance:
+                    change += "  REGRESSION"
+                    regressions.append(name)
+            print(f"{name:40} {_format_time(seconds)}  {change}", flush=True)
+
+    if args.save:
+        # Baselines of another machine are replaced rather than mixed with the new ones
+        if stored.get("machine") != _machine():
+            stored = {"machine": _machine(), "results": {}}
+        stored["results"][mode] = {**stored["results"].get(mode, {}), **results}
+        BASELINES.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baselines to {BASELINES}")
+    elif baselines and stored.get("machine") != _machine():
+        print("The baselines were recorded on a different machine. Compare with care.")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
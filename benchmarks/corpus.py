@@ -0,0 +1,125 @@
+"""A deterministic generator of commit messages and repositories to benchmark against.
+
+Every function takes a seed, so the same arguments always produce the same corpus and results
+from different runs and machines measure the same work.
+"""
+
+import random
+import subprocess
+from pathlib import Path
+
+TYPES = ["feat", "fix", "docs", "style", "refactor", "perf", "test", "build", "ci", "chore"]
+SCOPES = ["core", "cli", "parser", "rules", "git", "cache", "docs", "api"]
+WORDS = (
+    "add remove update fix handle support allow prevent improve rename move split merge parse "
+    "lint check rule commit message header body footer scope type cache history option value "
+    "error warning config file path branch range test case edge empty long short new old"
+).split()
+TRAILERS = ["Refs", "Reviewed-by", "Acked-by", "Signed-off-by", "Closes"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def header(rng: random.Random) -> str:
+    """A conventional commit header, with a scope and breaking marker now and then."""
+    type = rng.choice(TYPES)
+    scope = f"({rng.choice(SCOPES)})" if rng.random() < 0.5 else ""
+    breaking = "!" if rng.random() < 0.05 else ""
+    return f"{type}{scope}{breaking}: {_sentence(rng, rng.randint(3, 7))}"
+
+
+def small_message(rng: random.Random) -> str:
+    """A header followed by a short body, the most common shape of a commit message."""
+    body = "\n".join(_sentence(rng, 12) for _ in range(rng.randint(0, 3)))
+    return f"{header(rng)}\n\n{body}" if body else header(rng)
+
+
+def large_message(rng: random.Random, paragraphs: int = 40) -> str:
+    """A header with a long body of many paragraphs and a footer of several trailers."""
+    body = "\n\n".join(
+        "\n".join(_sentence(rng, 12) for _ in range(rng.randint(2, 6))) for _ in range(paragraphs)
+    )
+    footer = "\n".join(
+        f"{rng.choice(TRAILERS)}: {_sentence(rng, 2)} #{rng.randint(1, 9999)}" for _ in range(5)
+    )
+    return f"{header(rng)}\n\n{body}\n\n{footer}"
+
+
+def pathological_messages(lines: int = 20_000) -> dict[str, str]:
+    """Messages shaped to hit the worst case of the parser rather than to look realistic.
+
+    Args:
+        lines (int): The number of lines of the multi-line messages. Defaults to 20000.
+
+    Returns:
+        dict[str, str]: Each message keyed by a short name of its shape.
+    """
+    return {
+        # Every line starts like a trailer token but never completes one
+        "near_footers": "feat: x\n\n" + "\n".join(f"Token-{i}:" for i in range(lines)),
+        # A single header line far longer than any limit
+        "long_header": "feat: " + "a" * (lines * 10),
+        # Every line is a trailer, so the footer starts right after the header
+        "all_footers": "feat: x\n\n" + "\n".join(f"Refs: #{i}" for i in range(lines)),
+        # Nothing but empty lines after the header
+        "blank_lines": "feat: x" + "\n" * lines,
+    }
+
+
+def generate_messages(count: int, seed: int = 0) -> list[str]:
+    """Generate a mix of commit messages resembling a real history.
+
+    Most messages are small, some are large and a few do not follow conventional commits at all,
+    so failing rules are part of what is measured.
+
+    Args:
+        count (int): The number of messages.
+        seed (int): The seed of the generator. Defaults to 0.
+
+    Returns:
+        list[str]: The messages.
+    """
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        shape = rng.random()
+        if shape < 0.85:
+            messages.append(small_message(rng))
+        elif shape < 0.95:
+            messages.append(large_message(rng, paragraphs=rng.randint(2, 8)))
+        else:
+            messages.append(_sentence(rng, rng.randint(3, 9)).capitalize())
+    return messages
+
+
+def create_repository(path: Path, count: int, seed: int = 0) -> Path:
+    """Create a git repository with a linear history of generated commit messages.
+
+    The commits are written with `git fast-import`, which creates 100k commits in seconds. They
+    touch no files and have fixed authors and dates, so the commit hashes are deterministic too.
+
+    Args:
+        path (Path): The directory to create the repository in.
+        count (int): The number of commits.
+        seed (int): The seed of the message generator. Defaults to 0.
+
+    Returns:
+        Path: The path of the repository.
+    """
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+
+    stream = []
+    for mark, message in enumerate(generate_messages(count, seed), start=1):
+        data = message.encode()
+        stream.append(
+            b"commit refs/heads/main\n"
+            + f"mark :{mark}\n".encode()
+            + f"committer comeit <comeit@example.com> {1_700_000_000 + mark} +0000\n".encode()
+            + f"data {len(data)}\n".encode()
+            + data
+            + b"\n"
+        )
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=path, input=b"".join(stream), check=True)
+    return path
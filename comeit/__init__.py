@@ -1,26 +1,85 @@
-from .checks.body import Body
-from .checks.footer import Footer
-from .checks.header import Header
-from .commit_message import parse_commit_message
-from .logger import LogLevel, configure_logger
-from .rules.rule import Component, Rule, Severity
-from .rules.rule_creator import RuleCreator
-from .rules.rule_loader import RuleConfig, RuleLoader
-from .rules.rule_manager import RuleManager
+"""Lint git commit messages in a Conventional Commits manner.
+
+The public names are imported lazily on first access, so importing the package, or a single
+module of it like `comeit.client`, does not load the rule machinery or its dependencies.
+"""
+
+import importlib
+
+# Same as typing.TYPE_CHECKING, without paying for importing typing at startup
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .checks.body import Body
+    from .checks.footer import Footer
+    from .checks.header import Header
+    from .commit_message import ParsedCommit, parse_commit_message
+    from .lint_result import LintResult
+    from .linter import Linter
+    from .logger import LogLevel, configure_logger
+    from .rules.rule import Component, Rule, Severity
+    from .rules.rule_creator import RuleCreator
+    from .rules.rule_loader import RuleConfig, RuleLoader
+    from .rules.rule_manager import DependencyPolicy, RuleManager, RuleResult, RuleResults
+    from .rules.rule_profile import RuleProfile
+
+# Public name -> module that defines it
+_LAZY_ATTRIBUTES = {
+    "RuleLoader": ".rules.rule_loader",
+    "RuleConfig": ".rules.rule_loader",
+    "RuleCreator": ".rules.rule_creator",
+    "RuleManager": ".rules.rule_manager",
+    "RuleResult": ".rules.rule_manager",
+    "RuleResults": ".rules.rule_manager",
+    "DependencyPolicy": ".rules.rule_manager",
+    "RuleProfile": ".rules.rule_profile",
+    "Linter": ".linter",
+    "LintResult": ".lint_result",
+    "Severity": ".rules.rule",
+    "Header": ".checks.header",
+    "Body": ".checks.body",
+    "Footer": ".checks.footer",
+    "Rule": ".rules.rule",
+    "Component": ".rules.rule",
+    "LogLevel": ".logger",
+    "configure_logger": ".logger",
+    "parse_commit_message": ".commit_message",
+    "ParsedCommit": ".commit_message",
+}
 
 __all__ = [
-    RuleLoader.__name__,
-    RuleConfig.__name__,
-    RuleCreator.__name__,
-    RuleManager.__name__,
-    Severity.__name__,
-    Header.__name__,
-    Body.__name__,
-    Footer.__name__,
-    Rule.__name__,
-    Component.__name__,
-    Severity.__name__,
-    LogLevel.__name__,
-    configure_logger.__name__,
-    parse_commit_message.__name__,
+    "RuleLoader",
+    "RuleConfig",
+    "RuleCreator",
+    "RuleManager",
+    "RuleResult",
+    "RuleResults",
+    "DependencyPolicy",
+    "RuleProfile",
+    "Linter",
+    "LintResult",
+    "Severity",
+    "Header",
+    "Body",
+    "Footer",
+    "Rule",
+    "Component",
+    "LogLevel",
+    "configure_logger",
+    "parse_commit_message",
+    "ParsedCommit",
 ]
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups no longer go through __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
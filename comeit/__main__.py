@@ -1,63 +1,60 @@
-import logging
-from pathlib import Path
-
-from rich.console import Console
-from rich.table import Table
-
-from comeit import (
-    Body,
-    Footer,
-    Header,
-    Rule,
-    RuleConfig,
-    RuleCreator,
-    RuleLoader,
-    RuleManager,
-    configure_logger,
-)
-from comeit.parse_args import parse_args
+import time
 
-logger = logging.getLogger("comeit")
-
-CONVENTIONAL_TYPES = set(["feat", "fix"])
-DEFAULT_TYPES = set(["build", "chore", "ci", "docs", "perf", "refactor", "revert", "style", "test"])
-MAX_HEADER_LENGTH = 52  # Make this a config later
-MAX_BODY_LENGTH = 70  # Make this a config later
-MAX_FOOTER_LENGTH = 52  # Make this a config later
+_START = time.perf_counter()  # Lets --trace show the imports of this module as a span
 
+import logging  # noqa: E402
+import sys  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import TYPE_CHECKING  # noqa: E402
 
-def init_rules(
-    types: set[str], commit_msg: tuple[str, str, str], user_rules_yml: Path = None
-) -> dict[str, Rule]:
-    # Init check classes
-    header = Header(types=types, max_length=MAX_HEADER_LENGTH, commit_msg=commit_msg[0])  # FINISH
-    body = Body()
-    footer = Footer()
+from comeit import configure_logger, trace  # noqa: E402
+from comeit.parse_args import parse_args  # noqa: E402
 
-    # Load rules from yaml config
-    rule_loader = RuleLoader(user_rules_yml=user_rules_yml)
-    loaded_rules: list[RuleConfig] = rule_loader.load_rules()
+_IMPORTED = time.perf_counter()
 
-    # Create rule objects
-    rule_creator = RuleCreator(rule_configs=loaded_rules, header=header, body=body, footer=footer)
-    rules: dict[str, Rule] = rule_creator.create_rules()
+# Everything else is imported where it is first needed. Which subsystems are used depends on the
+# arguments, and importing all of them up front would dominate the runtime of short invocations.
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
 
-    return rules
+    from comeit import Linter
+    from comeit.git import GitCommit
+    from comeit.lint_result import LintOutcome
+    from comeit.output import AggregateReport, Report
+    from comeit.parse_args import ConfigArgs
 
+logger = logging.getLogger("comeit")
 
-def parse_commit_message(commit_message: str):
-    lines = commit_message.strip().split("\n")
-    header = lines[0] if lines else ""
-    body = ""
-    footer = ""
+CONVENTIONAL_TYPES = set(["feat", "fix"])
+DEFAULT_TYPES = set(["build", "chore", "ci", "docs", "perf", "refactor", "revert", "style", "test"])
+MAX_HEADER_LENGTH = 52  # Make this a config later
+MAX_BODY_LENGTH = 70  # Make this a config later
+MAX_FOOTER_LENGTH = 52  # Make this a config later
 
-    if len(lines) > 1:
-        remaining = "\n".join(lines[1:])
-        parts = remaining.split("\n\n", 1)
-        body = parts[0].strip() if len(parts) > 0 else ""
-        footer = parts[1].strip() if len(parts) > 1 else ""
 
-    return header, body, footer
+def linter_kwargs(
+    types: set[str],
+    user_rules_yml: Path = None,
+    cache_path: Path = None,
+    cache_size: int = None,
+    profile: bool = False,
+    dependency_policy: str = None,
+    rule_threads: int = 1,
+) -> dict:
+    kwargs = dict(types=types, max_header_length=MAX_HEADER_LENGTH, user_rules_yml=user_rules_yml)
+    if dependency_policy:
+        from comeit import DependencyPolicy
+
+        kwargs.update(dependency_policy=DependencyPolicy(dependency_policy))
+    if cache_path:
+        kwargs.update(cache_path=cache_path)
+    if cache_size:
+        kwargs.update(cache_size=cache_size)
+    if profile:
+        kwargs.update(profile=True)
+    if rule_threads > 1:
+        kwargs.update(threads=rule_threads)
+    return kwargs
 
 
 def create_commit_types(extra_types: list[str] = None, custom_types: list[str] = None) -> set[str]:
@@ -90,72 +87,485 @@ def commit_parser():
     """Parse out header, body and footer."""
 
 
+def lint_history(
+    linter: "Linter",
+    report: "Report",
+    revisions: list[str],
+    all_refs: bool,
+    jobs: int = 1,
+    linter_kwargs: dict = None,
+    reader: str = "git",
+    shard: tuple[int, int] | None = None,
+    partial: Path | None = None,
+) -> int:
+    """Lint every commit of a revision range as it is streamed out of git.
+
+    With more than one job, the commits are linted in a process pool where every worker builds
+    its own linter from `linter_kwargs`. Only commits with failing rules are printed, followed by
+    a one line summary. With the "python" reader, the commits are read from the object files of
+    the repository instead of a `git log` process.
+
+    With a `shard` (index, count), only the commits of that part of the history are linted, and
+    their results are also written to the `partial` file for `lint_merge`, if given.
+
+    Returns:
+        int: 1 if any commit failed a rule with severity ERROR, otherwise 0.
+    """
+    if reader == "python":
+        from comeit.git_objects import iter_commits
+    else:
+        from comeit.git import iter_commits
+
+    commits = iter_commits(revisions=revisions, all_refs=all_refs)
+    writer = None
+    if shard:
+        from collections import deque
+
+        from comeit.shard import PartialHeader, PartialWriter, Shard, iter_shard
+
+        shard = Shard(*shard)
+        logger.info("Linting shard %s of the history", shard)
+        positions = deque()
+        commits = iter_shard(commits, shard, positions)
+        if partial:
+            header = PartialHeader(shard, linter.fingerprint, revisions, all_refs)
+            try:
+                writer = PartialWriter(partial, header)
+            except OSError as e:
+                logger.error(f"Cannot write the partial results to '{partial}'. {e}")
+                return 1
+
+    checked = failed = 0
+    try:
+        for commit, outcome in _lint_commits(linter, commits, jobs, linter_kwargs):
+            checked += 1
+            failed += isinstance(outcome, ValueError) or outcome.has_errors
+            report.commit(commit, outcome)
+            if writer:
+                writer.commit(positions.popleft(), commit, outcome)
+        if writer:
+            writer.summary(checked, failed)
+    finally:
+        if writer:
+            writer.close()
+        # Also when git fails midway, so the jsonl summary is written and the sarif log closed
+        report.summary(checked, failed)
+
+    return 1 if failed else 0
+
+
+def lint_merge(report: "Report", partials: list[Path], fingerprint: str) -> int:
+    """Report the partial results of every shard of a run as a single unsharded run.
+
+    The commits are reported in the order of an unsharded run, followed by the summary, so the
+    report and the exit code are the same as if the history was linted in one go.
+
+    Returns:
+        int: 1 if any commit failed a rule with severity ERROR, or the partial results cannot
+            be merged, otherwise 0.
+    """
+    from comeit.shard import MergedShards, PartialError
+
+    try:
+        merged = MergedShards(partials, fingerprint)
+    except PartialError as e:
+        logger.error(f"Cannot merge the shards. {e}")
+        return 1
+
+    checked = failed = 0
+    try:
+        for commit, outcome in merged:
+            checked += 1
+            failed += isinstance(outcome, ValueError) or outcome.has_errors
+            report.commit(commit, outcome)
+        merged.check_complete(checked)
+    except PartialError as e:
+        logger.error(f"Cannot merge the shards. {e}")
+        return 1
+    finally:
+        merged.close()
+        report.summary(checked, failed)
+
+    return 1 if failed else 0
+
+
+def lint_pre_receive(
+    linter: "Linter",
+    report: "Report",
+    ref_updates: "Iterable[str]",
+    jobs: int = 1,
+    linter_kwargs: dict = None,
+    max_commits: int | None = None,
+    timeout: float | None = None,
+) -> int:
+    """Lint the commits a push adds, as a git pre-receive hook.
+
+    The `<old> <new> <ref>` lines of all refs are turned into a single `git log` walk, which
+    reads each new commit once however many refs it is pushed to. The commits are streamed and
+    linted in batches, so memory use does not grow with the size of the push. A push with more
+    than `max_commits` new commits, or taking longer than `timeout` to lint, is rejected rather
+    than let through unchecked.
+
+    Returns:
+        int: 1 if the push must be rejected, otherwise 0.
+    """
+    from comeit.pre_receive import iter_pushed_commits, parse_ref_updates
+
+    deadline = time.perf_counter() + timeout if timeout else None
+    try:
+        updates = parse_ref_updates(ref_updates)
+    except ValueError as e:
+        logger.error(f"Cannot read the ref updates of the push. {e}")
+        return 1
+
+    # One more commit than allowed is read, to tell a push at the limit from a larger one
+    commits = iter_pushed_commits(updates, max_count=max_commits + 1 if max_commits else None)
+    checked = failed = 0
+    try:
+        for commit, outcome in _lint_commits(linter, commits, jobs, linter_kwargs):
+            if checked == max_commits:
+                logger.error(
+                    f"Rejecting the push, since it adds more than {max_commits} commits. "
+                    "Push it in smaller parts."
+                )
+                failed += 1
+                break
+            if deadline and time.perf_counter() > deadline:
+                logger.error(
+                    f"Rejecting the push, since linting its commits took longer than {timeout}s. "
+                    "Push it in smaller parts."
+                )
+                failed += 1
+                break
+
+            checked += 1
+            failed += isinstance(outcome, ValueError) or outcome.has_errors
+            report.commit(commit, outcome)
+    finally:
+        report.summary(checked, failed)
+
+    return 1 if failed else 0
+
+
+def lint_fleet(
+    report: "AggregateReport",
+    paths: list[Path],
+    jobs: int = 1,
+    linter_kwargs: dict = None,
+    all_refs: bool = False,
+    reader: str = "git",
+    default_config: Path | None = None,
+) -> int:
+    """Lint the history of every repository found in `paths`, sharing one pool of processes.
+
+    Every repository is reported as soon as its commits are linted, followed by the failures of
+    each rule and the totals of all repositories.
+
+    Returns:
+        int: 1 if any commit failed a rule with severity ERROR or a repository could not be
+            scanned, otherwise 0.
+    """
+    from comeit.scan import ScanSummary, find_repositories, scan_repositories
+
+    try:
+        repos = find_repositories(paths)
+    except FileNotFoundError as e:
+        logger.error(e)
+        return 1
+    logger.info("Scanning %d repositories", len(repos))
+
+    summary = ScanSummary()
+    scans = scan_repositories(
+        repos,
+        linter_kwargs or {},
+        jobs=jobs,
+        all_refs=all_refs,
+        reader=reader,
+        default_config=default_config,
+    )
+    for scan in scans:
+        summary.add(scan)
+        report.repo(scan)
+
+    report.scan_summary(summary)
+    return 1 if summary.total.failed or summary.errors else 0
+
+
+def lint_stats(
+    linter: "Linter",
+    report: "AggregateReport",
+    revisions: list[str],
+    all_refs: bool,
+    top: int,
+    jobs: int = 1,
+    linter_kwargs: dict = None,
+    reader: str = "git",
+) -> int:
+    """Lint every commit of a revision range and report aggregates instead of the commits.
+
+    The results are folded into a `HistoryStats` one commit at a time and dropped, so memory use
+    does not grow with the length of the history.
+
+    Returns:
+        int: 1 if any commit failed a rule with severity ERROR, otherwise 0.
+    """
+    from comeit.stats import HistoryStats
+
+    if reader == "python":
+        from comeit.git_objects import iter_commits
+    else:
+        from comeit.git import iter_commits
+
+    commits = iter_commits(revisions=revisions, all_refs=all_refs, details=True)
+    stats = HistoryStats()
+    for commit, outcome in _lint_commits(linter, commits, jobs, linter_kwargs):
+        stats.record(commit, outcome)
+
+    report.history_stats(stats, top)
+    return 1 if stats.failed else 0
+
+
+def _lint_commits(
+    linter: "Linter", commits: "Iterator[GitCommit]", jobs: int, linter_kwargs: dict | None
+) -> "Iterator[tuple[GitCommit, LintOutcome]]":
+    """Lint streamed commits in this process, or in a pool of `jobs` processes."""
+    with trace.span("import", module="comeit.parallel"):
+        from comeit.parallel import lint_commits, lint_commits_parallel
+
+    if jobs > 1:
+        return lint_commits_parallel(
+            commits, jobs=jobs, linter_kwargs=linter_kwargs, profile=linter.profile
+        )
+    return lint_commits(linter, commits)
+
+
+def lint_incremental(
+    linter: "Linter",
+    report: "Report",
+    jobs: int = 1,
+    linter_kwargs: dict = None,
+    reader: str = "git",
+    advance_on_failure: bool = False,
+) -> int:
+    """Lint the commits added to the current branch since its watermark.
+
+    The watermark is the last fully validated commit: it only moves to HEAD when no commit failed
+    with an error, so failing commits are linted and fail again on the next run. With
+    `advance_on_failure`, it moves to HEAD once the failures are reported, so the next run only
+    lints newer commits.
+
+    Returns:
+        int: 1 if any commit failed a rule with severity ERROR, otherwise 0.
+    """
+    from comeit.git import current_branch, rev_parse
+    from comeit.watermark import (
+        DETACHED_HEAD,
+        WatermarkStore,
+        default_watermark_path,
+        unvalidated_revisions,
+    )
+
+    store = WatermarkStore(default_watermark_path())
+    branch = current_branch() or DETACHED_HEAD
+    head = rev_parse("HEAD")
+
+    revisions = unvalidated_revisions(store.get(branch), head)
+    if revisions is None:
+        # Logged rather than printed, so jsonl and sarif output stays valid
+        logger.info("No new commits on %s since the last run", branch)
+        report.summary(0, 0)
+        return 0
+
+    logger.info("Linting %s on %s", " ".join(revisions), branch)
+    exit_code = lint_history(
+        linter=linter,
+        report=report,
+        revisions=revisions,
+        all_refs=False,
+        jobs=jobs,
+        linter_kwargs=linter_kwargs,
+        reader=reader,
+    )
+    if exit_code == 0 or advance_on_failure:
+        store.set(branch, head)
+
+    return exit_code
+
+
 def main():
     args = parse_args()
     configure_logger(log_level=args.log_level)
 
+    if args.trace is None:
+        return run(args)
+
+    trace.enable(origin=_START)
+    trace.add_span("import", _START, _IMPORTED, module=__name__)
+    try:
+        with trace.span("main"):
+            return run(args)
+    finally:
+        trace.write(args.trace)
+        logger.info("Wrote trace to %s", args.trace)
+
+
+def run(args: "ConfigArgs") -> int | None:
+    with trace.span("import", module="comeit.linter"):
+        from comeit import Linter
+        from comeit.git import GitError
+
     logger.info("Creating allowed commit types...")
     allowed_commit_types = create_commit_types()
 
-    logger.info("Preparing commit message...")
-    commit_msg = ("feat: this is a feature", "", "")
+    if args.command == "stats" and args.incremental:
+        logger.error("The stats command does not support --incremental.")
+        return 1
+    if args.shard and (args.command or not (args.rev_range or args.all)):
+        logger.error("--shard only splits the history of --range or --all.")
+        return 1
+    if args.partial and not args.shard:
+        logger.error("--partial needs --shard.")
+        return 1
+
+    cache_path = None
+    if args.cache and args.command == "scan":
+        logger.warning("The scan command does not use the cache.")
+    elif args.cache:
+        from comeit.cache import default_cache_path
+
+        try:
+            cache_path = default_cache_path()
+        except GitError as e:
+            logger.error(f"Cannot cache results outside a git repository. {e}")
+            return 1
+
+    kwargs = linter_kwargs(
+        types=allowed_commit_types,
+        user_rules_yml=args.config_file,
+        cache_path=cache_path,
+        cache_size=args.cache_size,
+        profile=args.profile is not None and args.command != "scan",
+        dependency_policy=args.on_dependency_failure,
+        rule_threads=args.rule_threads,
+    )
+
+    if args.command == "serve":
+        from comeit import RuleLoader
+        from comeit.daemon import default_socket_path, serve
+
+        try:
+            socket_path = args.socket or default_socket_path()
+        except GitError as e:
+            logger.error(f"Cannot serve outside a git repository without --socket. {e}")
+            return 1
+
+        config_files = RuleLoader(user_rules_yml=args.config_file).config_files()
+        serve(socket_path, create_linter=lambda: Linter(**kwargs), config_files=config_files)
+        return 0
 
     logger.info("Initializing rules...")
-    rules = init_rules(
-        types=allowed_commit_types, commit_msg=commit_msg, user_rules_yml=args.config_file
-    )
+    # Load rules from yaml config and bind them to the checks once for all messages
+    with trace.span("create_linter"):
+        linter = Linter(**kwargs)
 
     logger.info("Listing rules...")
-    for rule_id, rule in rules.items():
+    for rule in linter.rules.values():
         logger.debug("%s", rule)
 
-    logger.info("Applying rules to commit %s", commit_msg)
-    rule_manager = RuleManager(rules)
-
-    # Rule ID and successful/unsuccessful run returned
-    results = rule_manager.apply_rules()
-
-    # Display results
-    console = Console()
-    table = Table(title="Rules Summary")
-    table.add_column("Rule", justify="left")
-    table.add_column("Pass", justify="center")
-    # table.add_column("Severity", justify="center")
-    table.add_column("Description", justify="left")
-    for rule_id, result in results.items():
-        rule = rules[rule_id]
-
-        if result.is_success():
-            status = "✅"
-        elif result.is_failed():
-            status = "❌"
-        elif result.is_ignored():
-            status = "👻"
-        else:
-            raise ValueError(f"Unknown {result=}")
-
-        # Warnings are always pass
-        if rule.severity.is_warning():
-            status = "🚧"
-
-        rule_name = (
-            f"{rule.component.value.title()} {rule.check.__name__.replace('_', ' ').title()}"
+    with trace.span("create_report", format=args.format):
+        from comeit.output import create_report
+
+        report = create_report(args.format, linter.rules)
+
+    if args.command == "merge":
+        linter.close()
+        return lint_merge(report=report, partials=args.partials, fingerprint=linter.fingerprint)
+
+    if args.command == "scan":
+        linter.close()
+        return lint_fleet(
+            report=report,
+            paths=args.paths,
+            jobs=args.jobs,
+            linter_kwargs=kwargs,
+            all_refs=args.all,
+            reader=args.reader,
+            default_config=args.config_file,
         )
-        table.add_row(f"{rule_id} - {rule_name}", status, rule.description)
 
-        if result.is_failed() and rule.severity.is_error():
-            table.add_row(
-                f"[bold red]{' ' * 7}Error[/bold red]", "", f"[bold red]  {rule.message}[/bold red]"
-            )
-        elif result.is_failed() and rule.severity.is_warning():
-            table.add_row(
-                f"[bold yellow]{' ' * 7}Warning[/bold yellow]",
-                "",
-                f"[bold yellow]  {rule.message}[/bold yellow]",
+    if args.command in ("pre-receive", "stats") or args.rev_range or args.all or args.incremental:
+        try:
+            if args.command == "pre-receive":
+                return lint_pre_receive(
+                    linter=linter,
+                    report=report,
+                    ref_updates=sys.stdin,
+                    jobs=args.jobs,
+                    linter_kwargs=kwargs,
+                    max_commits=args.max_commits,
+                    timeout=args.timeout,
+                )
+
+            if args.command == "stats":
+                return lint_stats(
+                    linter=linter,
+                    report=report,
+                    revisions=[args.rev_range] if args.rev_range else [],
+                    all_refs=args.all,
+                    top=args.top,
+                    jobs=args.jobs,
+                    linter_kwargs=kwargs,
+                    reader=args.reader,
+                )
+
+            if args.incremental:
+                return lint_incremental(
+                    linter=linter,
+                    report=report,
+                    jobs=args.jobs,
+                    linter_kwargs=kwargs,
+                    reader=args.reader,
+                    advance_on_failure=args.watermark_on_failure == "advance",
+                )
+
+            revisions = [args.rev_range] if args.rev_range else []
+            logger.info("Linting commit history %s", args.rev_range or "of all refs")
+            return lint_history(
+                linter=linter,
+                report=report,
+                revisions=revisions,
+                all_refs=args.all,
+                jobs=args.jobs,
+                linter_kwargs=kwargs,
+                reader=args.reader,
+                shard=args.shard,
+                partial=args.partial,
             )
+        except GitError as e:
+            logger.error(e)
+            return 1
+        finally:
+            linter.close()
+            if linter.profile:
+                # Written to stderr, so it does not mix with the report when piped
+                linter.profile.write(sys.stderr, linter.rules, format=args.profile)
+
+    logger.info("Preparing commit message...")
+    with trace.span("read_message"):
+        commit_msg = "feat: this is a feature"
+
+    logger.info("Applying rules to commit %s", commit_msg)
+    with trace.span("lint"):
+        lint_result = linter.lint(commit_msg)
+    linter.close()
+
+    # Display results
+    with trace.span("render", format=args.format):
+        report.message(lint_result)
 
-    console.print(table)
+    if linter.profile:
+        linter.profile.write(sys.stderr, linter.rules, format=args.profile)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
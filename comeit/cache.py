@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from .git import git_dir
+from .lint_result import LintResult
+from .rules.rule_manager import RuleResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Hits only refresh the last use time of an entry once it is this old. Refreshing it on every hit
+# would turn a fully cached run into one write per commit.
+_REFRESH_AFTER_SECONDS = 24 * 60 * 60
+
+
+def default_cache_path(cwd: Path | None = None) -> Path:
+    """Return the location of the cache inside the git directory of the current repository."""
+    return git_dir(cwd) / "comeit" / "cache.sqlite3"
+
+
+class ResultCache:
+    """Stores lint results on disk so unchanged commits do not have to be linted again.
+
+    Entries are keyed by a hash of the commit message and the fingerprint of the rule set that
+    produced the result. Any change to the rules or their configuration changes the fingerprint,
+    so stale results are never returned. They are evicted once the cache grows beyond its size.
+
+    The cache is an SQLite database in WAL mode, so several processes can use it at once.
+    """
+
+    def __init__(self, path: Path, fingerprint: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Args:
+        path (Path): The database file. Its directory is created if missing.
+        fingerprint (str): Identifies the rule set the results are produced with.
+        max_entries (int): The number of results kept after `evict()`. Defaults to
+            `DEFAULT_MAX_ENTRIES`.
+        """
+        self._fingerprint = fingerprint.encode()
+        self._max_entries = max_entries
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key BLOB PRIMARY KEY, value TEXT NOT NULL, last_used INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)"
+        )
+        logger.debug("Opened result cache %s", path)
+
+    def get(self, message: str) -> LintResult | None:
+        """Return the cached result of a commit message, or None if it is not cached."""
+        key = self._key(message)
+        row = self._connection.execute(
+            "SELECT value, last_used FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, last_used = row
+        now = int(time.time())
+        if now - last_used > _REFRESH_AFTER_SECONDS:
+            self._connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+
+        return _decode(value)
+
+    def put(self, message: str, lint_result: LintResult):
+        """Store the result of a commit message."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+            (self._key(message), _encode(lint_result), int(time.time())),
+        )
+
+    def evict(self) -> int:
+        """Remove the least recently used results beyond the size of the cache.
+
+        Returns:
+            int: The number of removed results.
+        """
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self._max_entries
+        if excess <= 0:
+            return 0
+
+        self._connection.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        logger.debug("Evicted %d results from the cache", excess)
+        return excess
+
+    def close(self):
+        self._connection.close()
+
+    def _key(self, message: str) -> bytes:
+        return hashlib.sha256(self._fingerprint + b"\0" + message.encode()).digest()
+
+
+def _encode(lint_result: LintResult) -> str:
+    return json.dumps(
+        {
+            "results": {rule_id: result.name for rule_id, result in lint_result.results.items()},
+            "messages": lint_result.messages,
+            "has_errors": lint_result.has_errors,
+        }
+    )
+
+
+def _decode(value: str) -> LintResult:
+    data = json.loads(value)
+    return LintResult(
+        results={rule_id: RuleResult[name] for rule_id, name in data["results"].items()},
+        messages=data["messages"],
+        has_errors=data["has_errors"],
+    )
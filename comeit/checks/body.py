@@ -1,6 +1,6 @@
 # Body tests
 class Body:
-    def check_body(self):
+    def check_body(self, body: str | None):
         """A full test of the body."""
 
     def summary_ended_with_newline():
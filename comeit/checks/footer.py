@@ -1,4 +1,4 @@
 # Footer tests
 class Footer:
-    def check_footer(self):
+    def check_footer(self, footer: str | None):
         """A full test of the body."""
@@ -1,72 +1,205 @@
 import logging
+import re
+from functools import lru_cache
+from typing import NamedTuple
 
 log = logging.getLogger(__name__)
 
+DEFAULT_MAX_SCOPE_LENGTH = 20
+
+# <type>(<scope>)!: <summary>, where the scope and the '!' are optional
+_HEADER_PATTERN = re.compile(
+    r"(?P<type>[^(:!]*)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:[^\S\n]*(?P<summary>.*)",
+    re.DOTALL,
+)
+_LETTERS_PATTERN = re.compile(r"[A-Za-z]+")
+# The summary starts after the first colon and the whitespace following it, as in _HEADER_PATTERN
+_SUMMARY_PATTERN = re.compile(r":[^\S\n]*(?P<summary>.*)", re.DOTALL)
+
+
+class ParsedHeader(NamedTuple):
+    """The parts of a conventional commit header `<type>(<scope>)!: <summary>`.
+
+    Every part is None if the header has no colon, since then none of them can be identified.
+    If the text before the first colon is not a `<type>(<scope>)!` prefix, e.g. `feat!(api)` or
+    `fix(parser`, the header is `malformed` and only its summary is identified. The spans are the
+    start and end offsets of each part in the header.
+
+    Attributes:
+        type (str | None): Everything before the scope, the '!' and the colon.
+        scope (str | None): The text between the parentheses, or None if there is no scope.
+        breaking (bool): Whether the type is followed by a '!'.
+        summary (str | None): Everything after the colon and the whitespace following it.
+        malformed (bool): Whether the header has a colon, but the text before it is not a
+            `<type>(<scope>)!` prefix.
+    """
+
+    type: str | None = None
+    type_span: tuple[int, int] | None = None
+    scope: str | None = None
+    scope_span: tuple[int, int] | None = None
+    breaking: bool = False
+    summary: str | None = None
+    summary_span: tuple[int, int] | None = None
+    malformed: bool = False
+
+
+_NO_COLON = ParsedHeader()
+
+
+# Larger than the batches of `Linter.lint_batch`, which runs each rule over a whole batch before
+# the next rule, so the batch is still cached when the next rule reads it
+@lru_cache(maxsize=1024)
+def parse_header(header: str) -> ParsedHeader:
+    """Decompose a header into its parts.
+
+    The result is cached, so all the checks of a header share a single parse.
+    """
+    match = _HEADER_PATTERN.match(header)
+    if match is None:
+        colon = header.find(":")
+        if colon < 0:
+            return _NO_COLON
+        summary = _SUMMARY_PATTERN.match(header, colon)
+        return ParsedHeader(
+            summary=summary.group("summary"), summary_span=summary.span("summary"), malformed=True
+        )
+
+    scope = match.group("scope")
+    return ParsedHeader(
+        type=match.group("type"),
+        type_span=match.span("type"),
+        scope=scope,
+        scope_span=match.span("scope") if scope is not None else None,
+        breaking=match.group("breaking") is not None,
+        summary=match.group("summary"),
+        summary_span=match.span("summary"),
+    )
+
 
 class Header:
-    def __init__(self, types: list, max_length: int, commit_msg: str) -> None:
+    """Checks for the header of a commit message.
+
+    The checks do not hold any commit message themselves. The header is passed to every call,
+    which lets one instance, and the rules bound to its methods, be reused for many messages.
+    Every check reads the parts of the header from `parse_header`, so the header is only parsed
+    once no matter how many checks run on it.
+
+    Checks with a `<check>_many` method also have a batch version. It takes a list of headers and
+    returns whether the check passed for each of them, without building any messages.
+    """
+
+    def __init__(
+        self, types: list, max_length: int, max_scope_length: int = DEFAULT_MAX_SCOPE_LENGTH
+    ) -> None:
         self._types = types
         self._max_len = max_length
-        self._commit_msg = commit_msg
+        self._max_scope_len = max_scope_length
 
     # This might be waaay too complex. Rather run all the other ones.
-    def check_header(self):
+    def check_header(self, header: str) -> tuple[bool, str]:
         """A full test for the header.
 
         Should this fail, run the other header tests to find the exact issue.
-        """
 
-    def length(self) -> tuple[bool, str]:
+        Error: The error of the first failing header check.
+        """
+        checks = [
+            self.length,
+            self.has_type,
+            self.type_empty,
+            self.type_in_type_set,
+            self.type_case,
+            self.scope_chars,
+            self.scope_case,
+            self.scope_length,
+            self.has_summary,
+            self.summary_case,
+        ]
+        for check in checks:
+            success, msg = check(header)
+            if not success:
+                return False, msg
+
+        return True, ""
+
+    def length(self, header: str) -> tuple[bool, str]:
         """Header cannot be longer than configured.
 
         This is an independent rule that can run paralell to other rules.
 
         Error: Header is longer than <max_len>
         """
-        log.debug(f"Running {self.length.__name__}()")
-
-        success = False
-        error_msg = f"Exceeded header length {100}/{self._max_len}."
+        log.debug("Running %s()", "length")
 
-        if success:
+        if len(header) <= self._max_len:
             return True, ""
-        else:
-            return False, error_msg
+        return False, f"Exceeded header length {len(header)}/{self._max_len}."
+
+    def length_many(self, headers: list[str]) -> list[bool]:
+        max_len = self._max_len
+        return [length <= max_len for length in map(len, headers)]
 
-    def has_type(self) -> tuple[bool, str]:
+    def has_type(self, header: str) -> tuple[bool, str]:
         """Tries to find a colon ':' in the header preceded by exactly one word.
 
-        Error: No colon found
+        Error: No colon found, or the text before it is not a `<type>(<scope>)!` prefix
         """
-        log.debug(f"Running {self.has_type.__name__}()")
-
-        success = True
-        msg = "No colon found. Cannot identify a type."
-
-        if success:
-            return True, ""
-        else:
-            return False, msg
+        log.debug("Running %s()", "has_type")
+
+        parsed = parse_header(header)
+        if parsed.malformed:
+            prefix = header.partition(":")[0]
+            return False, f"Malformed type or scope before the colon: '{prefix}'."
+        type = parsed.type
+        if type is None:
+            return False, "No colon found. Cannot identify a type."
+        if len(type.split()) > 1:
+            return False, f"Found more than one word before the colon: '{type}'."
+        return True, ""
+
+    def has_type_many(self, headers: list[str]) -> list[bool]:
+        types = [parse_header(header).type for header in headers]
+        return [type is not None and len(type.split()) <= 1 for type in types]
 
     # Dependent on "has_type() to be True if this should run"
-    def type_empty(self, types: set):
+    def type_empty(self, header: str) -> tuple[bool, str]:
         """Cannot have a ':' with no [a-z] char preceding it.
 
         Error: Found colon but there was nothing before it meaning empty type.
         """
+        log.debug("Running %s()", "type_empty")
+
+        if _LETTERS_PATTERN.search(parse_header(header).type or ""):
+            return True, ""
+        return False, "Found colon but there was nothing before it meaning empty type."
+
+    def type_empty_many(self, headers: list[str]) -> list[bool]:
+        search = _LETTERS_PATTERN.search
+        return [search(parse_header(header).type or "") is not None for header in headers]
 
     # Dependent on "has_type() to be True to run"
     # Dependent on "type_empty() to be False to run"
-    def type_in_type_set(self, types: set):
+    def type_in_type_set(self, header: str) -> tuple[bool, str]:
         """Must be a type in the type-set followed by colon ':' or '!:'.
 
         Optional: An optional exclamation mark '!' can be added.
 
         Error: Type is not matching any defined types.
         """
+        log.debug("Running %s()", "type_in_type_set")
+
+        type = parse_header(header).type or ""
+        if type.lower() in self._types:
+            return True, ""
+        return False, f"Type '{type}' is not matching any of {'|'.join(sorted(self._types))}."
+
+    def type_in_type_set_many(self, headers: list[str]) -> list[bool]:
+        types = self._types
+        return [(parse_header(header).type or "").lower() in types for header in headers]
 
     # Dependent on "has_type() to be True if this should run"
-    def type_case(self, types: set):
+    def type_case(self, header: str) -> tuple[bool, str]:
         """Must be a lower case type followed by ':'.
 
         Being a lower case [a-z] followed by ':' is enough to satisfy this check.
@@ -75,8 +208,14 @@ class Header:
 
         Error: Wrong case on the type even if it was the correct word.
         """
+        log.debug("Running %s()", "type_case")
+
+        type = parse_header(header).type or ""
+        if type == type.lower():
+            return True, ""
+        return False, f"Type '{type}' must be lower case."
 
-    def has_scope(self) -> bool:
+    def has_scope(self, header: str) -> tuple[bool, str]:
         """Found a scope meaning parentheses after colon.
 
         :(word) is a valid scope and :(word and much more) is not. However it is
@@ -85,35 +224,64 @@ class Header:
 
         Optional
         """
+        log.debug("Running %s()", "has_scope")
+
+        if parse_header(header).scope is not None:
+            return True, ""
+        return False, "No scope found."
 
     # Dependent on "has_scope() to be True if this should be run"
-    def scope_chars(self):
+    def scope_chars(self, header: str) -> tuple[bool, str]:
         """Scope has invalid characters.
 
         A scope MUST be one word with no newlines, spaces, tabs, underscores, hyphens
             etc. Strictly
         [a-z].
 
+        Passes if there is no scope.
+
         Error: Scope contains invalid characters.
         """
+        log.debug("Running %s()", "scope_chars")
+
+        scope = parse_header(header).scope
+        if scope is None or _LETTERS_PATTERN.fullmatch(scope):
+            return True, ""
+        return False, f"Scope '{scope}' contains invalid characters."
 
     # Dependent on "_has_scope() to be True if this should be run"
-    def scope_case(self):
+    def scope_case(self, header: str) -> tuple[bool, str]:
         """Scope case is invalid.
 
         Scope MUST be lower case [a-z] only.
 
+        Passes if there is no scope.
+
         Error: Scope is not lower case.
         """
+        log.debug("Running %s()", "scope_case")
+
+        scope = parse_header(header).scope
+        if scope is None or scope == scope.lower():
+            return True, ""
+        return False, f"Scope '{scope}' is not lower case."
 
     # Dependent on "_has_scope() to be True if this should be run"
-    def scope_length(self):
+    def scope_length(self, header: str) -> tuple[bool, str]:
         """Scope length MUST follow the defined max length.
 
+        Passes if there is no scope.
+
         Error: Scope length exceeded <max scope length>
         """
+        log.debug("Running %s()", "scope_length")
 
-    def has_summary(self):
+        scope = parse_header(header).scope
+        if scope is None or len(scope) <= self._max_scope_len:
+            return True, ""
+        return False, f"Scope length exceeded {len(scope)}/{self._max_scope_len}."
+
+    def has_summary(self, header: str) -> tuple[bool, str]:
         """The header needs a summary additional to a type.
 
         The summary can in principle be any character. A colon will be confusing.
@@ -122,12 +290,29 @@ class Header:
 
         Error: Header does not contain a summary.
         """
+        log.debug("Running %s()", "has_summary")
 
-    def summary_length(self):
-        """This doesn't make sense since the entire header is checked for length."""
+        if (parse_header(header).summary or "").strip():
+            return True, ""
+        return False, "Header does not contain a summary."
 
-    def summary_case(self):
+    def summary_length(self, header: str) -> tuple[bool, str]:
+        """This doesn't make sense since the entire header is checked for length.
+
+        Always passes. Use `length` instead.
+        """
+        return True, ""
+
+    def summary_case(self, header: str) -> tuple[bool, str]:
         """Summary MUST be lower case.
 
+        Only the first character is checked, so names and abbreviations can still be used.
+
         Error: Summary must be written in lower case.
         """
+        log.debug("Running %s()", "summary_case")
+
+        summary = parse_header(header).summary or ""
+        if summary[:1] == summary[:1].lower():
+            return True, ""
+        return False, "Summary must be written in lower case."
@@ -0,0 +1,109 @@
+"""Thin client for the comeit daemon, meant to be run as a `commit-msg` hook.
+
+It only depends on a few standard library modules and does not import the rest of the package,
+so it starts in a few milliseconds. The rules are applied by the daemon started with
+`comeit serve`.
+"""
+
+import os
+import socket
+import sys
+
+_SOCKET_NAME = os.path.join("comeit", "daemon.sock")
+
+
+def find_socket_path(cwd: str | None = None) -> str | None:
+    """Find the daemon socket of the repository without spawning git.
+
+    Git hooks run with `GIT_DIR` set. Otherwise the git directory is searched for upwards from
+    `cwd`, following the `gitdir:` file of worktrees and submodules.
+    """
+    if "GIT_DIR" in os.environ:
+        return os.path.join(os.path.abspath(os.environ["GIT_DIR"]), _SOCKET_NAME)
+
+    directory = os.path.abspath(cwd or os.getcwd())
+    while True:
+        dot_git = os.path.join(directory, ".git")
+        if os.path.isdir(dot_git):
+            return os.path.join(dot_git, _SOCKET_NAME)
+        if os.path.isfile(dot_git):
+            with open(dot_git) as f:
+                gitdir = f.read().strip().removeprefix("gitdir:").strip()
+            return os.path.join(os.path.realpath(os.path.join(directory, gitdir)), _SOCKET_NAME)
+
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def lint(socket_path: str, message: bytes) -> tuple[int, str]:
+    """Send a commit message to the daemon.
+
+    Returns:
+        tuple[int, str]: The exit code and the report of the daemon.
+
+    Raises:
+        OSError: If the daemon cannot be reached.
+        ValueError: If the daemon closed the connection without a valid reply, e.g. because it
+            failed while linting the message.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall(message)
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+
+    if not chunks:
+        raise ValueError("it closed the connection without a reply")
+    status, _, report = b"".join(chunks).decode("utf-8", errors="replace").partition("\n")
+    if not status.isdigit():
+        raise ValueError(f"it sent an invalid reply {status[:40]!r}")
+    return int(status), report
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) not in (1, 3) or (len(args) == 3 and args[0] != "--socket"):
+        print("usage: comeit-client [--socket PATH] MSG_FILE", file=sys.stderr)
+        return 2
+
+    msg_file = args[-1]
+    socket_path = args[1] if len(args) == 3 else find_socket_path()
+    if socket_path is None:
+        print("comeit-client: not inside a git repository.", file=sys.stderr)
+        return 1
+
+    try:
+        with open(msg_file, "rb") as f:
+            message = f.read()
+    except OSError as e:
+        print(f"comeit-client: cannot read {msg_file}. {e}", file=sys.stderr)
+        return 1
+
+    try:
+        exit_code, report = lint(socket_path, message)
+    except OSError as e:
+        print(
+            f"comeit-client: cannot reach the daemon at {socket_path} ({e}). "
+            "Start it with 'comeit serve'.",
+            file=sys.stderr,
+        )
+        return 1
+    except ValueError as e:
+        print(
+            f"comeit-client: the daemon at {socket_path} failed to lint the message, {e}. "
+            "Check the log of 'comeit serve'.",
+            file=sys.stderr,
+        )
+        return 1
+
+    sys.stdout.write(report)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,128 @@ import re
 
 logger = logging.getLogger(__name__)
 
+_SCISSORS = "------------------------ >8 ------------------------"
 
-def parse_commit_message(commit_message: str):
+# A footer line is a token followed by ': ' or ' #', ignoring surrounding whitespace. A ': ' at the
+# end of the line does not count, since the line would be stripped to end with the colon.
+_FOOTER_LINE = re.compile(
+    r"^[^\S\n]*(?P<token>BREAKING CHANGE|[A-Za-z-]+)(?:: (?=[^\n]*\S)| #)", re.MULTILINE
+)
+
+
+class ParsedCommit:
+    """A commit message split into summary, body and footer.
+
+    Only the offsets of the parts are stored. The strings are sliced out of the original message
+    the first time they are accessed. For compatibility it also behaves like the tuple
+    `(summary, body, footer)`.
+
+    Attributes:
+        message (str): The original commit message.
+    """
+
+    __slots__ = ("message", "_summary_end", "_footer_start", "_parts", "_trailer_spans")
+
+    def __init__(self, message: str, summary_end: int, footer_start: int | None):
+        self.message = message
+        self._summary_end = summary_end
+        self._footer_start = footer_start
+        self._parts: tuple[str, str | None, str | None] | None = None
+        self._trailer_spans: list[tuple[tuple[int, int], tuple[int, int]]] | None = None
+
+    @property
+    def summary_span(self) -> tuple[int, int]:
+        """The start and end offset of the summary line."""
+        return 0, self._summary_end
+
+    @property
+    def body_span(self) -> tuple[int, int] | None:
+        """The start and end offset of the body, or None if there is no body."""
+        body_start = self._summary_end + 1
+        if body_start > len(self.message) or self._footer_start == body_start:
+            return None
+        if self._footer_start is None:
+            return body_start, len(self.message)
+        return body_start, self._footer_start - 1  # Without the newline before the footer
+
+    @property
+    def footer_span(self) -> tuple[int, int] | None:
+        """The start and end offset of the footer, or None if there is no footer."""
+        if self._footer_start is None:
+            return None
+        return self._footer_start, len(self.message)
+
+    @property
+    def summary(self) -> str:
+        return self._materialize()[0]
+
+    @property
+    def body(self) -> str | None:
+        return self._materialize()[1]
+
+    @property
+    def footer(self) -> str | None:
+        return self._materialize()[2]
+
+    @property
+    def trailer_spans(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """The offsets of the token and the value of every trailer line in the footer."""
+        if self._trailer_spans is None:
+            self._trailer_spans = []
+            if self._footer_start is not None:
+                for match in _FOOTER_LINE.finditer(self.message, self._footer_start):
+                    value_end = self.message.find("\n", match.end())
+                    value_end = len(self.message) if value_end == -1 else value_end
+                    self._trailer_spans.append((match.span("token"), (match.end(), value_end)))
+        return self._trailer_spans
+
+    @property
+    def trailers(self) -> list[tuple[str, str]]:
+        """The token and value of every trailer line, e.g. `("Refs", "12")` for `Refs #12`."""
+        message = self.message
+        return [
+            (message[token_start:token_end], message[value_start:value_end].strip())
+            for (token_start, token_end), (value_start, value_end) in self.trailer_spans
+        ]
+
+    def _materialize(self) -> tuple[str, str | None, str | None]:
+        if self._parts is None:
+            self._parts = tuple(
+                None if span is None else self.message[span[0] : span[1]]
+                for span in (self.summary_span, self.body_span, self.footer_span)
+            )
+        return self._parts
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return 3
+
+    def __getitem__(self, index: int) -> str | None:
+        return self._materialize()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, ParsedCommit | tuple):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ParsedCommit(summary={self.summary!r}, body={self.body!r}, footer={self.footer!r})"
+
+
+def parse_commit_message(commit_message: str) -> ParsedCommit:
     """Parse a commit message into its components: summary, body, and footer.
 
+    The message is scanned once, without splitting it into lines or copying any part of it. The
+    first line is the summary. Everything from the first footer line to the end is the footer, and
+    anything between the summary and the footer is the body.
+
     Args:
         commit_message (str): The commit message to parse.
 
     Returns:
-        tuple: A tuple containing:
+        ParsedCommit: The parsed message. It unpacks like a tuple containing:
             - summary (str): The summary line of the commit message.
             - body (str or None): The body of the commit message, or None if not present.
             - footer (str or None): The footer of the commit message, or None if not present.
@@ -19,56 +132,40 @@ def parse_commit_message(commit_message: str):
     Raises:
         ValueError: If the commit message is empty or cannot be parsed.
     """
-    lines = commit_message.split("\n")  # Do not strip here to preserve all newlines
-
-    if not lines or lines == [""]:
+    if not commit_message:
         raise ValueError("Failed to parse commit message. Commit message is empty.")
 
-    summary = lines[0]
-
-    if _is_summary_only(lines):
-        return summary, None, None
+    summary_end = commit_message.find("\n")
+    if summary_end == -1:  # Summary only
+        return ParsedCommit(commit_message, len(commit_message), None)
 
     # We check for footers first and assume anything before the footer is the body
-    body, footer = _extract_body_and_footer(lines[1:])  # Pass all lines after the summary
-
-    return summary, body, footer
-
+    footer = _FOOTER_LINE.search(commit_message, summary_end + 1)
+    return ParsedCommit(commit_message, summary_end, footer.start() if footer else None)
 
-def _is_summary_only(lines: list[str]):
-    """Check if the commit message consists of only the summary line."""
-    return len(lines) == 1
 
+def strip_comments(commit_message: str, comment_char: str = "#") -> str:
+    """Remove the comments git adds to a commit message file before it is edited.
 
-def _is_footer_line(line: str):
-    """Check if the given line is a footer line based on the rules."""
-    footer_pattern = re.compile(r"^(BREAKING CHANGE|[A-Za-z-]+)(: | #)")
-    return bool(footer_pattern.match(line.strip()))
+    Lines starting with the comment character are removed, and so is everything below the
+    scissors line added by `git commit --verbose`. Trailing newlines are stripped as well.
 
+    Args:
+        commit_message (str): The content of a commit message file, e.g. `.git/COMMIT_EDITMSG`.
+        comment_char (str): The comment character configured in git. Defaults to "#".
 
-def _extract_body_and_footer(lines: list[str]):
-    """Extract body and footer by treating lines as body until a footer is found.
-
-    After the first footer, all lines are treated as footer.
+    Returns:
+        str: The commit message as git will store it.
     """
-    footers = []
-    body_lines = []
-    found_footer = False  # Track whether a footer has been found
-
-    for line in lines:
-        if found_footer:
-            footers.append(line)  # Once a footer is found, everything else is part of the footer
-        elif _is_footer_line(line):
-            found_footer = True
-            footers.append(line)  # Start collecting footer lines
-        else:
-            body_lines.append(line)  # Collect body lines until a footer is encountered
-
-    # Join lines without stripping to preserve all newlines
-    body = "\n".join(body_lines) if body_lines else None
-    footer = "\n".join(footers) if footers else None
-
-    return body, footer
+    scissors = f"{comment_char} {_SCISSORS}"
+    lines = []
+    for line in commit_message.split("\n"):
+        if line.startswith(scissors):
+            break
+        if not line.startswith(comment_char):
+            lines.append(line)
+
+    return "\n".join(lines).rstrip("\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+import io
+import logging
+import os
+import signal
+import socket
+import socketserver
+from collections.abc import Callable
+from pathlib import Path
+
+from .commit_message import strip_comments
+from .git import git_dir
+from .linter import Linter
+from .output import PlainReport
+
+logger = logging.getLogger(__name__)
+
+
+def default_socket_path(cwd: Path | None = None) -> Path:
+    """Return the location of the daemon socket inside the git directory of the repository."""
+    return git_dir(cwd) / "comeit" / "daemon.sock"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Lints the commit message sent by a client and replies with the exit code and report.
+
+    The client writes the raw content of the commit message file and shuts down its side of
+    the connection. The reply is the exit code on the first line followed by the report.
+    """
+
+    server: "CommitLintServer"
+
+    def handle(self):
+        message = strip_comments(self.rfile.read().decode("utf-8", errors="replace"))
+        exit_code, report = self.server.lint(message)
+        self.wfile.write(f"{exit_code}\n{report}".encode())
+
+
+class CommitLintServer(socketserver.UnixStreamServer):
+    """Keeps the rules loaded in memory and lints the messages sent over a Unix socket.
+
+    The rules are loaded again whenever one of the config files they come from is created,
+    changed or removed.
+    """
+
+    def __init__(
+        self, socket_path: Path, create_linter: Callable[[], Linter], config_files: list[Path]
+    ):
+        """Args:
+        socket_path (Path): The Unix socket to listen on. A stale socket left behind by a
+            daemon that is no longer running is replaced.
+        create_linter (Callable[[], Linter]): Creates a linter from the current config.
+        config_files (list[Path]): The files the config is loaded from.
+        """
+        self._create_linter = create_linter
+        self._config_files = config_files
+        self._config_mtimes = self._read_mtimes()
+        self._linter = create_linter()
+
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        _remove_stale_socket(socket_path)
+        super().__init__(str(socket_path), _RequestHandler)
+        self.socket_path = socket_path
+
+    def lint(self, message: str) -> tuple[int, str]:
+        """Lint a commit message with the current rules.
+
+        Returns:
+            tuple[int, str]: The exit code for the client and the report to print.
+        """
+        self._reload_if_changed()
+
+        try:
+            lint_result = self._linter.lint(message)
+        except ValueError as e:
+            return 1, f"❌ {e}\n"
+
+        report = io.StringIO()
+        PlainReport(self._linter.rules, stream=report).message(lint_result)
+        return int(lint_result.has_errors), report.getvalue()
+
+    def server_close(self):
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+        self._linter.close()
+
+    def _reload_if_changed(self):
+        mtimes = self._read_mtimes()
+        if mtimes != self._config_mtimes:
+            logger.info("Config changed. Reloading rules...")
+            self._linter.close()
+            self._linter = self._create_linter()
+            self._config_mtimes = mtimes
+
+    def _read_mtimes(self) -> list[int | None]:
+        mtimes = []
+        for path in self._config_files:
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return mtimes
+
+
+def serve(socket_path: Path, create_linter: Callable[[], Linter], config_files: list[Path]):
+    """Run the daemon until it is interrupted or terminated."""
+    # Stop the same way on SIGTERM as on Ctrl+C, so the socket is removed on the way out
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with CommitLintServer(socket_path, create_linter, config_files) as server:
+        print(f"comeit daemon listening on {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopping daemon...")
+
+
+def _remove_stale_socket(socket_path: Path):
+    if not socket_path.exists():
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(socket_path)
+            return
+
+    raise RuntimeError(f"A daemon is already listening on {socket_path}.")
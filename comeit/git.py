@@ -0,0 +1,176 @@
+import logging
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Hash and raw message of each commit. With `-z` git terminates every record with a NUL byte,
+# which can never appear in a commit message, so records are split on it.
+_LOG_FORMAT = "%H%n%B"
+# The same with the author and the committer date as a Unix timestamp before the message
+_DETAILED_LOG_FORMAT = "%H%n%an <%ae>%n%ct%n%B"
+_READ_SIZE = 64 * 1024
+
+
+class GitError(Exception):
+    """Raised when a git command fails."""
+
+
+class GitCommit(NamedTuple):
+    """A commit read from the git history.
+
+    Attributes:
+        sha (str): The full commit hash.
+        message (str): The raw commit message without trailing newlines.
+        author (str | None): The author as "name <email>", if the details were read.
+        timestamp (int | None): The committer date as a Unix timestamp, if the details were read.
+    """
+
+    sha: str
+    message: str
+    author: str | None = None
+    timestamp: int | None = None
+
+
+def iter_commits(
+    revisions: list[str] | None = None,
+    all_refs: bool = False,
+    cwd: Path | None = None,
+    stdin_revisions: list[str] | None = None,
+    max_count: int | None = None,
+    details: bool = False,
+) -> Iterator[GitCommit]:
+    """Stream the commits of a revision range out of a single `git log` process.
+
+    Commits are yielded as soon as they are read from the pipe, so memory use does not grow with
+    the size of the history.
+
+    Args:
+        revisions (list[str], optional): Revisions or ranges passed to `git log`, e.g.
+            `["main..HEAD"]`. Defaults to `HEAD` when neither this nor `all_refs` is given.
+        all_refs (bool): Walk the history of all refs. Defaults to False.
+        cwd (Path, optional): The repository to read from. Defaults to the current directory.
+        stdin_revisions (list[str], optional): More revisions, e.g. `^<sha>` to exclude a
+            commit, written to `git log --stdin`. Unlike arguments, their number is not limited
+            by the maximum command line length.
+        max_count (int, optional): Stop after this many commits. Defaults to no limit.
+        details (bool): Also read the author and the committer date of every commit. Defaults
+            to False.
+
+    Yields:
+        GitCommit: The commits in the order `git log` prints them.
+
+    Raises:
+        GitError: If git exits with a non-zero status.
+    """
+    args = ["git", "log", "-z", f"--format={_DETAILED_LOG_FORMAT if details else _LOG_FORMAT}"]
+    parse = _parse_detailed_record if details else _parse_record
+    if max_count is not None:
+        args.append(f"--max-count={max_count}")
+    if stdin_revisions is not None:
+        args.append("--stdin")
+    if all_refs:
+        args.append("--all")
+    args.extend(revisions or [])
+    args.append("--")
+    logger.debug("Running %s", " ".join(args))
+
+    stdin = subprocess.PIPE if stdin_revisions is not None else None
+    with subprocess.Popen(
+        args, cwd=cwd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    ) as process:
+        if stdin_revisions is not None:
+            # git reads all revisions before printing the first commit, so this cannot block
+            process.stdin.write("".join(f"{revision}\n" for revision in stdin_revisions).encode())
+            process.stdin.close()
+
+        pending = b""
+        while chunk := process.stdout.read1(_READ_SIZE):
+            *records, pending = (pending + chunk).split(b"\0")
+            for record in records:
+                yield parse(record)
+
+        if pending:
+            yield parse(pending)
+
+        stderr = process.stderr.read()
+
+    if process.returncode != 0:
+        raise GitError(
+            f"'{' '.join(args)}' failed with exit code {process.returncode}: "
+            f"{stderr.decode(errors='replace').strip()}"
+        )
+
+
+def _parse_record(record: bytes) -> GitCommit:
+    sha, _, message = record.decode("utf-8", errors="replace").partition("\n")
+    return GitCommit(sha=sha, message=message.rstrip("\n"))
+
+
+def _parse_detailed_record(record: bytes) -> GitCommit:
+    sha, author, timestamp, message = record.decode("utf-8", errors="replace").split("\n", 3)
+    return GitCommit(sha, message.rstrip("\n"), author, int(timestamp))
+
+
+def git_dir(cwd: Path | None = None) -> Path:
+    """Return the absolute path of the repository's git directory, usually `.git`.
+
+    Raises:
+        GitError: If `cwd` is not inside a git repository.
+    """
+    return Path(_run(["rev-parse", "--absolute-git-dir"], cwd=cwd))
+
+
+def rev_parse(revision: str, cwd: Path | None = None) -> str:
+    """Resolve a revision to its full commit hash.
+
+    Raises:
+        GitError: If the revision does not name a commit.
+    """
+    return _run(["rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}"], cwd=cwd)
+
+
+def current_branch(cwd: Path | None = None) -> str | None:
+    """Return the short name of the checked out branch, or None if HEAD is detached."""
+    try:
+        return _run(["symbolic-ref", "--quiet", "--short", "HEAD"], cwd=cwd)
+    except GitError:
+        return None
+
+
+def commit_exists(sha: str, cwd: Path | None = None) -> bool:
+    """Check whether a commit is present in the repository, e.g. not garbage collected."""
+    try:
+        rev_parse(sha, cwd=cwd)
+    except GitError:
+        return False
+    return True
+
+
+def is_ancestor(ancestor: str, descendant: str, cwd: Path | None = None) -> bool:
+    """Check whether `ancestor` is reachable from `descendant`."""
+    process = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", ancestor, descendant], cwd=cwd, capture_output=True
+    )
+    return process.returncode == 0
+
+
+def merge_base(first: str, second: str, cwd: Path | None = None) -> str | None:
+    """Return the best common ancestor of two commits, or None if they share no history."""
+    try:
+        return _run(["merge-base", first, second], cwd=cwd)
+    except GitError:
+        return None
+
+
+def _run(args: list[str], cwd: Path | None = None) -> str:
+    """Run a git command to completion and return its stripped output."""
+    process = subprocess.run(["git", *args], cwd=cwd, capture_output=True)
+    if process.returncode != 0:
+        raise GitError(
+            f"'git {' '.join(args)}' failed with exit code {process.returncode}: "
+            f"{process.stderr.decode(errors='replace').strip()}"
+        )
+    return process.stdout.decode(errors="replace").strip()
@@ -0,0 +1,770 @@
+"""Read commits straight from the files of a git repository, without running git.
+
+This is an optional replacement for `comeit.git.iter_commits` using only the standard library.
+It saves starting a `git` process and parsing its output, which dominates the time of linting
+short histories and adds up when many repositories are scanned. Refs are resolved from loose
+ref files and `packed-refs`. Objects are looked up by a binary search in the memory-mapped
+`.idx` files of the packs, or read from loose object files, and delta chains are inflated with a
+cache of their bases.
+
+Only SHA-1 repositories with the files ref storage are supported. Revisions are limited to ref
+names, full or unique abbreviated hashes, `~N` and `^N` suffixes, `^rev` exclusions and `A..B`
+ranges.
+"""
+
+import heapq
+import itertools
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from .git import GitCommit, GitError
+
+logger = logging.getLogger(__name__)
+
+# Object types of the pack format
+_OBJ_COMMIT = 1
+_OBJ_TREE = 2
+_OBJ_BLOB = 3
+_OBJ_TAG = 4
+_OBJ_OFS_DELTA = 6
+_OBJ_REF_DELTA = 7
+_TYPE_NAMES = {_OBJ_COMMIT: "commit", _OBJ_TREE: "tree", _OBJ_BLOB: "blob", _OBJ_TAG: "tag"}
+_TYPE_CODES = {name: code for code, name in _TYPE_NAMES.items()}
+
+_IDX_MAGIC = b"\377tOc"
+_HASH_SIZE = 20
+_HEX_SHA = re.compile(r"[0-9a-f]{40}")
+# Like git, an abbreviated hash has at least 4 digits
+_SHORT_SHA = re.compile(r"[0-9a-f]{4,39}")
+_REVISION_SUFFIXES = re.compile(r"(?:[~^]\d*)*$")
+# Number of excluded commits walked past the point where only excluded history seems left
+_SLOP = 5
+
+DEFAULT_DELTA_CACHE_SIZE = 16 * 1024 * 1024
+
+
+def find_git_dir(cwd: Path | None = None) -> Path:
+    """Return the git directory of the repository containing `cwd`, like `git rev-parse`.
+
+    Raises:
+        GitError: If `cwd` is not inside a git repository.
+    """
+    if "GIT_DIR" in os.environ:
+        return Path(os.environ["GIT_DIR"]).absolute()
+
+    path = Path(cwd or os.getcwd()).absolute()
+    for directory in (path, *path.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            # Worktrees and submodules point to their git directory with a "gitdir:" file
+            content = dot_git.read_text().strip()
+            if content.startswith("gitdir:"):
+                return (directory / content.removeprefix("gitdir:").strip()).resolve()
+        if (directory / "HEAD").is_file() and (directory / "objects").is_dir():
+            return directory  # A bare repository
+
+    raise GitError(f"Not a git repository: {path}")
+
+
+class _Pack:
+    """A pack file and its version 2 index, both memory-mapped."""
+
+    __slots__ = ("name", "_index", "_data", "_fanout", "_count", "_offsets", "_large_offsets")
+
+    def __init__(self, index_path: Path, pack_path: Path):
+        self.name = pack_path.name
+        with open(index_path, "rb") as file:
+            self._index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(pack_path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._index[:4] != _IDX_MAGIC or struct.unpack_from(">I", self._index, 4)[0] != 2:
+            raise GitError(f"Unsupported pack index '{index_path}', only version 2 is read")
+        if self._data[:4] != b"PACK":
+            raise GitError(f"Not a pack file: '{pack_path}'")
+
+        # Entry i of the fan-out table is the number of objects whose hash starts with <= i
+        self._fanout = struct.unpack_from(">256I", self._index, 8)
+        self._count = self._fanout[255]
+        names = 8 + 256 * 4
+        self._offsets = names + self._count * (_HASH_SIZE + 4)  # After the names and CRC32s
+        self._large_offsets = self._offsets + self._count * 4
+
+    def find(self, sha: bytes) -> int | None:
+        """Return the offset of an object in the pack, or None if it is not in it."""
+        first = sha[0]
+        low = self._fanout[first - 1] if first else 0
+        high = self._fanout[first]
+        index = self._index
+        names = 8 + 256 * 4
+        while low < high:
+            middle = (low + high) // 2
+            start = names + middle * _HASH_SIZE
+            name = index[start : start + _HASH_SIZE]
+            if name < sha:
+                low = middle + 1
+            elif name > sha:
+                high = middle
+            else:
+                offset = struct.unpack_from(">I", index, self._offsets + middle * 4)[0]
+                if offset & 0x80000000:
+                    # Packs over 2 GiB store the offset in the table of 8 byte offsets
+                    position = self._large_offsets + (offset & 0x7FFFFFFF) * 8
+                    offset = struct.unpack_from(">Q", index, position)[0]
+                return offset
+        return None
+
+    def find_prefix(self, prefix: str) -> list[str]:
+        """Return the hashes of the objects in the pack starting with a lowercase hex prefix."""
+        lowest = bytes.fromhex(prefix.ljust(2 * _HASH_SIZE, "0"))
+        first = lowest[0]
+        low = self._fanout[first - 1] if first else 0
+        high = self._fanout[first]
+        index = self._index
+        names = 8 + 256 * 4
+        while low < high:
+            middle = (low + high) // 2
+            start = names + middle * _HASH_SIZE
+            if index[start : start + _HASH_SIZE] < lowest:
+                low = middle + 1
+            else:
+                high = middle
+        matches = []
+        for position in range(low, self._fanout[first]):
+            start = names + position * _HASH_SIZE
+            sha = index[start : start + _HASH_SIZE].hex()
+            if not sha.startswith(prefix):
+                break
+            matches.append(sha)
+        return matches
+
+    def entry(self, offset: int) -> tuple[int, bytes, int | bytes | None]:
+        """Read the entry at an offset of the pack.
+
+        Returns:
+            tuple[int, bytes, int | bytes | None]: The type of the entry, its inflated data and
+                its delta base: the offset of the base for offset deltas, the hash of the base
+                for ref deltas, and None for whole objects.
+        """
+        data = self._data
+        byte = data[offset]
+        type = (byte >> 4) & 7
+        size = byte & 0x0F
+        shift = 4
+        position = offset + 1
+        while byte & 0x80:
+            byte = data[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+
+        base = None
+        if type == _OBJ_OFS_DELTA:
+            byte = data[position]
+            position += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = data[position]
+                position += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base = offset - distance
+        elif type == _OBJ_REF_DELTA:
+            base = data[position : position + _HASH_SIZE]
+            position += _HASH_SIZE
+
+        return type, _inflate(data, position, size), base
+
+    def close(self):
+        self._index.close()
+        self._data.close()
+
+
+def _inflate(data: mmap.mmap, position: int, size: int) -> bytes:
+    """Inflate a zlib stream of a known inflated size starting at a position of a pack."""
+    with memoryview(data) as view:
+        # Deflate rarely grows the data by more than a few bytes, so the stream almost always
+        # ends within this chunk. The bytes of the next entries after it are ignored.
+        try:
+            inflated = zlib.decompress(view[position : position + size + 64], bufsize=size or 1)
+        except zlib.error:
+            inflated = _inflate_stream(view, position)
+    if len(inflated) != size:
+        raise GitError(f"Corrupt object in pack file, expected {size} bytes, got {len(inflated)}")
+    return inflated
+
+
+def _inflate_stream(view: memoryview, position: int) -> bytes:
+    decompressor = zlib.decompressobj()
+    parts = []
+    while not decompressor.eof:
+        if position >= len(view):
+            raise GitError("Truncated object in pack file")
+        parts.append(decompressor.decompress(view[position : position + 64 * 1024]))
+        position += 64 * 1024
+    return b"".join(parts)
+
+
+def _delta_size(delta: bytes, position: int) -> tuple[int, int]:
+    size = shift = 0
+    while True:
+        byte = delta[position]
+        position += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, position
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Build an object from its delta base and the copy and insert instructions of a delta."""
+    source_size, position = _delta_size(delta, 0)
+    if source_size != len(base):
+        raise GitError(f"Corrupt delta, expected a base of {source_size} bytes, got {len(base)}")
+    target_size, position = _delta_size(delta, position)
+
+    target = bytearray()
+    end = len(delta)
+    while position < end:
+        command = delta[position]
+        position += 1
+        if command & 0x80:
+            # Copy from the base. The low bits say which bytes of the offset and size follow.
+            offset = size = 0
+            for bit in range(4):
+                if command & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            for bit in range(3):
+                if command & (0x10 << bit):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            target += base[offset : offset + (size or 0x10000)]
+        elif command:
+            # Insert the next `command` bytes of the delta
+            target += delta[position : position + command]
+            position += command
+        else:
+            raise GitError("Corrupt delta, found the reserved instruction 0")
+
+    if len(target) != target_size:
+        raise GitError(f"Corrupt delta, expected {target_size} bytes, got {len(target)}")
+    return bytes(target)
+
+
+def _parse_commit(data: bytes) -> tuple[list[str], int, str]:
+    """Return the parents, committer timestamp and message of a raw commit object."""
+    headers, _, message = data.partition(b"\n\n")
+    # The parent lines follow the tree line. Continuation lines of multi-line headers, like
+    # signatures, start with a space, so searching for "\n<name> " only finds real headers.
+    parents = []
+    start = headers.find(b"\nparent ")
+    while start != -1:
+        parents.append(headers[start + 8 : start + 48].decode())
+        start = headers.find(b"\nparent ", start + 48)
+
+    start = headers.find(b"\ncommitter ")
+    end = headers.find(b"\n", start + 1)
+    # "committer <name> <<email>> <timestamp> <timezone>"
+    timestamp = int(headers[start : end if end != -1 else None].rsplit(b" ", 2)[1])
+
+    start = headers.find(b"\nencoding ")
+    if start == -1:
+        return parents, timestamp, message.decode("utf-8", errors="replace").rstrip("\n")
+
+    end = headers.find(b"\n", start + 1)
+    encoding = headers[start + 10 : end if end != -1 else None].decode(errors="replace")
+    try:
+        text = message.decode(encoding, errors="replace")
+    except LookupError:
+        text = message.decode("utf-8", errors="replace")
+    return parents, timestamp, text.rstrip("\n")
+
+
+def _parse_author(data: bytes) -> str:
+    """Return the author of a raw commit object as "name <email>"."""
+    start = data.find(b"\nauthor ") + 8
+    end = data.find(b"\n", start)
+    # "author <name> <<email>> <timestamp> <timezone>"
+    return data[start:end].rsplit(b" ", 2)[0].decode("utf-8", errors="replace")
+
+
+class ObjectReader:
+    """Reads refs and objects straight from the files of a git directory.
+
+    The packs are memory-mapped when the first object is read and stay mapped until `close`.
+    Resolved delta bases are kept in an LRU cache, since consecutive commits are often stored as
+    deltas against the same bases.
+
+    Args:
+        git_dir (Path): The git directory, e.g. the `.git` directory of a worktree.
+        delta_cache_size (int): The maximum total size in bytes of the cached delta bases.
+            Defaults to `DEFAULT_DELTA_CACHE_SIZE`.
+
+    Raises:
+        GitError: If the repository uses a format this reader does not support.
+    """
+
+    def __init__(self, git_dir: Path, delta_cache_size: int = DEFAULT_DELTA_CACHE_SIZE):
+        self._git_dir = git_dir
+        # Linked worktrees share the refs and objects of the main git directory
+        common_dir = git_dir / "commondir"
+        if common_dir.is_file():
+            self._common_dir = (git_dir / common_dir.read_text().strip()).resolve()
+        else:
+            self._common_dir = git_dir
+        self._check_format()
+
+        self._object_dirs = _object_dirs(self._common_dir / "objects")
+        self._packs: list[_Pack] | None = None
+        self._packed_refs: dict[str, str] | None = None
+        self._delta_cache: OrderedDict[tuple[_Pack, int], tuple[int, bytes]] = OrderedDict()
+        self._delta_cache_bytes = 0
+        self._delta_cache_size = delta_cache_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmap the packs."""
+        for pack in self._packs or []:
+            pack.close()
+        self._packs = None
+        self._delta_cache.clear()
+        self._delta_cache_bytes = 0
+
+    def read_object(self, sha: str) -> tuple[str, bytes]:
+        """Return the type and the raw data of an object.
+
+        Raises:
+            GitError: If the object does not exist.
+        """
+        type, data = self._read(sha)
+        return _TYPE_NAMES[type], data
+
+    def resolve(self, revision: str) -> str:
+        """Resolve a revision to the hash of the commit it names.
+
+        Raises:
+            GitError: If the revision does not name a commit.
+        """
+        suffixes = _REVISION_SUFFIXES.search(revision)
+        name, suffixes = revision[: suffixes.start()], suffixes.group()
+        sha = self._resolve_name(name or "HEAD", revision)
+        if sha is None:
+            raise GitError(f"bad revision '{revision}'")
+        sha = self._peel(sha, revision)
+
+        for operator, count in re.findall(r"([~^])(\d*)", suffixes):
+            count = int(count) if count else 1
+            if operator == "~":
+                for _ in range(count):
+                    sha = self._parent(sha, 1, revision)
+            elif count:
+                sha = self._parent(sha, count, revision)
+        return sha
+
+    def refs(self) -> dict[str, str]:
+        """Return the hash every ref points to, keyed by full ref name and sorted by name."""
+        refs = dict(self._load_packed_refs())
+        refs_dir = self._common_dir / "refs"
+        for directory, _, files in os.walk(refs_dir):
+            for file in files:
+                path = Path(directory, file)
+                ref = path.relative_to(self._common_dir).as_posix()
+                sha = self._read_ref(ref)
+                if sha is not None:
+                    refs[ref] = sha
+        return dict(sorted(refs.items()))
+
+    def all_commits(self) -> list[str]:
+        """Return the commit of every ref and of HEAD, like `git log --all` walks them.
+
+        Refs to other objects, e.g. tags of trees, are left out.
+        """
+        commits = []
+        head = self._read_ref("HEAD")
+        for sha in [*self.refs().values(), *([head] if head else [])]:
+            type, data = self._read(sha)
+            while type == _OBJ_TAG:
+                sha = data[7:47].decode()
+                type, data = self._read(sha)
+            if type == _OBJ_COMMIT:
+                commits.append(sha)
+        return commits
+
+    def iter_commits(
+        self, include: list[str], exclude: list[str], details: bool = False
+    ) -> Iterator[GitCommit]:
+        """Walk the history like `git log`, newest commit date first.
+
+        Without exclusions the commits are yielded as they are read, so memory use only grows
+        with the number of commits waiting to be walked. Otherwise the walk has to reach the
+        excluded history before it knows which commits to yield, like git itself.
+
+        Args:
+            include (list[str]): The revisions whose history is walked.
+            exclude (list[str]): The revisions whose history is left out.
+            details (bool): Also read the author and the committer date of every commit.
+                Defaults to False.
+
+        Yields:
+            GitCommit: The commits reachable from `include` and not from `exclude`.
+        """
+        counter = itertools.count()
+        queue: list[tuple[int, int, str]] = []
+        # Parents and commit of the commits in the queue
+        queued: dict[str, tuple[list[str], GitCommit]] = {}
+        seen: set[str] = set()
+        # Only needed with exclusions, to propagate them to commits that were already walked
+        uninteresting: set[str] = set()
+        walked_parents: dict[str, list[str]] = {}
+        interesting_queued = 0
+
+        def push(sha: str):
+            nonlocal interesting_queued
+            seen.add(sha)
+            type, data = self._read(sha)
+            if type != _OBJ_COMMIT:
+                raise GitError(f"Object {sha} is a {_TYPE_NAMES[type]}, not a commit")
+            parents, timestamp, message = _parse_commit(data)
+            if details:
+                commit = GitCommit(sha, message, _parse_author(data), timestamp)
+            else:
+                commit = GitCommit(sha, message)
+            queued[sha] = (parents, commit)
+            heapq.heappush(queue, (-timestamp, next(counter), sha))
+            if sha in uninteresting:
+                # Like git, mark the parents as soon as they are known
+                for parent in parents:
+                    mark_uninteresting(parent)
+            else:
+                interesting_queued += 1
+
+        def mark_uninteresting(sha: str):
+            nonlocal interesting_queued
+            stack = [sha]
+            while stack:
+                sha = stack.pop()
+                if sha in uninteresting:
+                    continue
+                uninteresting.add(sha)
+                if sha in queued:
+                    interesting_queued -= 1
+                    stack.extend(queued[sha][0])
+                else:
+                    stack.extend(walked_parents.get(sha, ()))
+
+        for revision in exclude:
+            sha = self.resolve(revision)
+            mark_uninteresting(sha)
+            if sha not in seen:
+                push(sha)
+        for revision in include:
+            sha = self.resolve(revision)
+            if sha not in seen:
+                push(sha)
+
+        limited = bool(exclude)
+        walked: list[GitCommit] = []
+        slop = _SLOP
+        # Date of the last commit walked that is not excluded
+        last_date = math.inf
+        while queue:
+            negative_timestamp, _, sha = heapq.heappop(queue)
+            parents, commit = queued.pop(sha)
+            for parent in parents:
+                if parent not in seen:
+                    push(parent)
+            if sha not in uninteresting:
+                interesting_queued -= 1
+                last_date = -negative_timestamp
+                if limited:
+                    walked_parents[sha] = parents
+                    walked.append(commit)
+                else:
+                    yield commit
+                continue
+
+            # With exclusions, stop once only excluded history is left to walk. Like git, walk
+            # a few more excluded commits first, as a commit dated before its parent may still
+            # reach a walked commit
+            if not queue:
+                break
+            if interesting_queued or last_date <= -queue[0][0]:
+                slop = _SLOP
+            else:
+                slop -= 1
+                if not slop:
+                    break
+
+        # A commit walked early may have turned out to be reachable from an excluded one
+        for commit in walked:
+            if commit.sha not in uninteresting:
+                yield commit
+
+    def _check_format(self):
+        try:
+            config = (self._common_dir / "config").read_text(errors="replace")
+        except FileNotFoundError:
+            return
+        for line in config.splitlines():
+            key, _, value = line.partition("=")
+            key, value = key.strip().lower(), value.strip().lower()
+            if key == "objectformat" and value != "sha1":
+                raise GitError(f"The {value} object format is not supported, only sha1")
+            if key == "refstorage" and value != "files":
+                raise GitError(f"The {value} ref storage is not supported, only files")
+
+    def _read(self, sha: str) -> tuple[int, bytes]:
+        """Return the type code and the raw data of an object."""
+        binary = bytes.fromhex(sha)
+        located = self._locate(binary)
+        if located is None:
+            loose = self._read_loose(sha)
+            if loose is not None:
+                return loose
+            # A concurrent repack may have moved the object into a new pack
+            self.close()
+            located = self._locate(binary)
+            if located is None:
+                raise GitError(f"Object {sha} not found")
+        return self._read_packed(*located)
+
+    def _locate(self, sha: bytes) -> tuple[_Pack, int] | None:
+        if self._packs is None:
+            self._packs = _open_packs(self._object_dirs)
+        for pack in self._packs:
+            offset = pack.find(sha)
+            if offset is not None:
+                return pack, offset
+        return None
+
+    def _read_loose(self, sha: str) -> tuple[int, bytes] | None:
+        for objects in self._object_dirs:
+            try:
+                raw = zlib.decompress((objects / sha[:2] / sha[2:]).read_bytes())
+            except FileNotFoundError:
+                continue
+            # "<type> <size>\0<data>"
+            header, _, data = raw.partition(b"\0")
+            type, _, size = header.partition(b" ")
+            if int(size) != len(data):
+                raise GitError(f"Corrupt loose object {sha}")
+            return _TYPE_CODES[type.decode()], data
+        return None
+
+    def _read_packed(self, pack: _Pack, offset: int) -> tuple[int, bytes]:
+        """Read a pack entry, applying the deltas of its chain from the nearest cached base."""
+        deltas: list[tuple[_Pack, int, bytes]] = []
+        while True:
+            cached = self._delta_cache.get((pack, offset))
+            if cached is not None:
+                self._delta_cache.move_to_end((pack, offset))
+                type, data = cached
+                break
+
+            type, data, base = pack.entry(offset)
+            if type == _OBJ_OFS_DELTA:
+                deltas.append((pack, offset, data))
+                offset = base
+            elif type == _OBJ_REF_DELTA:
+                deltas.append((pack, offset, data))
+                located = self._locate(base)
+                if located is None:
+                    # The base of a thin pack may be a loose object, which is not cached
+                    type, data = self._read(base.hex())
+                    pack = None
+                    break
+                pack, offset = located
+            else:
+                break
+
+        # Cache the bases of the chain, as the next objects are likely deltas against them too
+        if deltas and pack is not None:
+            self._cache_base(pack, offset, type, data)
+        for index in range(len(deltas) - 1, -1, -1):
+            pack, offset, delta = deltas[index]
+            data = _apply_delta(data, delta)
+            if index:
+                self._cache_base(pack, offset, type, data)
+        return type, data
+
+    def _cache_base(self, pack: _Pack, offset: int, type: int, data: bytes):
+        if len(data) > self._delta_cache_size or (pack, offset) in self._delta_cache:
+            return
+        self._delta_cache[pack, offset] = (type, data)
+        self._delta_cache_bytes += len(data)
+        while self._delta_cache_bytes > self._delta_cache_size:
+            _, (_, evicted) = self._delta_cache.popitem(last=False)
+            self._delta_cache_bytes -= len(evicted)
+
+    def _resolve_name(self, name: str, revision: str) -> str | None:
+        if _HEX_SHA.fullmatch(name):
+            return name
+        # The same order git uses to disambiguate a short ref name
+        for ref in (
+            name,
+            f"refs/{name}",
+            f"refs/tags/{name}",
+            f"refs/heads/{name}",
+            f"refs/remotes/{name}",
+            f"refs/remotes/{name}/HEAD",
+        ):
+            sha = self._read_ref(ref)
+            if sha is not None:
+                return sha
+        if _SHORT_SHA.fullmatch(name):
+            return self._resolve_prefix(name, revision)
+        return None
+
+    def _resolve_prefix(self, prefix: str, revision: str) -> str | None:
+        """Return the object a unique abbreviated hash names, or None if there is none."""
+        if self._packs is None:
+            self._packs = _open_packs(self._object_dirs)
+        candidates = set()
+        for pack in self._packs:
+            candidates.update(pack.find_prefix(prefix))
+        for objects in self._object_dirs:
+            try:
+                files = os.listdir(objects / prefix[:2])
+            except FileNotFoundError:
+                continue
+            for file in files:
+                sha = prefix[:2] + file
+                if sha.startswith(prefix) and _HEX_SHA.fullmatch(sha):
+                    candidates.add(sha)
+        if len(candidates) > 1:
+            # Like git, prefer the objects a revision can name
+            candidates = {
+                sha for sha in candidates if self._read(sha)[0] in (_OBJ_COMMIT, _OBJ_TAG)
+            }
+        if len(candidates) > 1:
+            raise GitError(f"Short object ID {prefix} in '{revision}' is ambiguous")
+        return candidates.pop() if candidates else None
+
+    def _read_ref(self, ref: str, depth: int = 0) -> str | None:
+        """Return the hash a ref points to, following symbolic refs, or None if it is missing."""
+        if depth > 5:
+            raise GitError(f"Symbolic ref loop at '{ref}'")
+        # HEAD and the other pseudo refs belong to the worktree, everything under refs/ is shared
+        directory = self._common_dir if ref.startswith("refs/") else self._git_dir
+        try:
+            content = (directory / ref).read_text().strip()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return self._load_packed_refs().get(ref)
+
+        if content.startswith("ref:"):
+            return self._read_ref(content.removeprefix("ref:").strip(), depth + 1)
+        return content if _HEX_SHA.fullmatch(content) else None
+
+    def _load_packed_refs(self) -> dict[str, str]:
+        if self._packed_refs is None:
+            self._packed_refs = {}
+            try:
+                lines = (self._common_dir / "packed-refs").read_text().splitlines()
+            except FileNotFoundError:
+                lines = []
+            for line in lines:
+                # Skip the header and the "^<sha>" lines of peeled tags
+                if line and line[0] not in "#^":
+                    sha, _, ref = line.partition(" ")
+                    self._packed_refs[ref] = sha
+        return self._packed_refs
+
+    def _peel(self, sha: str, revision: str) -> str:
+        """Follow annotated tags to the commit they point to."""
+        type, data = self._read(sha)
+        while type == _OBJ_TAG:
+            # The first line of a tag is "object <sha>"
+            sha = data[7:47].decode()
+            type, data = self._read(sha)
+        if type != _OBJ_COMMIT:
+            raise GitError(f"'{revision}' is a {_TYPE_NAMES[type]}, not a commit")
+        return sha
+
+    def _parent(self, sha: str, number: int, revision: str) -> str:
+        parents = _parse_commit(self._read(sha)[1])[0]
+        if number > len(parents):
+            raise GitError(f"bad revision '{revision}'")
+        return parents[number - 1]
+
+
+def _object_dirs(objects: Path) -> list[Path]:
+    """Return the object directory and the alternate object directories it borrows from."""
+    dirs = [objects]
+    try:
+        alternates = (objects / "info" / "alternates").read_text().splitlines()
+    except FileNotFoundError:
+        alternates = []
+    for line in alternates:
+        if line and not line.startswith("#"):
+            dirs.append((objects / line).resolve())
+    return dirs
+
+
+def _open_packs(object_dirs: list[Path]) -> list[_Pack]:
+    packs = []
+    for objects in object_dirs:
+        for index_path in sorted((objects / "pack").glob("*.idx")):
+            pack_path = index_path.with_suffix(".pack")
+            if pack_path.exists():
+                packs.append(_Pack(index_path, pack_path))
+    logger.debug("Opened %d packs", len(packs))
+    return packs
+
+
+def iter_commits(
+    revisions: list[str] | None = None,
+    all_refs: bool = False,
+    cwd: Path | None = None,
+    details: bool = False,
+) -> Iterator[GitCommit]:
+    """Same as `comeit.git.iter_commits`, reading the objects of the repository directly.
+
+    Args:
+        revisions (list[str], optional): Revisions or ranges, e.g. `["main..HEAD"]`. Defaults
+            to `HEAD` when neither this nor `all_refs` is given.
+        all_refs (bool): Walk the history of all refs and HEAD. Defaults to False.
+        cwd (Path, optional): The repository to read from. Defaults to the current directory.
+        details (bool): Also read the author and the committer date of every commit. Defaults
+            to False.
+
+    Yields:
+        GitCommit: The commits in the order `git log` prints them.
+
+    Raises:
+        GitError: If a revision cannot be resolved, or the repository cannot be read.
+    """
+    include: list[str] = []
+    exclude: list[str] = []
+    for revision in revisions or []:
+        if "..." in revision:
+            raise GitError(f"Symmetric difference '{revision}' is not supported, use --reader git")
+        if ".." in revision:
+            start, _, end = revision.partition("..")
+            exclude.append(start or "HEAD")
+            include.append(end or "HEAD")
+        elif revision.startswith("^"):
+            exclude.append(revision[1:])
+        else:
+            include.append(revision)
+
+    with ObjectReader(find_git_dir(cwd)) as reader:
+        if all_refs:
+            include.extend(reader.all_commits())
+        elif not include:
+            include.append("HEAD")
+        yield from reader.iter_commits(include, exclude, details=details)
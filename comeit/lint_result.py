@@ -0,0 +1,46 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from .rules.rule_manager import NO_MESSAGES, RuleResult, RuleResults
+
+# The results of messages without failed rules, keyed by the id of their shared RuleResults. The
+# results keep their RuleResults alive, so the ids are not reused.
+_SHARED_RESULTS: dict[int, "LintResult"] = {}
+_MAX_SHARED = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class LintResult:
+    """The outcome of linting a single commit message.
+
+    Attributes:
+        results (Mapping[str, RuleResult]): The result of each rule, keyed by rule ID. Usually a
+            `RuleResults`, which stores the results as one byte per rule.
+        messages (dict[str, str]): The error message of each failed rule, keyed by rule ID.
+            Results without failed rules share the read-only `NO_MESSAGES`.
+        has_errors (bool): Whether any rule with severity ERROR failed.
+    """
+
+    results: Mapping[str, RuleResult]
+    messages: dict[str, str] = field(default_factory=lambda: NO_MESSAGES)
+    has_errors: bool = False
+
+    @classmethod
+    def of(cls, results: RuleResults, has_errors: bool) -> "LintResult":
+        """Return the outcome of a message with the given results.
+
+        Messages without failed rules get the same shared outcome for equal results, so linting
+        a long history keeps little more than its failures in memory.
+        """
+        if results.messages:
+            return cls(results, results.messages, has_errors)
+        shared = _SHARED_RESULTS.get(id(results))
+        if shared is None:
+            shared = cls(results, NO_MESSAGES)
+            if len(_SHARED_RESULTS) < _MAX_SHARED:
+                _SHARED_RESULTS[id(results)] = shared
+        return shared
+
+
+# The result of linting one message, or the error if the message could not be parsed
+LintOutcome = LintResult | ValueError
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+
+from . import trace
+from .checks.body import Body
+from .checks.footer import Footer
+from .checks.header import Header
+from .commit_message import parse_commit_message
+from .lint_result import LintOutcome, LintResult
+from .rules.rule import Rule
+from .rules.rule_creator import RuleCreator
+from .rules.rule_loader import RuleConfig, RuleLoader
+from .rules.rule_manager import DependencyPolicy, RuleManager
+from .rules.rule_profile import RuleProfile
+from .version import __version__
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 512
+
+
+class Linter:
+    """Lints commit messages against a rule set that is loaded and bound only once.
+
+    Loading the rules config and binding the rules to the checks is far more expensive than
+    running the checks, so a single `Linter` should be reused for as many messages as possible.
+    """
+
+    def __init__(
+        self,
+        types: set[str],
+        max_header_length: int,
+        user_rules_yml: Path | None = None,
+        rule_configs: list[RuleConfig] | None = None,
+        cache_path: Path | None = None,
+        cache_size: int | None = None,
+        profile: bool = False,
+        dependency_policy: DependencyPolicy = DependencyPolicy.SKIP,
+        threads: int = 1,
+    ):
+        """Args:
+        types (set[str]): The allowed commit types.
+        max_header_length (int): The maximum length of the header.
+        user_rules_yml (Path, optional): A config file overriding the default rules.
+            Defaults to None.
+        rule_configs (list[RuleConfig], optional): Already loaded rule configs. When given,
+            no config file is read. Defaults to None.
+        cache_path (Path, optional): A result cache to answer already linted messages from.
+            Defaults to None, which disables caching.
+        cache_size (int, optional): The number of results the cache keeps. Defaults to
+            `cache.DEFAULT_MAX_ENTRIES`.
+        profile (bool): Record the timings and results of every rule in `profile`. Results
+            answered from the cache are not recorded. Defaults to False.
+        dependency_policy (DependencyPolicy): Whether the dependents of a failed rule are
+            skipped or run. Defaults to `DependencyPolicy.SKIP`.
+        threads (int): The number of threads applying the independent rules of a message
+            concurrently. Defaults to 1. Call `close` to stop them.
+        """
+        if rule_configs is None:
+            with trace.span("load_rules"):
+                rule_configs = RuleLoader(user_rules_yml=user_rules_yml).load_rules()
+
+        self.fingerprint = _fingerprint(rule_configs, types, max_header_length, dependency_policy)
+        self._cache = None
+        if cache_path:
+            # Imported here, so sqlite3 is only loaded when caching is enabled
+            from .cache import DEFAULT_MAX_ENTRIES, ResultCache
+
+            self._cache = ResultCache(
+                cache_path,
+                fingerprint=self.fingerprint,
+                max_entries=cache_size or DEFAULT_MAX_ENTRIES,
+            )
+
+        header = Header(types=types, max_length=max_header_length)
+        rule_creator = RuleCreator(
+            rule_configs=rule_configs, header=header, body=Body(), footer=Footer()
+        )
+        with trace.span("create_rules"):
+            self.rules: dict[str, Rule] = rule_creator.create_rules()
+        self.profile: RuleProfile | None = RuleProfile() if profile else None
+        self._rule_manager = RuleManager(
+            self.rules, profile=self.profile, dependency_policy=dependency_policy, threads=threads
+        )
+
+    def lint(self, message: str) -> LintResult:
+        """Lint a single commit message.
+
+        Args:
+            message (str): The raw commit message.
+
+        Returns:
+            LintResult: The result of every rule.
+
+        Raises:
+            ValueError: If the commit message is empty.
+        """
+        if self._cache:
+            cached = self._cache.get(message)
+            if cached is not None:
+                return cached
+
+        with trace.span("parse_commit_message"):
+            commit_msg = parse_commit_message(message)
+        with trace.span("apply_rules"):
+            results = self._rule_manager.apply_rules(commit_msg)
+
+        messages = results.messages
+        has_errors = any(self.rules[rule_id].severity.is_error() for rule_id in messages)
+
+        lint_result = LintResult.of(results, has_errors)
+        if self._cache:
+            self._cache.put(message, lint_result)
+
+        return lint_result
+
+    def lint_batch(self, messages: list[str]) -> list[LintOutcome]:
+        """Lint a batch of commit messages at once.
+
+        Every rule is applied to all messages of the batch in one go, which lets checks with a
+        batch version process them in a tight loop. Cached results are taken from the cache and
+        only the remaining messages are linted.
+
+        Args:
+            messages (list[str]): The raw commit messages.
+
+        Returns:
+            list[LintResult | ValueError]: The result for each message, in the order of
+                `messages`, or the error if the message could not be parsed.
+        """
+        outcomes: list[LintOutcome | None] = [None] * len(messages)
+        pending = []
+        commit_msgs = []
+        with trace.span("parse_commit_message", messages=len(messages)):
+            for index, message in enumerate(messages):
+                if self._cache:
+                    outcomes[index] = self._cache.get(message)
+                    if outcomes[index] is not None:
+                        continue
+                try:
+                    commit_msgs.append(parse_commit_message(message))
+                except ValueError as e:
+                    outcomes[index] = e
+                    continue
+                pending.append(index)
+
+        with trace.span("apply_rules", messages=len(commit_msgs)):
+            batch = self._rule_manager.apply_rules_many(commit_msgs)
+
+        for index, results in zip(pending, batch):
+            failures = results.messages
+            has_errors = any(self.rules[rule_id].severity.is_error() for rule_id in failures)
+            outcomes[index] = LintResult.of(results, has_errors)
+            if self._cache:
+                self._cache.put(messages[index], outcomes[index])
+
+        return outcomes
+
+    def lint_many(
+        self, messages: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[LintResult]:
+        """Lint many commit messages, yielding each result as soon as its batch is ready.
+
+        Args:
+            messages (Iterable[str]): The raw commit messages.
+            batch_size (int): The number of messages linted together by `lint_batch`. Defaults to
+                `DEFAULT_BATCH_SIZE`.
+
+        Yields:
+            LintResult: The result for each message, in the order of `messages`.
+
+        Raises:
+            ValueError: If a commit message is empty.
+        """
+        iterator = iter(messages)
+        while batch := list(islice(iterator, batch_size)):
+            for outcome in self.lint_batch(batch):
+                if isinstance(outcome, ValueError):
+                    raise outcome
+                yield outcome
+
+    def close(self):
+        """Stop the rule threads, and evict old results from the cache and close it."""
+        self._rule_manager.close()
+        if self._cache:
+            self._cache.evict()
+            self._cache.close()
+            self._cache = None
+
+
+def _fingerprint(
+    rule_configs: list[RuleConfig],
+    types: set[str],
+    max_header_length: int,
+    dependency_policy: DependencyPolicy,
+) -> str:
+    """Hash everything that affects the result of linting a message.
+
+    This covers the effective rules after overrides, the settings of the checks and the version,
+    since a new version may change the checks themselves.
+    """
+    effective_config = {
+        "version": __version__,
+        "types": sorted(types),
+        "max_header_length": max_header_length,
+        "dependency_policy": dependency_policy.value,
+        "rules": [
+            [
+                config.id,
+                config.check,
+                config.component.value,
+                config.severity.value,
+                config.dependencies,
+            ]
+            for config in rule_configs
+        ],
+    }
+    return hashlib.sha256(json.dumps(effective_config).encode()).hexdigest()
@@ -0,0 +1,469 @@
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, TextIO
+
+from .git import GitCommit
+from .lint_result import LintOutcome, LintResult
+from .rules.rule import Rule
+from .version import __version__
+
+if TYPE_CHECKING:
+    from collections import Counter
+
+    from .scan import RepoScan, ScanSummary
+    from .stats import HistoryStats
+
+FORMATS = ["rich", "plain", "jsonl", "sarif"]
+
+# The formats that can report the scan and stats commands
+AGGREGATE_FORMATS = ["rich", "plain", "jsonl"]
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+class Report(ABC):
+    """Writes lint results in one of the output formats.
+
+    Args:
+        rules (dict[str, Rule]): The rules the results were produced with.
+        stream (TextIO, optional): Where to write the report. Defaults to stdout.
+    """
+
+    def __init__(self, rules: dict[str, Rule], stream: TextIO | None = None):
+        self._rules = rules
+        self._stream = stream or sys.stdout
+
+    @abstractmethod
+    def message(self, lint_result: LintResult):
+        """Report the result of every rule for a single commit message."""
+
+    @abstractmethod
+    def commit(self, commit: GitCommit, outcome: LintOutcome):
+        """Report a commit of a history scan. Text formats only show commits with failed rules."""
+
+    def summary(self, checked: int, failed: int):
+        """Report the totals of a history scan."""
+        self._stream.write(f"Checked {checked} commits, {failed} failed.\n")
+
+
+class AggregateReport(Report):
+    """A report that can also write the totals of a fleet scan and the stats of a history.
+
+    SARIF results point at a location, and these totals have none, so only the formats in
+    `AGGREGATE_FORMATS` implement them.
+    """
+
+    @abstractmethod
+    def repo(self, scan: "RepoScan"):
+        """Report a repository of a fleet scan, as soon as all its commits are linted."""
+
+    @abstractmethod
+    def scan_summary(self, summary: "ScanSummary"):
+        """Report the failures of each rule and the totals of a fleet scan."""
+
+    @abstractmethod
+    def history_stats(self, stats: "HistoryStats", top: int):
+        """Report the failures of each rule, month, author and type of a history."""
+
+    def _rule_rows(self, rule_failures: "Counter[str]") -> list[tuple[str, str, int]]:
+        """The rules that failed with their descriptions, most failures first."""
+        return [
+            (rule_id, self._rules[rule_id].description if rule_id in self._rules else "", count)
+            for rule_id, count in rule_failures.most_common()
+        ]
+
+    def _scan_lines(self, summary: "ScanSummary") -> tuple[list[tuple[str, str, int]], str]:
+        """The rules that failed, most failures first, and a line with the totals of a scan."""
+        rules = self._rule_rows(summary.total.rule_failures)
+        total = summary.total
+        line = (
+            f"Scanned {len(summary.repos)} repositories, {total.checked} commits, "
+            f"{total.failed} failed."
+        )
+        if summary.errors:
+            line += f" {summary.errors} repositories could not be scanned."
+        return rules, line
+
+
+class PlainReport(AggregateReport):
+    """Plain text without colors. It does not need `rich`, so it is the fastest to start."""
+
+    def message(self, lint_result: LintResult):
+        for rule_id, message in lint_result.messages.items():
+            rule = self._rules[rule_id]
+            status = "❌ Error  " if rule.severity.is_error() else "🚧 Warning"
+            self._stream.write(f"{status} {rule_id} - {rule.description}: {message}\n")
+
+    def commit(self, commit: GitCommit, outcome: LintOutcome):
+        short_sha = commit.sha[:7]
+        if isinstance(outcome, ValueError):
+            self._stream.write(f"❌ {short_sha} {outcome}\n")
+            return
+
+        if not outcome.messages:
+            return
+
+        header = commit.message.partition("\n")[0]
+        self._stream.write(f"{'❌' if outcome.has_errors else '🚧'} {short_sha} {header}\n")
+        for rule_id, message in outcome.messages.items():
+            severity = "Error  " if self._rules[rule_id].severity.is_error() else "Warning"
+            self._stream.write(f"{' ' * 10}{severity} {rule_id} - {message}\n")
+
+    def repo(self, scan: "RepoScan"):
+        if scan.error is not None:
+            self._stream.write(f"❌ {scan.path}: {scan.error}\n")
+            return
+        stats = scan.stats
+        status = "❌" if stats.failed else "✅"
+        self._stream.write(
+            f"{status} {scan.path}: {stats.checked} commits, {stats.failed} failed\n"
+        )
+        self._stream.flush()
+
+    def scan_summary(self, summary: "ScanSummary"):
+        rules, line = self._scan_lines(summary)
+        for rule_id, description, count in rules:
+            self._stream.write(f"{count:>10} {rule_id} - {description}\n")
+        self._stream.write(f"{line}\n")
+
+    def history_stats(self, stats: "HistoryStats", top: int):
+        write = self._stream.write
+        write("Rule failures:\n")
+        for rule_id, description, count in self._rule_rows(stats.rule_failures):
+            write(f"{count:>10} {rule_id} - {description}\n")
+        write("Commits per month (checked, failed):\n")
+        for month, (checked, failed) in sorted(stats.months.items()):
+            write(f"{month:>10} {checked:>8} {failed:>8}\n")
+        for title, sketch in (("authors", stats.authors), ("types", stats.types)):
+            write(f"Top {title} of failed commits:\n")
+            for item, count, error in sketch.top(top):
+                write(f"{count:>10} {item}{f' (up to {error} too many)' if error else ''}\n")
+        write(f"Checked {stats.checked} commits, {stats.failed} failed.\n")
+
+
+class RichReport(AggregateReport):
+    """Colored output and a table of all rules for a single message."""
+
+    def __init__(self, rules: dict[str, Rule], stream: TextIO | None = None):
+        super().__init__(rules, stream)
+        # Imported here, since importing rich takes longer than linting a message
+        from rich.console import Console
+        from rich.markup import escape
+
+        self._console = Console(file=stream)
+        self._escape = escape
+
+    def message(self, lint_result: LintResult):
+        from rich.table import Table
+
+        escape = self._escape
+
+        table = Table(title="Rules Summary")
+        table.add_column("Rule", justify="left")
+        table.add_column("Pass", justify="center")
+        # table.add_column("Severity", justify="center")
+        table.add_column("Description", justify="left")
+        for rule_id, result in lint_result.results.items():
+            rule = self._rules[rule_id]
+
+            if result.is_success():
+                status = "✅"
+            elif result.is_failed():
+                status = "❌"
+            elif result.is_ignored():
+                status = "👻"
+            elif result.is_skipped():
+                status = "⏭️"
+            else:
+                raise ValueError(f"Unknown {result=}")
+
+            # Warnings are always pass
+            if rule.severity.is_warning():
+                status = "🚧"
+
+            rule_name = (
+                f"{rule.component.value.title()} {rule.check.__name__.replace('_', ' ').title()}"
+            )
+            table.add_row(f"{rule_id} - {rule_name}", status, escape(rule.description))
+
+            if result.is_failed() and rule.severity.is_error():
+                table.add_row(
+                    f"[bold red]{' ' * 7}Error[/bold red]",
+                    "",
+                    f"[bold red]  {escape(lint_result.messages[rule_id])}[/bold red]",
+                )
+            elif result.is_failed() and rule.severity.is_warning():
+                table.add_row(
+                    f"[bold yellow]{' ' * 7}Warning[/bold yellow]",
+                    "",
+                    f"[bold yellow]  {escape(lint_result.messages[rule_id])}[/bold yellow]",
+                )
+
+        self._console.print(table)
+
+    def commit(self, commit: GitCommit, outcome: LintOutcome):
+        escape = self._escape
+        short_sha = commit.sha[:7]
+        if isinstance(outcome, ValueError):
+            self._console.print(
+                f"❌ {short_sha} [bold red]{escape(str(outcome))}[/bold red]", highlight=False
+            )
+            return
+
+        if not outcome.messages:
+            return
+
+        header = commit.message.partition("\n")[0]
+        self._console.print(
+            f"{'❌' if outcome.has_errors else '🚧'} {short_sha} {escape(header)}",
+            highlight=False,
+        )
+        for rule_id, message in outcome.messages.items():
+            color = "red" if self._rules[rule_id].severity.is_error() else "yellow"
+            self._console.print(
+                f"[{color}]{' ' * 10}{rule_id} - {escape(message)}[/{color}]", highlight=False
+            )
+
+    def summary(self, checked: int, failed: int):
+        self._console.print(f"Checked {checked} commits, {failed} failed.")
+
+    def repo(self, scan: "RepoScan"):
+        escape = self._escape
+        if scan.error is not None:
+            self._console.print(
+                f"❌ {escape(str(scan.path))} [bold red]{escape(scan.error)}[/bold red]",
+                highlight=False,
+            )
+            return
+        stats = scan.stats
+        status = "❌" if stats.failed else "✅"
+        self._console.print(
+            f"{status} {escape(str(scan.path))}: {stats.checked} commits, {stats.failed} failed",
+            highlight=False,
+        )
+
+    def scan_summary(self, summary: "ScanSummary"):
+        from rich.table import Table
+
+        rules, line = self._scan_lines(summary)
+        table = Table(title="Rule Failures")
+        table.add_column("Rule", justify="left")
+        table.add_column("Commits", justify="right")
+        table.add_column("Description", justify="left")
+        for rule_id, description, count in rules:
+            table.add_row(rule_id, str(count), self._escape(description))
+        self._console.print(table)
+        self._console.print(line)
+
+    def history_stats(self, stats: "HistoryStats", top: int):
+        from rich.table import Table
+
+        escape = self._escape
+        table = Table(title="Rule Failures")
+        table.add_column("Rule", justify="left")
+        table.add_column("Commits", justify="right")
+        table.add_column("Description", justify="left")
+        for rule_id, description, count in self._rule_rows(stats.rule_failures):
+            table.add_row(rule_id, str(count), escape(description))
+        self._console.print(table)
+
+        table = Table(title="Commits per Month")
+        table.add_column("Month", justify="left")
+        table.add_column("Checked", justify="right")
+        table.add_column("Failed", justify="right")
+        for month, (checked, failed) in sorted(stats.months.items()):
+            table.add_row(month, str(checked), str(failed))
+        self._console.print(table)
+
+        for title, sketch in (("Authors", stats.authors), ("Types", stats.types)):
+            table = Table(title=f"Top {title} of Failed Commits")
+            table.add_column(title[:-1], justify="left")
+            table.add_column("Failed", justify="right")
+            table.add_column("Overestimate", justify="right")
+            for item, count, error in sketch.top(top):
+                table.add_row(escape(item), str(count), str(error))
+            self._console.print(table)
+
+        self._console.print(f"Checked {stats.checked} commits, {stats.failed} failed.")
+
+
+class JsonlReport(AggregateReport):
+    """One JSON object per line, written and flushed as soon as each result is known.
+
+    Every commit gets a record, including the ones without failed rules, so the records of a
+    history scan can be counted and joined by sha. Nothing is kept between records, so memory use
+    does not grow with the number of commits.
+    """
+
+    def message(self, lint_result: LintResult):
+        self._write({"type": "message", **self._result(lint_result)})
+
+    def commit(self, commit: GitCommit, outcome: LintOutcome):
+        record = {"type": "commit", "sha": commit.sha, "header": commit.message.partition("\n")[0]}
+        if isinstance(outcome, ValueError):
+            record.update(ok=False, error=str(outcome))
+        else:
+            record.update(self._result(outcome))
+        self._write(record)
+
+    def summary(self, checked: int, failed: int):
+        self._write({"type": "summary", "checked": checked, "failed": failed})
+
+    def repo(self, scan: "RepoScan"):
+        record = {
+            "type": "repo",
+            "path": str(scan.path),
+            "config": str(scan.config) if scan.config else None,
+            **self._stats(scan.stats),
+        }
+        if scan.error is not None:
+            record["error"] = scan.error
+        self._write(record)
+
+    def scan_summary(self, summary: "ScanSummary"):
+        self._write(
+            {
+                "type": "scan_summary",
+                "repositories": len(summary.repos),
+                "errors": summary.errors,
+                **self._stats(summary.total),
+            }
+        )
+
+    def history_stats(self, stats: "HistoryStats", top: int):
+        self._write(
+            {
+                "type": "stats",
+                "checked": stats.checked,
+                "failed": stats.failed,
+                "rules": dict(stats.rule_failures.most_common()),
+                "months": {
+                    month: {"checked": checked, "failed": failed}
+                    for month, (checked, failed) in sorted(stats.months.items())
+                },
+                "authors": self._top(stats.authors, top),
+                "types": self._top(stats.types, top),
+            }
+        )
+
+    def _top(self, sketch, top: int) -> list[dict]:
+        return [
+            {"name": item, "failed": count, "overestimate": error}
+            for item, count, error in sketch.top(top)
+        ]
+
+    def _stats(self, stats) -> dict:
+        return {
+            "checked": stats.checked,
+            "failed": stats.failed,
+            "invalid": stats.invalid,
+            "rules": dict(stats.rule_failures.most_common()),
+        }
+
+    def _result(self, lint_result: LintResult) -> dict:
+        return {
+            "ok": not lint_result.has_errors,
+            "violations": [
+                {
+                    "rule": rule_id,
+                    "severity": self._rules[rule_id].severity.value,
+                    "description": self._rules[rule_id].description,
+                    "message": message,
+                }
+                for rule_id, message in lint_result.messages.items()
+            ],
+        }
+
+    def _write(self, record: dict):
+        self._stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._stream.flush()  # Lets a log pipeline reading from a pipe see every record at once
+
+
+class SarifReport(Report):
+    """A SARIF 2.1.0 log with one result per failed rule of each commit.
+
+    The log is streamed: the header is written before the first result, every result is written
+    as soon as it is known and `summary` closes the document. Commits are identified by logical
+    locations, since a commit message has no file to point to.
+    """
+
+    def __init__(self, rules: dict[str, Rule], stream: TextIO | None = None):
+        super().__init__(rules, stream)
+        self._started = False
+        self._first_result = True
+
+    def message(self, lint_result: LintResult):
+        for rule_id, message in lint_result.messages.items():
+            self._write_result(self._result(rule_id, message))
+        self._end()
+
+    def commit(self, commit: GitCommit, outcome: LintOutcome):
+        location = {
+            "logicalLocations": [{"name": commit.sha[:7], "fullyQualifiedName": commit.sha}]
+        }
+        if isinstance(outcome, ValueError):
+            result = {"level": "error", "message": {"text": str(outcome)}}
+            self._write_result({**result, "locations": [location]})
+            return
+
+        for rule_id, message in outcome.messages.items():
+            self._write_result({**self._result(rule_id, message), "locations": [location]})
+
+    def summary(self, checked: int, failed: int):
+        self._end(properties={"checked": checked, "failed": failed})
+
+    def _result(self, rule_id: str, message: str) -> dict:
+        return {
+            "ruleId": rule_id,
+            "level": "error" if self._rules[rule_id].severity.is_error() else "warning",
+            "message": {"text": message},
+        }
+
+    def _start(self):
+        driver = {
+            "name": "comeit",
+            "version": __version__,
+            "informationUri": "https://github.com/mariugul/comeit",
+            "rules": [
+                {"id": rule_id, "shortDescription": {"text": rule.description}}
+                for rule_id, rule in self._rules.items()
+            ],
+        }
+        # The document is left open after the start of the results, and closed by _end()
+        self._stream.write(
+            f'{{"version": "2.1.0", "$schema": "{SARIF_SCHEMA}", '
+            f'"runs": [{{"tool": {{"driver": {json.dumps(driver, ensure_ascii=False)}}}, '
+            '"results": [\n'
+        )
+        self._started = True
+
+    def _write_result(self, result: dict):
+        if not self._started:
+            self._start()
+        if not self._first_result:
+            self._stream.write(",\n")
+        self._first_result = False
+        self._stream.write(json.dumps(result, ensure_ascii=False))
+
+    def _end(self, properties: dict | None = None):
+        if not self._started:
+            self._start()
+        properties = f', "properties": {json.dumps(properties)}' if properties else ""
+        self._stream.write(f"\n]{properties}}}]}}\n")
+        self._stream.flush()
+        self._started = False
+        self._first_result = True
+
+
+def create_report(format: str, rules: dict[str, Rule], stream: TextIO | None = None) -> Report:
+    """Create the report for one of `FORMATS`."""
+    if format == "plain":
+        return PlainReport(rules, stream)
+    if format == "rich":
+        return RichReport(rules, stream)
+    if format == "jsonl":
+        return JsonlReport(rules, stream)
+    if format == "sarif":
+        return SarifReport(rules, stream)
+    raise ValueError(f"Unknown output format '{format}'. Choose from {FORMATS}")
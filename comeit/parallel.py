@@ -0,0 +1,154 @@
+import logging
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any
+
+from . import trace
+from .git import GitCommit
+from .lint_result import LintOutcome, LintResult
+from .linter import DEFAULT_BATCH_SIZE, Linter
+from .rules.rule_manager import NO_MESSAGES, RuleResults, decode_results, encode_results
+from .rules.rule_profile import RuleProfile
+
+logger = logging.getLogger(__name__)
+
+# The linter of a worker process. It is created once by `_init_worker` and reused for every batch
+# the worker receives, so the rules are loaded and bound once per process.
+_worker_linter: Linter | None = None
+
+
+def lint_commits(
+    linter: Linter, commits: Iterable[GitCommit], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[tuple[GitCommit, LintOutcome]]:
+    """Lint commits in batches in the current process.
+
+    Args:
+        linter (Linter): The linter to apply to every commit.
+        commits (Iterable[GitCommit]): The commits to lint.
+        batch_size (int): The number of messages linted together. Defaults to
+            `DEFAULT_BATCH_SIZE`.
+
+    Yields:
+        tuple[GitCommit, LintResult | ValueError]: Each commit with its result, or the error if
+            the message could not be parsed.
+    """
+    batches = _batched(commits, batch_size)
+    while True:
+        with trace.span("read_commits"):
+            batch = next(batches, None)
+        if batch is None:
+            return
+        yield from zip(batch, linter.lint_batch([commit.message for commit in batch]))
+
+
+def lint_commits_parallel(
+    commits: Iterable[GitCommit],
+    jobs: int,
+    linter_kwargs: dict[str, Any],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    profile: RuleProfile | None = None,
+) -> Iterator[tuple[GitCommit, LintOutcome]]:
+    """Lint commits in batches across a pool of worker processes.
+
+    Only a bounded number of batches is in flight at any time, so memory use does not grow with
+    the number of commits. Results are yielded in the same order as `commits`.
+
+    Args:
+        commits (Iterable[GitCommit]): The commits to lint.
+        jobs (int): The number of worker processes.
+        linter_kwargs (dict[str, Any]): The arguments each worker creates its `Linter` with.
+        batch_size (int): The number of messages sent to a worker at a time. Defaults to
+            `DEFAULT_BATCH_SIZE`.
+        profile (RuleProfile, optional): Collects the rule stats of the workers. The workers
+            must be profiling, i.e. `linter_kwargs` must enable `profile`. Defaults to None.
+
+    Yields:
+        tuple[GitCommit, LintResult | ValueError]: Each commit with its result, or the error if
+            the message could not be parsed.
+    """
+    max_pending = 2 * jobs  # Keeps every worker busy while the next batch is being read
+    pending: deque[tuple[list[GitCommit], Future]] = deque()
+
+    logger.debug("Linting with %d processes in batches of %d", jobs, batch_size)
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(linter_kwargs,)
+    ) as executor:
+        batches = _batched(commits, batch_size)
+        while True:
+            with trace.span("read_commits"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            future = executor.submit(_lint_batch, [commit.message for commit in batch])
+            pending.append((batch, future))
+
+            if len(pending) >= max_pending:
+                yield from _collect(*pending.popleft(), profile)
+
+        while pending:
+            yield from _collect(*pending.popleft(), profile)
+
+
+def _init_worker(linter_kwargs: dict[str, Any]):
+    global _worker_linter
+    _worker_linter = Linter(**linter_kwargs)
+
+
+def _lint_batch(messages: list[str]) -> tuple[tuple, RuleProfile | None]:
+    outcomes = _worker_linter.lint_batch(messages)
+    # Only the stats of this batch are sent back, so the parent can add up every batch
+    profile = _worker_linter.profile.take() if _worker_linter.profile else None
+    return _pack(outcomes), profile
+
+
+def _pack(outcomes: list[LintOutcome]) -> tuple[tuple[str, ...], bytes, list]:
+    """Pack the outcomes of a batch into little more than a byte per rule and commit.
+
+    Unpickling is done by the parent alone, so it bounds how fast the workers can be fed. The
+    results are sent with `encode_results`, and each commit only adds None, or its failures and
+    whether they are errors. Any other outcome, e.g. a ValueError, is pickled as is.
+    """
+    results = []
+    entries = []
+    for outcome in outcomes:
+        if isinstance(outcome, LintResult) and isinstance(outcome.results, RuleResults):
+            results.append(outcome.results)
+            entries.append((outcome.messages, outcome.has_errors) if outcome.messages else None)
+        else:
+            entries.append(outcome)
+    return (*encode_results(results), entries)
+
+
+def _unpack(rule_ids: tuple[str, ...], codes: bytes, entries: list) -> list[LintOutcome]:
+    messages = [
+        entry[0] if entry else NO_MESSAGES
+        for entry in entries
+        if entry is None or type(entry) is tuple
+    ]
+    results = iter(decode_results(rule_ids, codes, messages))
+    outcomes = []
+    for entry in entries:
+        if entry is None or type(entry) is tuple:
+            result = next(results)
+            outcomes.append(LintResult.of(result, entry[1] if entry else False))
+        else:
+            outcomes.append(entry)
+    return outcomes
+
+
+def _collect(
+    batch: list[GitCommit], future: Future, profile: RuleProfile | None
+) -> Iterator[tuple[GitCommit, LintOutcome]]:
+    with trace.span("wait_for_workers"):
+        packed, batch_profile = future.result()
+    if profile is not None and batch_profile is not None:
+        profile.merge(batch_profile)
+    yield from zip(batch, _unpack(*packed))
+
+
+def _batched(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -9,9 +9,56 @@ from comeit import LogLevel
 class ConfigArgs(argparse.Namespace):
     config_file: str
     log_level: LogLevel
+    rev_range: str | None
+    all: bool
+    incremental: bool
+    watermark_on_failure: str
+    jobs: int
+    reader: str
+    rule_threads: int
+    cache: bool
+    cache_size: int
+    format: str
+    on_dependency_failure: str
+    profile: str | None
+    trace: Path | None
+    command: str | None
+    socket: Path | None
+    max_commits: int | None
+    timeout: float | None
+    paths: list[Path] | None
+    top: int | None
+    shard: tuple[int, int] | None
+    partial: Path | None
+    partials: list[Path] | None
 
 
-def parse_args():
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {number}")
+    return number
+
+
+def _shard(value: str) -> tuple[int, int]:
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be I/N, e.g. 1/4, got {value!r}") from None
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"must be I/N with 1 <= I <= N, got {value!r}")
+    return index, count
+
+
+def parse_args(args: list[str] | None = None) -> ConfigArgs:
     parser = argparse.ArgumentParser(description="Process a configuration file.")
 
     parser.add_argument(
@@ -29,4 +76,210 @@ def parse_args():
         help="Set the logging level. Defaults to WARNING.",
     )
 
-    return parser.parse_args(namespace=ConfigArgs)
+    history = parser.add_mutually_exclusive_group()
+    history.add_argument(
+        "--range",
+        dest="rev_range",
+        metavar="A..B",
+        help="Lint every commit message in the given git revision range, e.g. 'main..HEAD'.",
+    )
+    history.add_argument(
+        "--all",
+        action="store_true",
+        help="Lint every commit message reachable from any ref in the repository.",
+    )
+    history.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Lint only the commits added to the current branch since the last run. Falls back "
+        "to the merge base after a force push or rebase. See --watermark-on-failure.",
+    )
+
+    parser.add_argument(
+        "--watermark-on-failure",
+        choices=["advance", "keep"],
+        default="keep",
+        help="What happens to the watermark of --incremental when a commit fails with an error. "
+        "'keep' leaves it, so the failing commits are linted and fail again on every run until "
+        "the history is fixed. 'advance' moves it to HEAD once the failures are reported, so the "
+        "next run only lints newer commits. Defaults to keep.",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="Number of processes linting the commits of --range, --all or --incremental in "
+        "parallel. "
+        "Defaults to 1.",
+    )
+
+    parser.add_argument(
+        "--reader",
+        choices=["git", "python"],
+        default="git",
+        help="How --range, --all and --incremental read the commits. 'git' streams them out of "
+        "a git log process. 'python' reads the object files of the repository directly, which "
+        "avoids starting git, but only supports plain ranges of SHA-1 repositories. "
+        "Defaults to git.",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=_shard,
+        metavar="I/N",
+        help="Lint only the I-th of N parts of the history of --range or --all, e.g. 2/4, so N "
+        "runners can share it. Every commit belongs to one part by its hash.",
+    )
+
+    parser.add_argument(
+        "--partial",
+        type=Path,
+        metavar="PATH",
+        help="Also write the results of --shard to a compressed file at PATH, which the merge "
+        "command combines with the other shards.",
+    )
+
+    parser.add_argument(
+        "--rule-threads",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="Number of threads applying the rules of a message that do not depend on each "
+        "other concurrently. Only helps with slow checks that wait on I/O. Defaults to 1.",
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Cache the results in the git directory, so unchanged commit messages are not "
+        "linted again. Changing the rules or their config invalidates the cache.",
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=_positive_int,
+        metavar="N",
+        help="Maximum number of results kept in the cache. Defaults to 200000.",
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["rich", "plain", "jsonl", "sarif"],
+        default="rich",
+        help="Output format. 'plain' is uncolored text and starts faster, since it does not "
+        "load rich. 'jsonl' writes a JSON record per commit and 'sarif' a SARIF 2.1.0 log, both "
+        "streamed as the commits are linted. Defaults to rich.",
+    )
+
+    parser.add_argument(
+        "--on-dependency-failure",
+        choices=["skip", "run"],
+        default="skip",
+        help="What happens to the rules depending on a failed rule. 'skip' reports them as "
+        "skipped, so only the root cause is shown. 'run' applies them anyway. Defaults to skip.",
+    )
+
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        help="Print the number of calls, time spent and results of every rule to stderr, as a "
+        "table sorted by total time or as JSON. Defaults to table when given without a value.",
+    )
+
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="PATH",
+        help="Write the time spent in each stage of the run to a Chrome trace-event JSON file, "
+        "which can be opened in https://ui.perfetto.dev or chrome://tracing.",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", title="commands")
+
+    serve = subparsers.add_parser(
+        "serve",
+        help="Run a daemon that keeps the rules loaded and lints the messages sent by "
+        "comeit-client.",
+    )
+    serve.add_argument(
+        "--socket",
+        type=Path,
+        help="Unix socket to listen on. Defaults to .git/comeit/daemon.sock.",
+    )
+
+    pre_receive = subparsers.add_parser(
+        "pre-receive",
+        help="Lint the commits of a push on the git server. Reads the '<old> <new> <ref>' lines "
+        "of a pre-receive hook from stdin and exits with 1 to reject the push.",
+    )
+    pre_receive.add_argument(
+        "--max-commits",
+        type=_positive_int,
+        metavar="N",
+        help="Reject pushes adding more than N commits, to bound the time the hook takes. "
+        "Defaults to no limit.",
+    )
+    pre_receive.add_argument(
+        "--timeout",
+        type=_positive_float,
+        metavar="SECONDS",
+        help="Reject the push if linting its commits takes longer than this, e.g. to stay within "
+        "the push timeout of the server. Defaults to no limit.",
+    )
+
+    scan = subparsers.add_parser(
+        "scan",
+        help="Lint the history of many repositories in one pool of --jobs processes, and report "
+        "the failures of each repository and rule. Uses --all and --reader.",
+    )
+    scan.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="A repository, a directory searched for repositories, or a file listing a "
+        "repository per line. Each repository is linted with its own comeit_config.yml if it "
+        "has one, otherwise with --config-file.",
+    )
+
+    stats = subparsers.add_parser(
+        "stats",
+        help="Lint the history of --range or --all, or of HEAD, and report the failures of each "
+        "rule and month and the authors and types failing most, instead of every commit. Memory "
+        "use does not grow with the length of the history. Uses --jobs and --reader.",
+    )
+    stats.add_argument(
+        "--top",
+        type=_positive_int,
+        default=10,
+        metavar="K",
+        help="Number of authors and types to report. The counts of the top ones are estimated "
+        "in bounded memory, and may be too high by the reported overestimate. Defaults to 10.",
+    )
+
+    merge = subparsers.add_parser(
+        "merge",
+        help="Combine the --partial files of every --shard of a run into the report and exit code "
+        "of an unsharded run. Needs the same --config-file as the shards.",
+    )
+    merge.add_argument(
+        "partials",
+        nargs="+",
+        type=Path,
+        metavar="PARTIAL",
+        help="The partial result file of a shard.",
+    )
+
+    # The options of the commands are set on every run, so ConfigArgs gets all its fields
+    parser.set_defaults(
+        socket=None, max_commits=None, timeout=None, paths=None, top=None, partials=None
+    )
+    namespace = parser.parse_args(args)
+    # SARIF results point at a commit, and the totals of scan and stats have none
+    if namespace.format == "sarif" and namespace.command in ("scan", "stats"):
+        parser.error(f"the {namespace.command} command does not support --format sarif")
+    return ConfigArgs(**vars(namespace))
@@ -0,0 +1,91 @@
+import logging
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+from .git import GitCommit, iter_commits
+
+logger = logging.getLogger(__name__)
+
+
+class RefUpdate(NamedTuple):
+    """A ref update of a push, as git passes it to the pre-receive hook.
+
+    Attributes:
+        old (str): The commit the ref pointed to, or all zeros if the ref is created.
+        new (str): The commit the ref will point to, or all zeros if the ref is deleted.
+        ref (str): The full name of the ref, e.g. `refs/heads/main`.
+    """
+
+    old: str
+    new: str
+    ref: str
+
+
+def _is_null(sha: str) -> bool:
+    return not sha.strip("0")
+
+
+def parse_ref_updates(lines: Iterable[str]) -> list[RefUpdate]:
+    """Parse the `<old> <new> <ref>` lines git writes to the stdin of the pre-receive hook.
+
+    Raises:
+        ValueError: If a line is not a ref update.
+    """
+    updates = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            old, new, ref = line.split()
+        except ValueError:
+            raise ValueError(f"Expected '<old> <new> <ref>', got {line.strip()!r}") from None
+        updates.append(RefUpdate(old, new, ref))
+    return updates
+
+
+def pushed_revisions(updates: Iterable[RefUpdate]) -> list[str]:
+    """Return the revisions whose history contains the commits a push adds to its refs.
+
+    Deleted refs add no commits. The old commit of each updated ref is excluded, which keeps the
+    walk short for fast-forwards. Every revision is listed only once, however many refs share it.
+    """
+    revisions = []
+    for update in updates:
+        if _is_null(update.new):
+            continue
+        revisions.append(update.new)
+        if not _is_null(update.old):
+            revisions.append(f"^{update.old}")
+    return list(dict.fromkeys(revisions))
+
+
+def iter_pushed_commits(
+    updates: Iterable[RefUpdate], max_count: int | None = None, cwd: Path | None = None
+) -> Iterator[GitCommit]:
+    """Stream the commits a push adds to the repository, out of a single `git log` process.
+
+    The revisions of all refs are passed on stdin, and commits reachable from any existing ref
+    are excluded, since the refs are only updated after the hook accepts the push. A commit
+    pushed to several refs, e.g. a branch and a tag, is therefore read once.
+
+    Args:
+        updates (Iterable[RefUpdate]): The ref updates of the push.
+        max_count (int, optional): Stop after this many commits. Defaults to no limit.
+        cwd (Path, optional): The repository receiving the push. Defaults to the current
+            directory.
+
+    Yields:
+        GitCommit: The new commits, newest first.
+
+    Raises:
+        GitError: If git exits with a non-zero status.
+    """
+    revisions = pushed_revisions(updates)
+    if not revisions:
+        return
+
+    logger.debug("Reading the commits of %d pushed revisions", len(revisions))
+    yield from iter_commits(
+        revisions=["--not", "--all"], cwd=cwd, stdin_revisions=revisions, max_count=max_count
+    )
@@ -81,6 +81,10 @@ class Component(Enum):
 class Rule:
     """Represents a validation rule with associated metadata and logic.
 
+    Rules are immutable and slotted, so a rule set of thousands of rules stays small and can be
+    shared by threads without copying. The outcome of applying a rule is returned, not stored on
+    the rule.
+
     Attributes
     ----------
         id (str): A unique identifier for the rule.
@@ -89,11 +93,23 @@ class Rule:
         component (Component): The component of the structure to which the rule applies.
         severity (Severity): The severity level of the rule. Defaults to
             `Severity.WARNING`.
-        dependencies (list[str]): A list of other rules that this rule depends on.
-            Defaults to an empty list.
+        dependencies (tuple[str, ...]): The other rules that this rule depends on.
+            Defaults to an empty tuple.
+        check_many (Callable | None): An optional batch version of `check`. It takes a list of
+            inputs and returns whether the check passed for each of them.
 
     """
 
+    __slots__ = (
+        "id",
+        "description",
+        "check",
+        "component",
+        "severity",
+        "dependencies",
+        "check_many",
+    )
+
     def __init__(
         self,
         id: str,
@@ -102,6 +118,7 @@ class Rule:
         component: Component,
         severity: Severity = Severity.WARNING,
         dependencies: list[str] | None = None,
+        check_many: Callable | None = None,
     ):
         """Args:
         ----
@@ -113,16 +130,35 @@ class Rule:
                 `Severity.WARNING`.
             dependencies (list[str], optional): A list of other rules that this rule
                 depends on. Defaults to None.
+            check_many (Callable, optional): A batch version of `check` returning a list of
+                bools. Defaults to None, which applies `check` to each input instead.
 
         """
-        self.id = id
-        self.description = description
-        self.check = check
-        self.component = component
-        self.severity = severity
-        self.dependencies = dependencies if dependencies else []
-        self.message: str = ""
-        self.has_run: bool = False
+        set_field = object.__setattr__
+        set_field(self, "id", id)
+        set_field(self, "description", description)
+        set_field(self, "check", check)
+        set_field(self, "component", component)
+        set_field(self, "severity", severity)
+        set_field(self, "dependencies", tuple(dependencies) if dependencies else ())
+        set_field(self, "check_many", check_many)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Rule is immutable, cannot set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Rule is immutable, cannot delete '{name}'")
+
+    def __reduce__(self):
+        return Rule, (
+            self.id,
+            self.description,
+            self.check,
+            self.component,
+            self.severity,
+            self.dependencies,
+            self.check_many,
+        )
 
     def apply(self, *args, **kwargs) -> tuple[bool, str]:
         """Executes the rule's check function with the provided arguments.
@@ -139,13 +175,35 @@ class Rule:
         """
         return self.check(*args, **kwargs)
 
+    def apply_many(self, inputs: list) -> list[tuple[bool, str]]:
+        """Executes the rule's check function for every input of a batch.
+
+        If the check has a batch version, it decides which inputs pass in a single call and
+        `check` is only called again for the failing inputs to get their messages. Otherwise
+        `check` is called for every input.
+
+        Args:
+        ----
+            inputs (list): The inputs to pass to the check function, one per call.
+
+        Returns:
+        -------
+            The result of the check function for each input, in the order of `inputs`.
+
+        """
+        if self.check_many is None:
+            return [self.check(item) for item in inputs]
+
+        passed = self.check_many(inputs)
+        return [(True, "") if ok else self.check(item) for ok, item in zip(passed, inputs)]
+
     def __str__(self):
         """Returns a string representation of the Rule instance."""
         return (
             f"Rule(id='{self.id}', description='{self.description}', "
             f"check={self.check.__name__}(),"
             f" component='{self.component}', severity='{self.severity}', "
-            f"dependencies={self.dependencies})"
+            f"dependencies={list(self.dependencies)})"
         )
 
     def __eq__(self, other):
@@ -30,13 +30,16 @@ class RuleCreator:
 
     def _create_rule(self, rule_config: RuleConfig) -> Rule:
         if rule_config.component == Component.HEADER:
-            check_method = getattr(self._header, rule_config.check)
+            checks = self._header
         elif rule_config.component == Component.BODY:
-            check_method = getattr(self._body, rule_config.check)
+            checks = self._body
         elif rule_config.component == Component.FOOTER:
-            check_method = getattr(self._footer, rule_config.check)
+            checks = self._footer
         else:
             raise Exception("Unknown component. Can't create rule.")
+        check_method = getattr(checks, rule_config.check)
+        # A check can have a batch version named <check>_many, used when linting many messages
+        check_many = getattr(checks, f"{rule_config.check}_many", None)
 
         # Check if the method exists and call it
         if callable(check_method):
@@ -51,4 +54,5 @@ class RuleCreator:
             component=rule_config.component,
             severity=rule_config.severity,
             dependencies=rule_config.dependencies,
+            check_many=check_many,
         )
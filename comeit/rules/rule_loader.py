@@ -1,28 +1,33 @@
+import hashlib
 import importlib.resources
 import logging
+import marshal
+import os
 from dataclasses import dataclass
 from pathlib import Path
 
-import yaml
-
 from .rule import Component, Severity
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RuleConfig:
     id: str
     description: str
     check: str
     component: Component
     severity: Severity
-    dependencies: list[str] | None
+    dependencies: tuple[str, ...] | None
 
     def __post_init__(self):
+        # The fields are frozen, so the conversions below set them through object.__setattr__
+        if self.dependencies is not None:
+            object.__setattr__(self, "dependencies", tuple(self.dependencies))
+
         # Convert the string to the corresponding Severity enum
         try:
-            self.severity = Severity(self.severity)
+            object.__setattr__(self, "severity", Severity(self.severity))
         except (KeyError, ValueError) as e:
             raise ValueError(
                 f"Severity field in rules.yml has invalid value. {e}. "
@@ -30,7 +35,7 @@ class RuleConfig:
             )
 
         try:
-            self.component = Component(self.component)
+            object.__setattr__(self, "component", Component(self.component))
         except (KeyError, ValueError) as e:
             raise ValueError(
                 f"Component field in rules.yml has invalid value. {e}. "
@@ -39,15 +44,23 @@ class RuleConfig:
 
 
 class RuleLoader:
-    def __init__(self, user_rules_yml: Path | None = None) -> None:
+    def __init__(self, user_rules_yml: Path | None = None, cache_dir: Path | None = None) -> None:
         self._DEFAULT_RULES_YML = importlib.resources.files("comeit") / Path("default_rules.yml")
         self._OVERRIDE_RULES_YML = Path("comeit_config.yml")
         self._user_rules_yml = user_rules_yml
+        self._cache_dir = cache_dir or _default_cache_dir()
+
+    def config_files(self) -> list[Path]:
+        """Return every file `load_rules()` may read, whether it exists or not.
+
+        This allows long running processes to notice when the rules have to be loaded again.
+        """
+        override_file = self._user_rules_yml or self._OVERRIDE_RULES_YML
+        return [Path(str(self._DEFAULT_RULES_YML)), Path(override_file).absolute()]
 
     def load_rules(self) -> list[RuleConfig]:
         try:
-            with self._DEFAULT_RULES_YML.open("r") as f:
-                rules_data = yaml.safe_load(f)
+            rules_data = self._load_default_rules()
 
             # Determine which file to use for overrides
             override_file = None
@@ -64,8 +77,7 @@ class RuleLoader:
 
             # If an override file exists, load it and apply the overrides
             if override_file:
-                with override_file.open() as f:
-                    user_rules_data: dict[str] = yaml.safe_load(f)
+                user_rules_data: dict[str] = _parse_yaml(override_file.read_bytes())
                 logger.debug(f"User or system rules loaded: {user_rules_data}")
 
                 # Apply user overrides to default rules
@@ -83,3 +95,53 @@ class RuleLoader:
 
         config = [RuleConfig(**d) for d in rules_data]
         return config
+
+    def _load_default_rules(self) -> list[dict]:
+        """Load the default rules from their precompiled form, compiling them on first use.
+
+        The parsed yaml is stored with `marshal` under a name derived from the hash of the yaml
+        file, so every later run skips parsing and a changed file is compiled again. Compiling
+        removes the files of earlier versions, so they do not pile up across upgrades.
+        """
+        content = self._DEFAULT_RULES_YML.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        compiled_path = self._cache_dir / f"default_rules-{digest}-{marshal.version}.marshal"
+
+        try:
+            return marshal.loads(compiled_path.read_bytes())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable precompiled rules '{compiled_path}'. {e}")
+
+        rules_data = _parse_yaml(content)
+
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = compiled_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(marshal.dumps(rules_data))
+            os.replace(tmp_path, compiled_path)
+            logger.debug(f"Precompiled default rules to {compiled_path}")
+            # The rules of earlier versions of the yaml file are never read again
+            for stale_path in self._cache_dir.glob("default_rules-*-*.marshal"):
+                if stale_path != compiled_path:
+                    stale_path.unlink(missing_ok=True)
+        except (OSError, ValueError) as e:
+            # Not being able to write the cache only costs parsing the yaml on every run
+            logger.debug(f"Cannot store precompiled rules in '{self._cache_dir}'. {e}")
+
+        return rules_data
+
+
+def _parse_yaml(content: bytes):
+    # Imported here, since the precompiled default rules do not need yaml at all
+    import yaml
+
+    # The C loader is an order of magnitude faster, but only available if libyaml is installed
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(content, Loader=loader)
+
+
+def _default_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "comeit"
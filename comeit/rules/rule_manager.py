@@ -1,8 +1,13 @@
 import logging
+import time
 from collections import deque
+from collections.abc import Iterator, Mapping
 from enum import Enum, auto
+from functools import lru_cache
+from typing import NamedTuple
 
-from .rule import Rule, Severity
+from .rule import Component, Rule, Severity
+from .rule_profile import RuleProfile
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +19,13 @@ class RuleResult(Enum):
         IGNORED: The rule was ignored.
         SUCCESS: The rule was applied successfully.
         FAILED: The rule application failed.
+        SKIPPED: The rule was not applied, since a rule it depends on failed.
     """
 
     IGNORED = auto()
     SUCCESS = auto()
     FAILED = auto()
+    SKIPPED = auto()
 
     def is_ignored(self) -> bool:
         return self == RuleResult.IGNORED
@@ -29,105 +36,601 @@ class RuleResult(Enum):
     def is_failed(self) -> bool:
         return self == RuleResult.FAILED
 
+    def is_skipped(self) -> bool:
+        return self == RuleResult.SKIPPED
+
+
+class DependencyPolicy(Enum):
+    """What happens to the rules depending on a rule that failed.
+
+    Dependents of an ignored rule are always ignored, whatever the policy.
+
+    Attributes:
+        SKIP: Dependents of a failed or skipped rule are skipped, so only the root cause of a
+            malformed message is reported.
+        RUN: Dependents run regardless of whether their dependencies failed.
+    """
+
+    SKIP = "skip"
+    RUN = "run"
+
+    @classmethod
+    def get_members(cls) -> list[str]:
+        return [member.value for member in cls]
+
+
+# RuleResults store each result as the value of its RuleResult, where 0 means not applied yet
+_RESULT_BY_CODE = (None, *RuleResult)
+_IGNORED = RuleResult.IGNORED.value
+_SUCCESS = RuleResult.SUCCESS.value
+_FAILED = RuleResult.FAILED.value
+_SKIPPED = RuleResult.SKIPPED.value
+
+# Most messages give one of a few combinations of results, so results share their codes, and
+# results without failed rules are shared whole. The number of combinations kept is bounded, in
+# case the rules give many different ones.
+_SHARED_CODES: dict[bytes, bytes] = {}
+_SHARED_RESULTS: dict[bytes, "RuleResults"] = {}
+_MAX_SHARED = 4096
+
+
+class _NoMessages(dict):
+    """The read-only empty messages shared by every result without failed rules."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("The messages of a result without failed rules cannot be changed")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # Unpickled as the shared instance of the receiving process
+        return "NO_MESSAGES"
+
+
+NO_MESSAGES: dict[str, str] = _NoMessages()
+
+
+class RuleResults(Mapping):
+    """The result of every rule for one commit message, stored as a single byte per rule.
+
+    It reads like a `dict[str, RuleResult]` in the order the rules were applied, and compares
+    equal to a dict with the same results. The positions of the rules are shared by all results
+    of a `RuleManager`. Results with the same codes share them, and equal results without failed
+    rules are one shared object, so they cost nothing per message.
+
+    Attributes:
+        messages (dict[str, str]): The message of every failed rule, keyed by rule ID. The
+            read-only `NO_MESSAGES` if no rule failed.
+    """
+
+    __slots__ = ("_positions", "_codes", "messages")
+
+    def __init__(
+        self, positions: dict[str, int], codes: bytes | bytearray, messages: dict[str, str]
+    ):
+        self._positions = positions
+        self._codes = codes
+        self.messages = messages
+
+    def __getitem__(self, rule_id: str) -> RuleResult:
+        code = self._codes[self._positions[rule_id]]
+        if not code:
+            raise KeyError(rule_id)
+        return _RESULT_BY_CODE[code]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __repr__(self):
+        return f"RuleResults({dict(self)!r})"
+
+    def __reduce__(self):
+        # Sent as the rule IDs, so unpickled results of the same rules share their positions again
+        return _unpickle_results, (tuple(self._positions), bytes(self._codes), self.messages)
+
+
+@lru_cache(maxsize=8)
+def _positions(rule_ids: tuple[str, ...]) -> dict[str, int]:
+    return {rule_id: index for index, rule_id in enumerate(rule_ids)}
+
+
+def _unpickle_results(rule_ids: tuple[str, ...], codes: bytes, messages: dict[str, str]):
+    return _completed(_positions(rule_ids), codes, messages)
+
+
+def _completed(
+    positions: dict[str, int], codes: bytes | bytearray, messages: dict[str, str]
+) -> RuleResults:
+    """Return the results of a message once every rule is applied, sharing what they can."""
+    codes = bytes(codes)
+    if not messages:
+        # Nothing can change these results, so equal ones are the same object
+        results = _SHARED_RESULTS.get(codes)
+        if results is not None and results._positions is positions:
+            return results
+        results = RuleResults(positions, codes, NO_MESSAGES)
+        if len(_SHARED_RESULTS) < _MAX_SHARED:
+            _SHARED_RESULTS.setdefault(codes, results)
+        return results
+
+    shared = _SHARED_CODES.get(codes)
+    if shared is not None:
+        codes = shared
+    elif len(_SHARED_CODES) < _MAX_SHARED:
+        _SHARED_CODES[codes] = codes
+    return RuleResults(positions, codes, messages)
+
+
+def encode_results(results: list[RuleResults]) -> tuple[tuple[str, ...], bytes]:
+    """Pack the results of the same rules into the rule IDs and the codes of every result.
+
+    Sending a batch of results to another process this way states the rule IDs once, instead of
+    once per result as pickling every `RuleResults` does. The messages are not included.
+
+    Args:
+        results (list[RuleResults]): Results of the same `RuleManager`.
+
+    Returns:
+        tuple[tuple[str, ...], bytes]: The rule IDs and the concatenated codes of the results.
+
+    Raises:
+        ValueError: If the results are not of the same rules.
+    """
+    if not results:
+        return (), b""
+    positions = results[0]._positions
+    if any(result._positions is not positions for result in results):
+        raise ValueError("Only results of the same rules can be encoded together")
+    return tuple(positions), b"".join([result._codes for result in results])
+
+
+def decode_results(
+    rule_ids: tuple[str, ...], codes: bytes, messages: list[dict[str, str]]
+) -> list[RuleResults]:
+    """Rebuild the results packed by `encode_results`, with the messages of each result."""
+    positions = _positions(rule_ids)
+    size = len(rule_ids)
+    return [
+        _completed(positions, codes[index * size : (index + 1) * size], failures)
+        for index, failures in enumerate(messages)
+    ]
+
+
+# Position of each component in a parsed commit message (header, body, footer)
+_COMPONENT_INDEX = {Component.HEADER: 0, Component.BODY: 1, Component.FOOTER: 2}
+
+
+class _PlannedRule(NamedTuple):
+    """Everything applying a rule needs, computed once when the rules are scheduled."""
+
+    rule_id: str
+    rule: Rule
+    component_index: int
+    # The position of the rule in the execution order
+    index: int
+    # Bit i is set if the rule depends on the rule at position i of the execution order
+    dependency_mask: int
+    # The bit of the rule itself, set in the masks of the results when it is ignored or blocks
+    # its dependents
+    bit: int
+    # The bit set when the rule fails, or 0 if failures do not block dependents
+    block_bit: int
+    ignored: bool
+
 
 class RuleManager:
     """Manages and applies a set of rules."""
 
-    def __init__(self, rules: dict[str, Rule]):
+    def __init__(
+        self,
+        rules: dict[str, Rule],
+        profile: RuleProfile | None = None,
+        dependency_policy: DependencyPolicy = DependencyPolicy.SKIP,
+        threads: int = 1,
+    ):
         """Initialize the RuleManager with a dictionary of rules.
 
+        The dependencies are validated and the execution order is computed here once, since the
+        rule set does not change between the messages it is applied to. A rule can depend on any
+        number of rules. Each rule is given its position in the execution order, and its
+        dependencies are stored as a bitmask of positions, so checking whether any dependency was
+        ignored or failed is a single integer operation however many rules there are.
+
         Args:
             rules (dict[str, Rule]): A dictionary mapping rule IDs to Rule objects.
+            profile (RuleProfile, optional): Collects the timings and results of every rule.
+                Defaults to None, which disables profiling.
+            dependency_policy (DependencyPolicy): Whether the dependents of a failed rule are
+                skipped or run. Defaults to `DependencyPolicy.SKIP`.
+            threads (int): With more than one thread, the rules of each dependency level, i.e.
+                the rules whose dependencies have all been applied, run concurrently in a thread
+                pool. This only pays off for checks that wait on I/O or release the GIL. The
+                results are the same as with a single thread. Ignored when profiling. Defaults
+                to 1.
+
+        Raises:
+            ValueError: If a dependency is invalid or the dependencies are circular.
         """
         self._rules = rules
+        self.dependency_policy = dependency_policy
 
-    def apply_rules(self) -> dict[str, RuleResult]:
+        # Validate dependencies and build graph
+        rule_ids = list(rules)
+        dependents, in_degree = self._validate_and_build_graph(rule_ids)
+
+        # Perform topological sort, grouping the rules by dependency level. Every rule comes after
+        # all rules of the levels before it, so each level can run at once.
+        order = self._topological_sort(dependents, in_degree)
+        levels = [0] * len(rule_ids)
+        for index in order:
+            for dependent in dependents[index]:
+                levels[dependent] = max(levels[dependent], levels[index] + 1)
+        order.sort(key=levels.__getitem__)
+        sorted_rules = [rule_ids[index] for index in order]
+        logger.debug(f"{sorted_rules=}")
+
+        # Freeze everything apply_rules() needs per rule, in the order the rules must run
+        position = _positions(tuple(sorted_rules))
+        self._positions = position
+        skip = dependency_policy == DependencyPolicy.SKIP
+        self._execution_plan: tuple[_PlannedRule, ...] = tuple(
+            _PlannedRule(
+                rule_id=rule_id,
+                rule=rules[rule_id],
+                component_index=_COMPONENT_INDEX[rules[rule_id].component],
+                index=index,
+                dependency_mask=sum(
+                    1 << position[dependency] for dependency in set(rules[rule_id].dependencies)
+                ),
+                bit=1 << index,
+                block_bit=1 << index if skip else 0,
+                ignored=rules[rule_id].severity == Severity.IGNORE,
+            )
+            for index, rule_id in enumerate(sorted_rules)
+        )
+
+        # The execution plan split into the slices of each dependency level
+        level_sizes = [0] * (max(levels, default=0) + 1)
+        for index in order:
+            level_sizes[levels[index]] += 1
+        self._levels: list[tuple[_PlannedRule, ...]] = []
+        start = 0
+        for size in level_sizes:
+            self._levels.append(self._execution_plan[start : start + size])
+            start += size
+
+        # Profiling and threads swap in separate loops, so the loops used by default do not even
+        # check whether they are enabled
+        self.profile = profile
+        self._executor = None
+        if profile is not None:
+            self.apply_rules = self._apply_rules_profiled
+            self.apply_rules_many = self._apply_rules_many_profiled
+        elif threads > 1:
+            # Imported here, since most runs use a single thread
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=threads, thread_name_prefix="comeit-rules"
+            )
+            self.apply_rules = self._apply_rules_threaded
+            self.apply_rules_many = self._apply_rules_many_threaded
+
+    def close(self):
+        """Shut down the thread pool, if the rules are applied with threads."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def apply_rules(self, commit_msg: tuple[str, str | None, str | None]) -> RuleResults:
         """Applies all the rules in dependency order.
 
+        Args:
+            commit_msg (tuple[str, str | None, str | None]): The header, body and footer of the
+                commit message, as returned by `parse_commit_message`. Each rule is passed the
+                part of the message matching its component.
+
         Returns:
-            dict[str, RuleResult]: A dictionary mapping rule IDs to their corresponding RuleResult.
+            RuleResults: A mapping of rule IDs to their corresponding RuleResult, with the
+                messages of the failed rules.
         """
-        # Validate dependencies and build graph
-        graph, in_degree = self._validate_and_build_graph()
-
-        # Perform topological sort
-        sorted_rules = self._topological_sort(graph, in_degree)
-        logger.debug(f"{sorted_rules=}")
-
         # Track the result of each rule
-        results: dict[str, RuleResult] = {}
-
-        for rule_id in sorted_rules:
-            rule = self._rules[rule_id]
-
-            # Check if any dependency of the current rule was ignored
-            if rule.dependencies:
-                dependency = rule.dependencies[0]
-                if results.get(dependency) == RuleResult.IGNORED:
-                    # If the dependency is ignored, mark this rule as ignored
-                    results[rule_id] = RuleResult.IGNORED
-                    logger.debug(f"Rule {rule_id} ignored due to dependency on {dependency}.")
-                    continue
-
-            # If the rule itself is set to be ignored
-            if rule.severity == Severity.IGNORE:
-                results[rule_id] = RuleResult.IGNORED
+        codes = bytearray(len(self._execution_plan))
+        messages: dict[str, str] = {}
+        # The positions of the rules that were ignored, and of those that failed or were skipped
+        ignored_mask = blocked_mask = 0
+
+        for (
+            rule_id,
+            rule,
+            component_index,
+            index,
+            dependency_mask,
+            bit,
+            block_bit,
+            ignored,
+        ) in self._execution_plan:
+            # If any dependency is ignored, or the rule itself is set to be ignored
+            if ignored or dependency_mask & ignored_mask:
+                codes[index] = _IGNORED
+                ignored_mask |= bit
+                continue
+
+            # If any dependency failed, the rule would only repeat the failure
+            if dependency_mask & blocked_mask:
+                codes[index] = _SKIPPED
+                blocked_mask |= bit
                 continue
 
             # Apply the rule and store the result
-            result, rule.message = rule.apply()
-            results[rule_id] = RuleResult.SUCCESS if result else RuleResult.FAILED
+            result, message = rule.apply(commit_msg[component_index])
+            if result:
+                codes[index] = _SUCCESS
+            else:
+                codes[index] = _FAILED
+                messages[rule_id] = message
+                blocked_mask |= block_bit
 
-        return results
+        return _completed(self._positions, codes, messages)
 
-    def _validate_and_build_graph(self) -> tuple[dict[str, list[str]], dict[str, int]]:
-        """Builds the dependency graph and validates the rules.
+    def apply_rules_many(
+        self, commit_msgs: list[tuple[str, str | None, str | None]]
+    ) -> list[RuleResults]:
+        """Applies all the rules in dependency order to a batch of commit messages.
+
+        Each rule is applied to the whole batch at once, so checks with a batch version run a
+        single call per batch instead of one per message. The results are the same as calling
+        `apply_rules` for each message.
+
+        Args:
+            commit_msgs (list[tuple[str, str | None, str | None]]): The header, body and footer
+                of each commit message, as returned by `parse_commit_message`.
+
+        Returns:
+            list[RuleResults]: The results of each commit message.
+        """
+        codes = [bytearray(len(self._execution_plan)) for _ in commit_msgs]
+        messages: list[dict[str, str]] = [{} for _ in commit_msgs]
+        ignored_masks = [0] * len(commit_msgs)
+        blocked_masks = [0] * len(commit_msgs)
+
+        for planned in self._execution_plan:
+            active = self._select_active(planned, codes, ignored_masks, blocked_masks)
+            inputs = [commit_msgs[i][planned.component_index] for i in active]
+            self._store_outcomes(
+                planned, codes, messages, blocked_masks, active, planned.rule.apply_many(inputs)
+            )
+
+        return [_completed(self._positions, *results) for results in zip(codes, messages)]
+
+    def _select_active(
+        self,
+        planned: _PlannedRule,
+        codes: list[bytearray],
+        ignored_masks: list[int],
+        blocked_masks: list[int],
+    ) -> list[int]:
+        """Store the result of a rule for the messages it is not applied to.
 
         Returns:
-            tuple[dict[str, list[str]], dict[str, int]]: A graph and in-degree dictionary.
+            list[int]: The positions in the batch of the messages the rule must be applied to.
+        """
+        index, dependency_mask, bit = planned.index, planned.dependency_mask, planned.bit
+        if planned.ignored:
+            for message_codes in codes:
+                message_codes[index] = _IGNORED
+            for i in range(len(codes)):
+                ignored_masks[i] |= bit
+            return []
+
+        active = []
+        for i, message_codes in enumerate(codes):
+            if dependency_mask & ignored_masks[i]:
+                message_codes[index] = _IGNORED
+                ignored_masks[i] |= bit
+            elif dependency_mask & blocked_masks[i]:
+                message_codes[index] = _SKIPPED
+                blocked_masks[i] |= bit
+            else:
+                active.append(i)
+        return active
+
+    def _store_outcomes(
+        self,
+        planned: _PlannedRule,
+        codes: list[bytearray],
+        messages: list[dict[str, str]],
+        blocked_masks: list[int],
+        active: list[int],
+        outcomes: list[tuple[bool, str]],
+    ):
+        """Store the result of a rule for the messages it was applied to."""
+        rule_id, index, block_bit = planned.rule_id, planned.index, planned.block_bit
+        for i, (success, message) in zip(active, outcomes):
+            if success:
+                codes[i][index] = _SUCCESS
+            else:
+                codes[i][index] = _FAILED
+                messages[i][rule_id] = message
+                blocked_masks[i] |= block_bit
+
+    def _apply_rules_threaded(self, commit_msg: tuple[str, str | None, str | None]) -> RuleResults:
+        """Same as `apply_rules`, running the rules of each dependency level concurrently."""
+        codes = bytearray(len(self._execution_plan))
+        messages: dict[str, str] = {}
+        ignored_mask = blocked_mask = 0
+
+        def apply(planned: _PlannedRule) -> tuple[bool, str]:
+            return planned.rule.apply(commit_msg[planned.component_index])
+
+        for level in self._levels:
+            # The dependencies are all in earlier levels, so the masks are final for this level
+            runnable = [
+                planned
+                for planned in level
+                if not (planned.ignored or planned.dependency_mask & (ignored_mask | blocked_mask))
+            ]
+            if len(runnable) > 1:
+                outcomes = iter(self._executor.map(apply, runnable))
+            else:
+                outcomes = map(apply, runnable)
+
+            # Store the results in the order of the plan, so they do not depend on the timing
+            for rule_id, _, _, index, dependency_mask, bit, block_bit, ignored in level:
+                if ignored or dependency_mask & ignored_mask:
+                    codes[index] = _IGNORED
+                    ignored_mask |= bit
+                elif dependency_mask & blocked_mask:
+                    codes[index] = _SKIPPED
+                    blocked_mask |= bit
+                else:
+                    result, message = next(outcomes)
+                    if result:
+                        codes[index] = _SUCCESS
+                    else:
+                        codes[index] = _FAILED
+                        messages[rule_id] = message
+                        blocked_mask |= block_bit
+
+        return _completed(self._positions, codes, messages)
+
+    def _apply_rules_many_threaded(
+        self, commit_msgs: list[tuple[str, str | None, str | None]]
+    ) -> list[RuleResults]:
+        """Same as `apply_rules_many`, running the rules of each dependency level concurrently.
+
+        Each rule is still applied to the whole batch at once, in its own thread.
         """
-        graph = {rule_id: [] for rule_id in self._rules}
-        in_degree = {rule_id: 0 for rule_id in self._rules}
+        codes = [bytearray(len(self._execution_plan)) for _ in commit_msgs]
+        messages: list[dict[str, str]] = [{} for _ in commit_msgs]
+        ignored_masks = [0] * len(commit_msgs)
+        blocked_masks = [0] * len(commit_msgs)
+
+        for level in self._levels:
+            # Decide which messages each rule of the level runs for, before running any of them
+            pending = []
+            for planned in level:
+                active = self._select_active(planned, codes, ignored_masks, blocked_masks)
+                if active:
+                    inputs = [commit_msgs[i][planned.component_index] for i in active]
+                    future = self._executor.submit(planned.rule.apply_many, inputs)
+                    pending.append((planned, active, future))
+
+            # Store the results in the order of the plan, so they do not depend on the timing
+            for planned, active, future in pending:
+                self._store_outcomes(
+                    planned, codes, messages, blocked_masks, active, future.result()
+                )
+
+        return [_completed(self._positions, *results) for results in zip(codes, messages)]
+
+    def _apply_rules_profiled(self, commit_msg: tuple[str, str | None, str | None]) -> RuleResults:
+        """Same as `apply_rules`, recording the stats of every rule in the profile."""
+        codes = bytearray(len(self._execution_plan))
+        messages: dict[str, str] = {}
+        ignored_mask = blocked_mask = 0
+        stats = self.profile.stats
+        perf_counter = time.perf_counter
+
+        for (
+            rule_id,
+            rule,
+            component_index,
+            index,
+            dependency_mask,
+            bit,
+            block_bit,
+            ignored,
+        ) in self._execution_plan:
+            if ignored or dependency_mask & ignored_mask:
+                codes[index] = _IGNORED
+                ignored_mask |= bit
+                stats[rule_id].ignored += 1
+                continue
+
+            if dependency_mask & blocked_mask:
+                codes[index] = _SKIPPED
+                blocked_mask |= bit
+                stats[rule_id].skipped += 1
+                continue
+
+            start = perf_counter()
+            result, message = rule.apply(commit_msg[component_index])
+            stats[rule_id].record(perf_counter() - start, result)
+            if result:
+                codes[index] = _SUCCESS
+            else:
+                codes[index] = _FAILED
+                messages[rule_id] = message
+                blocked_mask |= block_bit
+
+        return _completed(self._positions, codes, messages)
 
-        for rule_id, rule in self._rules.items():
-            if rule.dependencies:
-                if len(rule.dependencies) > 1:
-                    raise ValueError(f"Rule {rule_id} has more than one dependency.")
-                dependency = rule.dependencies[0]
+    def _apply_rules_many_profiled(
+        self, commit_msgs: list[tuple[str, str | None, str | None]]
+    ) -> list[RuleResults]:
+        """Same as `apply_rules_many`, recording the stats of every rule in the profile.
 
-                if dependency not in self._rules:
+        The messages are linted one by one, so the time of every single call is known.
+        """
+        return [self._apply_rules_profiled(commit_msg) for commit_msg in commit_msgs]
+
+    def _validate_and_build_graph(self, rule_ids: list[str]) -> tuple[list[list[int]], list[int]]:
+        """Builds the dependency graph and validates the rules.
+
+        Args:
+            rule_ids (list[str]): The IDs of the rules. The graph refers to each rule by its
+                index in this list.
+
+        Returns:
+            tuple[list[list[int]], list[int]]: The dependents and the in-degree of each rule.
+        """
+        index = {rule_id: i for i, rule_id in enumerate(rule_ids)}
+        dependents: list[list[int]] = [[] for _ in rule_ids]
+        in_degree = [0] * len(rule_ids)
+
+        for i, rule_id in enumerate(rule_ids):
+            for dependency in dict.fromkeys(self._rules[rule_id].dependencies):
+                if dependency not in index:
                     raise ValueError(f"Rule {rule_id} depends on a non-existent rule {dependency}.")
 
-                graph[dependency].append(rule_id)
-                in_degree[rule_id] += 1
+                dependents[index[dependency]].append(i)
+                in_degree[i] += 1
 
-        return graph, in_degree
+        return dependents, in_degree
 
-    def _topological_sort(
-        self, graph: dict[str, list[str]], in_degree: dict[str, int]
-    ) -> list[str]:
+    def _topological_sort(self, dependents: list[list[int]], in_degree: list[int]) -> list[int]:
         """Performs a topological sort on the rule graph.
 
+        Rules that do not depend on each other keep the order they were given in.
+
         Args:
-            graph (dict[str, list[str]]): The dependency graph.
-            in_degree (dict[str, int]): The in-degree (number of dependencies) of each rule.
+            dependents (list[list[int]]): The indices of the rules depending on each rule.
+            in_degree (list[int]): The in-degree (number of dependencies) of each rule.
 
         Returns:
-            list[str]: The sorted order of rule IDs.
+            list[int]: The sorted indices of the rules.
         """
-        queue = deque([rule_id for rule_id in self._rules if in_degree[rule_id] == 0])
-        sorted_rules = []
+        in_degree = list(in_degree)
+        queue = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        order = []
 
         while queue:
-            rule_id = queue.popleft()
-            sorted_rules.append(rule_id)
+            i = queue.popleft()
+            order.append(i)
 
-            for dependent in graph[rule_id]:
+            for dependent in dependents[i]:
                 in_degree[dependent] -= 1
                 if in_degree[dependent] == 0:
                     queue.append(dependent)
 
-        if len(sorted_rules) != len(self._rules):
+        if len(order) != len(in_degree):
             raise ValueError("Circular dependency detected among rules.")
 
-        return sorted_rules
+        return order
@@ -0,0 +1,128 @@
+import json
+from collections import defaultdict
+from typing import TextIO
+
+from .rule import Rule
+
+PROFILE_FORMATS = ["table", "json"]
+
+
+class RuleStats:
+    """Counters and timings of a single rule across a run.
+
+    Attributes:
+        calls (int): The number of times the check of the rule was called.
+        total_time (float): The total wall time spent in the check, in seconds.
+        max_time (float): The longest single call of the check, in seconds.
+        passed (int): The number of messages the rule passed for.
+        failed (int): The number of messages the rule failed for.
+        ignored (int): The number of messages the rule was ignored for.
+        skipped (int): The number of messages the rule was skipped for, since a dependency failed.
+    """
+
+    __slots__ = ("calls", "total_time", "max_time", "passed", "failed", "ignored", "skipped")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.passed = 0
+        self.failed = 0
+        self.ignored = 0
+        self.skipped = 0
+
+    def record(self, elapsed: float, success: bool):
+        """Record a single call of the check."""
+        self.calls += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if success:
+            self.passed += 1
+        else:
+            self.failed += 1
+
+    def merge(self, other: "RuleStats"):
+        """Add the counters and timings of another run of the same rule."""
+        self.calls += other.calls
+        self.total_time += other.total_time
+        self.max_time = max(self.max_time, other.max_time)
+        self.passed += other.passed
+        self.failed += other.failed
+        self.ignored += other.ignored
+        self.skipped += other.skipped
+
+
+class RuleProfile:
+    """The `RuleStats` of every rule, collected by a `RuleManager` created with a profile.
+
+    Attributes:
+        stats (dict[str, RuleStats]): The stats of each rule, keyed by rule ID.
+    """
+
+    def __init__(self):
+        self.stats: dict[str, RuleStats] = defaultdict(RuleStats)
+
+    def merge(self, other: "RuleProfile"):
+        """Add the stats of another profile, e.g. the one of a worker process."""
+        for rule_id, stats in other.stats.items():
+            self.stats[rule_id].merge(stats)
+
+    def take(self) -> "RuleProfile":
+        """Return the stats collected so far and start over with empty ones."""
+        taken = RuleProfile()
+        taken.stats, self.stats = self.stats, defaultdict(RuleStats)
+        return taken
+
+    def sorted_stats(self) -> list[tuple[str, RuleStats]]:
+        """The stats of every rule, the rule with the highest total time first."""
+        return sorted(self.stats.items(), key=lambda item: item[1].total_time, reverse=True)
+
+    def to_dict(self, rules: dict[str, Rule]) -> dict:
+        """The stats as a JSON serializable dict, with times in seconds."""
+        return {
+            "rules": [
+                {
+                    "id": rule_id,
+                    "check": _check_name(rules, rule_id),
+                    "calls": stats.calls,
+                    "total_time": stats.total_time,
+                    "max_time": stats.max_time,
+                    "passed": stats.passed,
+                    "failed": stats.failed,
+                    "ignored": stats.ignored,
+                    "skipped": stats.skipped,
+                }
+                for rule_id, stats in self.sorted_stats()
+            ]
+        }
+
+    def write(self, stream: TextIO, rules: dict[str, Rule], format: str = "table"):
+        """Write the stats as a table sorted by total time, or as JSON.
+
+        Args:
+            stream (TextIO): Where to write the stats.
+            rules (dict[str, Rule]): The rules the stats were collected for.
+            format (str): One of `PROFILE_FORMATS`. Defaults to "table".
+        """
+        if format == "json":
+            json.dump(self.to_dict(rules), stream)
+            stream.write("\n")
+            return
+
+        stream.write(
+            f"{'Rule':<6} {'Check':<20} {'Calls':>8} {'Total ms':>10} {'Mean us':>9} "
+            f"{'Max us':>9} {'Passed':>8} {'Failed':>8} {'Ignored':>8} {'Skipped':>8}\n"
+        )
+        for rule_id, stats in self.sorted_stats():
+            mean_us = stats.total_time / stats.calls * 1e6 if stats.calls else 0.0
+            stream.write(
+                f"{rule_id:<6} {_check_name(rules, rule_id):<20} {stats.calls:>8} "
+                f"{stats.total_time * 1e3:>10.3f} {mean_us:>9.2f} {stats.max_time * 1e6:>9.2f} "
+                f"{stats.passed:>8} {stats.failed:>8} {stats.ignored:>8} {stats.skipped:>8}\n"
+            )
+
+
+def _check_name(rules: dict[str, Rule], rule_id: str) -> str:
+    rule = rules.get(rule_id)
+    return getattr(rule.check, "__name__", "") if rule else ""
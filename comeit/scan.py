@@ -0,0 +1,317 @@
+"""Lint the histories of many repositories at once, for a compliance report of a whole fleet."""
+
+import logging
+import os
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .git import GitCommit
+from .lint_result import LintOutcome
+from .linter import DEFAULT_BATCH_SIZE, Linter
+
+logger = logging.getLogger(__name__)
+
+# The rules file a repository can override the severities of the rules with
+CONFIG_FILE_NAME = "comeit_config.yml"
+
+
+class ScanStats:
+    """Lint counts of a repository, or of a batch of its commits.
+
+    Attributes:
+        checked (int): The number of commits linted.
+        failed (int): The number of commits that failed a rule with severity ERROR, or could not
+            be parsed.
+        invalid (int): The number of commits that could not be parsed, e.g. empty messages.
+        rule_failures (Counter[str]): The number of commits each rule failed for, by rule ID.
+    """
+
+    __slots__ = ("checked", "failed", "invalid", "rule_failures")
+
+    def __init__(self):
+        self.checked = 0
+        self.failed = 0
+        self.invalid = 0
+        self.rule_failures: Counter[str] = Counter()
+
+    def record(self, outcome: LintOutcome):
+        """Count the result of a single commit."""
+        self.checked += 1
+        if isinstance(outcome, ValueError):
+            self.failed += 1
+            self.invalid += 1
+            return
+        self.failed += outcome.has_errors
+        self.rule_failures.update(outcome.messages.keys())
+
+    def merge(self, other: "ScanStats"):
+        """Add the counts of another batch of commits."""
+        self.checked += other.checked
+        self.failed += other.failed
+        self.invalid += other.invalid
+        self.rule_failures.update(other.rule_failures)
+
+
+class RepoScan(NamedTuple):
+    """The result of scanning a single repository.
+
+    Attributes:
+        path (Path): The repository.
+        config (Path | None): The rules file the repository was linted with, if any.
+        stats (ScanStats): The counts of its commits.
+        error (str | None): Why the scan of the repository stopped early, if it did.
+    """
+
+    path: Path
+    config: Path | None
+    stats: ScanStats
+    error: str | None = None
+
+
+class ScanSummary:
+    """The results of every scanned repository, and their totals.
+
+    Attributes:
+        repos (list[RepoScan]): The scan of each repository, in the order they finished.
+        total (ScanStats): The counts of all repositories added up.
+    """
+
+    def __init__(self):
+        self.repos: list[RepoScan] = []
+        self.total = ScanStats()
+
+    def add(self, repo: RepoScan):
+        self.repos.append(repo)
+        self.total.merge(repo.stats)
+
+    @property
+    def errors(self) -> int:
+        """The number of repositories that could not be scanned completely."""
+        return sum(repo.error is not None for repo in self.repos)
+
+
+def find_repositories(paths: Iterable[Path]) -> list[Path]:
+    """Find the repositories to scan.
+
+    A directory is either a repository itself, or searched for repositories, without looking
+    inside the repositories it finds. A file lists a repository per line, where empty lines and
+    lines starting with `#` are skipped. Every repository is returned once.
+
+    Raises:
+        FileNotFoundError: If a path does not exist.
+    """
+    repos: dict[Path, None] = {}
+    for path in paths:
+        if path.is_file():
+            for line in path.read_text().splitlines():
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    repos[(path.parent / line).resolve()] = None
+        elif path.is_dir():
+            repos.update(dict.fromkeys(_walk_repositories(path.resolve())))
+        else:
+            raise FileNotFoundError(f"No such file or directory: '{path}'")
+    return list(repos)
+
+
+def _is_repository(path: Path) -> bool:
+    return (path / ".git").exists() or ((path / "HEAD").is_file() and (path / "objects").is_dir())
+
+
+def _walk_repositories(root: Path) -> Iterator[Path]:
+    if _is_repository(root):
+        yield root
+        return
+    for directory, subdirectories, _ in os.walk(root):
+        subdirectories.sort()  # Scans the repositories in the same order every time
+        for name in list(subdirectories):
+            # Do not look inside repositories or hidden directories
+            if name.startswith("."):
+                subdirectories.remove(name)
+            elif _is_repository(Path(directory, name)):
+                subdirectories.remove(name)
+                yield Path(directory, name)
+
+
+class _RepoState:
+    """A repository being scanned, with the batches of its commits still to be sent."""
+
+    __slots__ = ("path", "config", "batches", "stats", "in_flight", "exhausted", "error")
+
+    def __init__(self, path: Path, config: Path | None, batches: Iterator[list[str]]):
+        self.path = path
+        self.config = config
+        self.batches = batches
+        self.stats = ScanStats()
+        self.in_flight = 0
+        self.exhausted = False
+        self.error: str | None = None
+
+    def result(self) -> RepoScan:
+        return RepoScan(self.path, self.config, self.stats, self.error)
+
+
+def scan_repositories(
+    repos: Iterable[Path],
+    linter_kwargs: dict[str, Any],
+    jobs: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    all_refs: bool = False,
+    reader: str = "git",
+    default_config: Path | None = None,
+) -> Iterator[RepoScan]:
+    """Lint the history of every repository, sharing one pool of worker processes.
+
+    The commits are read in the parent and sent to the workers in batches. Several repositories
+    are read at a time, taking turns batch by batch, so a huge repository gets no more of the
+    workers than the others and the small ones finish early. Only a bounded number of batches is
+    in flight, so memory use does not depend on the size of the repositories.
+
+    Each repository is linted with the `comeit_config.yml` at its root if it has one, otherwise
+    with `default_config`, following the override rules of `RuleLoader`.
+
+    Args:
+        repos (Iterable[Path]): The repositories to scan.
+        linter_kwargs (dict[str, Any]): The arguments the linters are created with, apart from
+            the rules file.
+        jobs (int): The number of worker processes. With 1, the commits are linted in this
+            process. Defaults to 1.
+        batch_size (int): The number of messages sent to a worker at a time. Defaults to
+            `DEFAULT_BATCH_SIZE`.
+        all_refs (bool): Scan the history of all refs instead of HEAD. Defaults to False.
+        reader (str): "git" to read the commits with git, or "python" to read the object files
+            directly. Defaults to "git".
+        default_config (Path, optional): The rules file of repositories without their own.
+
+    Yields:
+        RepoScan: The scan of each repository, as soon as all of its commits are linted.
+    """
+    if reader == "python":
+        from .git_objects import iter_commits
+    else:
+        from .git import iter_commits
+
+    def open_repo(path: Path) -> _RepoState:
+        config = path / CONFIG_FILE_NAME
+        config = config if config.is_file() else default_config
+        commits = iter_commits(all_refs=all_refs, cwd=path)
+        return _RepoState(path, config, _batched_messages(commits, batch_size))
+
+    waiting = deque(repos)
+    # The repositories taking turns, and the batches sent to the workers, oldest first
+    active: deque[_RepoState] = deque()
+    pending: deque[tuple[_RepoState, Future]] = deque()
+    max_active = 2 * jobs
+    max_pending = 2 * jobs
+
+    with _executor(jobs, linter_kwargs) as executor:
+        while waiting or active or pending:
+            while waiting and len(active) < max_active:
+                active.append(open_repo(waiting.popleft()))
+
+            if active and len(pending) < max_pending:
+                state = active.popleft()
+                try:
+                    batch = next(state.batches, None)
+                except Exception as e:  # One broken repository must not stop the scan
+                    state.error = str(e)
+                    batch = None
+                if batch is None:
+                    state.exhausted = True
+                    if not state.in_flight:
+                        yield _finish(state)
+                    continue
+
+                future = executor.submit(_scan_batch, state.config, batch)
+                pending.append((state, future))
+                state.in_flight += 1
+                active.append(state)
+                continue
+
+            state, future = pending.popleft()
+            state.in_flight -= 1
+            try:
+                batch_stats = future.result()
+            except Exception as e:  # E.g. an invalid rules file of this repository
+                if state.error is None:
+                    state.error = str(e)
+                    state.exhausted = True
+                    state.batches.close()
+                    if state in active:
+                        active.remove(state)
+            else:
+                if state.error is None:
+                    state.stats.merge(batch_stats)
+            if state.exhausted and not state.in_flight:
+                yield _finish(state)
+
+
+def _finish(state: _RepoState) -> RepoScan:
+    logger.info("Scanned %d commits of %s", state.stats.checked, state.path)
+    return state.result()
+
+
+def _batched_messages(commits: Iterator[GitCommit], size: int) -> Iterator[list[str]]:
+    try:
+        while batch := [commit.message for commit in islice(commits, size)]:
+            yield batch
+    finally:
+        # Stops the git process of a repository whose scan ended early
+        commits.close()
+
+
+class _InlineExecutor:
+    """Runs the batches in this process, for a scan with a single job."""
+
+    def __init__(self, linter_kwargs: dict[str, Any]):
+        _init_worker(linter_kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        _worker_linters.clear()
+
+    def submit(self, function, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _executor(jobs: int, linter_kwargs: dict[str, Any]):
+    if jobs == 1:
+        return _InlineExecutor(linter_kwargs)
+    logger.debug("Scanning with %d processes", jobs)
+    return ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(linter_kwargs,)
+    )
+
+
+_worker_kwargs: dict[str, Any] = {}
+# The linter of each rules file, created when a worker gets the first batch linted with it
+_worker_linters: dict[Path | None, Linter] = {}
+
+
+def _init_worker(linter_kwargs: dict[str, Any]):
+    global _worker_kwargs
+    _worker_kwargs = linter_kwargs
+    _worker_linters.clear()
+
+
+def _scan_batch(config: Path | None, messages: list[str]) -> ScanStats:
+    linter = _worker_linters.get(config)
+    if linter is None:
+        linter = _worker_linters[config] = Linter(**{**_worker_kwargs, "user_rules_yml": config})
+
+    # Only the counts are sent back, which is much less to pickle than the results
+    stats = ScanStats()
+    for outcome in linter.lint_batch(messages):
+        stats.record(outcome)
+    return stats
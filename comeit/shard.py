@@ -0,0 +1,252 @@
+"""Split the linting of a history across several runners, and merge their partial results."""
+
+import gzip
+import heapq
+import json
+import logging
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from operator import itemgetter
+from pathlib import Path
+from typing import NamedTuple
+
+from .git import GitCommit
+from .lint_result import LintOutcome, LintResult
+
+logger = logging.getLogger(__name__)
+
+# Changes whenever the layout of the partial result files changes
+PARTIAL_VERSION = 1
+
+
+class PartialError(Exception):
+    """Raised when partial result files cannot be merged."""
+
+
+class Shard(NamedTuple):
+    """One of `count` disjoint parts of a history, numbered from 1.
+
+    A commit belongs to a shard by its hash, so every runner walking the same history picks the
+    same commits without talking to the others, and each commit is linted by exactly one runner.
+    """
+
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def contains(self, sha: str) -> bool:
+        return int(sha[:8], 16) % self.count == self.index - 1
+
+
+def iter_shard(
+    commits: Iterable[GitCommit], shard: Shard, positions: deque[int]
+) -> Iterator[GitCommit]:
+    """Yield the commits of a shard.
+
+    The position of each yielded commit in the whole history is appended to `positions`, so the
+    results can be put back in the order of an unsharded run. The consumer pops them as the
+    results come in, so only the positions of the commits being linted are held.
+    """
+    for position, commit in enumerate(commits):
+        if shard.contains(commit.sha):
+            positions.append(position)
+            yield commit
+
+
+class PartialHeader(NamedTuple):
+    """What a partial result file was produced from.
+
+    Attributes:
+        shard (Shard): The shard whose results the file holds.
+        fingerprint (str): The fingerprint of the rules the commits were linted with.
+        revisions (list[str]): The revisions the history was read from.
+        all_refs (bool): Whether the history of all refs was read.
+    """
+
+    shard: Shard
+    fingerprint: str
+    revisions: list[str]
+    all_refs: bool
+
+    def source(self) -> tuple:
+        """Everything that must be the same for the shards of one run."""
+        return self.shard.count, self.fingerprint, self.revisions, self.all_refs
+
+
+class PartialWriter:
+    """Writes the results of a shard to a gzipped JSON lines file, as they come in.
+
+    The first line is the header, then each commit is a compact array of its position, hash,
+    header line, and either the messages of its failed rules and whether any was an error, or
+    the reason it could not be parsed. The last line holds the totals, so a file cut short by a
+    failed runner is detected when merging.
+
+    Args:
+        path (Path): The file to write.
+        header (PartialHeader): What the results are produced from.
+    """
+
+    def __init__(self, path: Path, header: PartialHeader):
+        # A lower level than the default 9 is several times faster and barely larger
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self._write(
+            {
+                "version": PARTIAL_VERSION,
+                "shard": list(header.shard),
+                "fingerprint": header.fingerprint,
+                "revisions": header.revisions,
+                "all_refs": header.all_refs,
+            }
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def commit(self, position: int, commit: GitCommit, outcome: LintOutcome):
+        record = [position, commit.sha, commit.message.partition("\n")[0]]
+        if isinstance(outcome, ValueError):
+            record.append(str(outcome))
+        elif outcome.messages:
+            record.extend((outcome.messages, outcome.has_errors))
+        self._write(record)
+
+    def summary(self, checked: int, failed: int):
+        self._write({"checked": checked, "failed": failed})
+
+    def close(self):
+        self._file.close()
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+class _PartialReader:
+    """Reads a partial result file written by `PartialWriter`."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.totals: dict[str, int] | None = None
+        try:
+            self._file = gzip.open(path, "rt", encoding="utf-8")
+        except OSError as e:
+            raise PartialError(f"Cannot read {path}. {e}") from None
+        try:
+            data = json.loads(self._file.readline())
+            if data.get("version") != PARTIAL_VERSION:
+                raise PartialError(
+                    f"{path} has version {data.get('version')}, expected {PARTIAL_VERSION}."
+                )
+            self.header = PartialHeader(
+                Shard(*data["shard"]), data["fingerprint"], data["revisions"], data["all_refs"]
+            )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            self.close()
+            raise PartialError(f"{path} is not a partial result file. {e}") from None
+
+    def __iter__(self) -> Iterator[tuple[int, GitCommit, LintOutcome]]:
+        try:
+            for line in self._file:
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    self.totals = record
+                    return
+                position, sha, header, *outcome = record
+                if len(outcome) == 1:
+                    result = ValueError(outcome[0])
+                elif outcome:
+                    result = LintResult(results={}, messages=outcome[0], has_errors=outcome[1])
+                else:
+                    result = LintResult(results={})
+                yield position, GitCommit(sha, header), result
+        except (OSError, EOFError, ValueError) as e:
+            raise PartialError(f"{self.path} is damaged. {e}") from None
+        finally:
+            self.close()
+
+    def close(self):
+        self._file.close()
+
+
+class MergedShards:
+    """The results of every shard of a run, read back in the order of an unsharded run.
+
+    The files are merged by the position of each commit in the history, reading one commit of
+    each file at a time, so memory use does not grow with the number of commits.
+
+    The outcomes only hold the messages of the failed rules and whether any was an error, not
+    the result of every rule, which is all a history report shows.
+
+    Args:
+        paths (Iterable[Path]): The partial result file of each shard.
+        fingerprint (str): The fingerprint of the rules the results will be reported with.
+
+    Raises:
+        PartialError: If a file is not a partial result file, the files are not every shard of
+            the same run once each, or the shards were linted with other rules.
+    """
+
+    def __init__(self, paths: Iterable[Path], fingerprint: str):
+        self._readers: list[_PartialReader] = []
+        try:
+            for path in paths:
+                self._readers.append(_PartialReader(path))
+            _check_shards(self._readers, fingerprint)
+        except PartialError:
+            self.close()
+            raise
+        logger.debug("Merging %d shards", len(self._readers))
+
+    def __iter__(self) -> Iterator[tuple[GitCommit, LintOutcome]]:
+        for _, commit, outcome in heapq.merge(*self._readers, key=itemgetter(0)):
+            yield commit, outcome
+
+    def check_complete(self, checked: int):
+        """Check that every file was read to its end and `checked` commits were merged.
+
+        Raises:
+            PartialError: If a shard did not finish writing its results.
+        """
+        for reader in self._readers:
+            if reader.totals is None:
+                raise PartialError(
+                    f"{reader.path} ends early. The shard {reader.header.shard} did not finish."
+                )
+        expected = sum(reader.totals["checked"] for reader in self._readers)
+        if checked != expected:
+            raise PartialError(f"Merged {checked} commits, but the shards checked {expected}.")
+
+    def close(self):
+        for reader in self._readers:
+            reader.close()
+
+
+def _check_shards(readers: list[_PartialReader], fingerprint: str):
+    if not readers:
+        raise PartialError("No partial result files to merge.")
+    first = readers[0].header
+    for reader in readers:
+        if reader.header.source() != first.source():
+            raise PartialError(
+                f"{reader.path} is not a shard of the same run as {readers[0].path}. The number "
+                "of shards, the rules and the revisions must be the same."
+            )
+    if first.fingerprint != fingerprint:
+        raise PartialError(
+            "The shards were linted with other rules than the ones to report them with. Pass the "
+            "same --config-file as to the shards."
+        )
+
+    indices = Counter(reader.header.shard.index for reader in readers)
+    expected = range(1, first.shard.count + 1)
+    missing = [index for index in expected if index not in indices]
+    duplicated = sorted(index for index, count in indices.items() if count > 1)
+    if missing or duplicated:
+        raise PartialError(
+            f"Expected the results of shards 1 to {first.shard.count} once each. "
+            f"Missing: {missing or 'none'}, duplicated: {duplicated or 'none'}."
+        )
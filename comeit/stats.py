@@ -0,0 +1,136 @@
+"""Statistics of the rule failures of a history, aggregated in constant memory."""
+
+import heapq
+import time
+from collections import Counter
+from operator import itemgetter
+
+from .checks.header import parse_header
+from .git import GitCommit
+from .lint_result import LintOutcome
+
+DEFAULT_TOP = 10
+DEFAULT_SKETCH_SIZE = 1024
+
+# The type counted for messages without one
+NO_TYPE = "(none)"
+
+
+class SpaceSaving:
+    """Approximate counts of the most frequent items of a stream, in bounded memory.
+
+    This is the Space-Saving algorithm. At most `size` items are counted. An item without a
+    counter takes over the counter of the least counted item, and the count it inherits is its
+    maximum overestimate. Of a stream of n items, every item occurring more than n / size times is
+    guaranteed to be counted, and no count is more than n / size too high.
+
+    The counters are grouped by count, so adding an item takes constant time.
+
+    Args:
+        size (int): The maximum number of counters. Defaults to `DEFAULT_SKETCH_SIZE`.
+    """
+
+    __slots__ = ("size", "_counts", "_errors", "_buckets", "_min")
+
+    def __init__(self, size: int = DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self._counts: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        # The items of each count, in the order they got it, so the oldest is evicted first
+        self._buckets: dict[int, dict[str, None]] = {}
+        self._min = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, item: str):
+        """Count one occurrence of an item."""
+        count = self._counts.get(item)
+        if count is not None:
+            self._remove(item, count)
+        elif len(self._counts) < self.size:
+            count = 0
+            self._errors[item] = 0
+        else:
+            count = self._min
+            evicted = next(iter(self._buckets[count]))
+            self._remove(evicted, count)
+            del self._counts[evicted], self._errors[evicted]
+            self._errors[item] = count
+
+        self._counts[item] = count + 1
+        self._buckets.setdefault(count + 1, {})[item] = None
+        if count == 0:
+            self._min = 1
+        elif count == self._min and count not in self._buckets:
+            self._min = count + 1
+
+    def top(self, n: int) -> list[tuple[str, int, int]]:
+        """Return the n most counted items.
+
+        Returns:
+            list[tuple[str, int, int]]: Each item with its count and the maximum overestimate of
+                the count, the highest count first.
+        """
+        items = heapq.nlargest(n, self._counts.items(), key=itemgetter(1))
+        return [(item, count, self._errors[item]) for item, count in items]
+
+    def _remove(self, item: str, count: int):
+        bucket = self._buckets[count]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[count]
+
+
+class HistoryStats:
+    """Aggregates of the lint results of a history, updated one commit at a time.
+
+    Nothing is kept of a single commit, so memory use does not grow with the length of the
+    history. The counters of the rules are bounded by the rule set, the months by the time span
+    of the history, and the authors and types by the size of their sketches.
+
+    A commit fails if it fails a rule with severity ERROR or cannot be parsed, like when linting
+    a history.
+
+    Args:
+        sketch_size (int): The number of counters of the author and type sketches. Defaults to
+            `DEFAULT_SKETCH_SIZE`.
+
+    Attributes:
+        checked (int): The number of commits linted.
+        failed (int): The number of commits that failed.
+        rule_failures (Counter[str]): The number of commits each rule failed for, by rule ID.
+        months (dict[str, list[int]]): The number of commits linted and failed in each month,
+            keyed by "YYYY-MM" of the committer date in UTC.
+        authors (SpaceSaving): The authors of the failed commits.
+        types (SpaceSaving): The types of the failed commits, or `NO_TYPE`.
+    """
+
+    def __init__(self, sketch_size: int = DEFAULT_SKETCH_SIZE):
+        self.checked = 0
+        self.failed = 0
+        self.rule_failures: Counter[str] = Counter()
+        self.months: dict[str, list[int]] = {}
+        self.authors = SpaceSaving(sketch_size)
+        self.types = SpaceSaving(sketch_size)
+
+    def record(self, commit: GitCommit, outcome: LintOutcome):
+        """Add the result of a commit read with its details."""
+        self.checked += 1
+        invalid = isinstance(outcome, ValueError)
+        failed = invalid or outcome.has_errors
+        if not invalid:
+            self.rule_failures.update(outcome.messages.keys())
+
+        if commit.timestamp is not None:
+            year, month = time.gmtime(commit.timestamp)[:2]
+            counts = self.months.setdefault(f"{year:04d}-{month:02d}", [0, 0])
+            counts[0] += 1
+            counts[1] += failed
+
+        if failed:
+            self.failed += 1
+            if commit.author is not None:
+                self.authors.add(commit.author)
+            header = commit.message.partition("\n")[0]
+            self.types.add(parse_header(header).type or NO_TYPE)
@@ -0,0 +1,76 @@
+import pytest
+from comeit import Linter, LintResult, RuleConfig, RuleResult, Severity
+from comeit.cache import ResultCache
+
+
+def _rule_configs(severity):
+    return [
+        RuleConfig(
+            id="01",
+            description="Check header length",
+            check="length",
+            component="HEADER",
+            severity=severity,
+            dependencies=None,
+        ),
+    ]
+
+
+def _linter(cache_path, severity=Severity.ERROR, max_header_length=10):
+    return Linter(
+        types={"feat", "fix"},
+        max_header_length=max_header_length,
+        rule_configs=_rule_configs(severity),
+        cache_path=cache_path,
+    )
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "comeit" / "cache.sqlite3"
+
+
+def test_cached_message_is_not_linted_again(cache_path, monkeypatch):
+    """Verifies that a cached result is returned without applying the rules."""
+    linter = _linter(cache_path)
+    expected = linter.lint("feat: too long")
+    linter.close()
+
+    linter = _linter(cache_path)
+    monkeypatch.setattr(linter._rule_manager, "apply_rules", pytest.fail)
+
+    assert linter.lint("feat: too long") == expected
+    assert expected == LintResult(
+        results={"01": RuleResult.FAILED},
+        messages={"01": "Exceeded header length 14/10."},
+        has_errors=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "changed_config", [dict(severity=Severity.WARNING), dict(max_header_length=20)]
+)
+def test_config_change_invalidates_cache(cache_path, changed_config):
+    """Verifies that results of a different rule config are not reused."""
+    linter = _linter(cache_path)
+    linter.lint("feat: too long")
+    linter.close()
+
+    linter = _linter(cache_path, **changed_config)
+    assert linter._cache.get("feat: too long") is None
+    assert linter.lint("feat: too long").has_errors is False
+
+
+def test_evict_keeps_most_recent_results(cache_path, monkeypatch):
+    """Verifies that the cache is trimmed to its size, dropping the oldest results first."""
+    cache = ResultCache(cache_path, fingerprint="rules", max_entries=2)
+    lint_result = LintResult(results={"01": RuleResult.SUCCESS})
+    for timestamp, message in enumerate(["feat: a", "feat: b", "feat: c"]):
+        monkeypatch.setattr("comeit.cache.time.time", lambda: timestamp)
+        cache.put(message, lint_result)
+
+    assert cache.evict() == 1
+    assert cache.get("feat: a") is None
+    assert cache.get("feat: b") == lint_result
+    assert cache.get("feat: c") == lint_result
+    cache.close()
@@ -0,0 +1,103 @@
+import pytest
+from comeit.checks.header import Header, parse_header
+
+
+@pytest.fixture
+def header():
+    return Header(types={"feat", "fix"}, max_length=52, max_scope_length=5)
+
+
+def test_parse_header_parts_and_spans():
+    """Verifies that the type, scope, breaking marker and summary are found with their offsets."""
+    text = "feat(core)!: add new feature"
+    parsed = parse_header(text)
+
+    assert parsed.type == "feat"
+    assert parsed.scope == "core"
+    assert parsed.breaking is True
+    assert parsed.summary == "add new feature"
+    for part, span in [
+        (parsed.type, parsed.type_span),
+        (parsed.scope, parsed.scope_span),
+        (parsed.summary, parsed.summary_span),
+    ]:
+        assert text[span[0] : span[1]] == part
+
+
+def test_parse_header_without_colon():
+    """Verifies that no part is identified when the header has no colon."""
+    parsed = parse_header("add new feature")
+
+    assert parsed.type is None
+    assert parsed.scope is None
+    assert parsed.summary is None
+
+
+@pytest.mark.parametrize(
+    "text", ["fix(parser: handle x", "feat!(api): x", "fix(a)(b): x", "feat(scope)extra: x"]
+)
+def test_parse_header_with_malformed_prefix(header, text):
+    """Verifies that a colon after a malformed type or scope is found, and reported as such."""
+    parsed = parse_header(text)
+
+    assert parsed.malformed
+    assert parsed.type is None
+    summary = text.partition(":")[2].strip()
+    assert parsed.summary == text[parsed.summary_span[0] : parsed.summary_span[1]] == summary
+    assert header.has_type(text) == (
+        False,
+        f"Malformed type or scope before the colon: '{text.partition(':')[0]}'.",
+    )
+
+
+def test_parse_header_is_shared_between_checks(header):
+    """Verifies that running every check on a header parses it only once."""
+    parse_header.cache_clear()
+
+    header.check_header("fix: a header only parsed once")
+
+    info = parse_header.cache_info()
+    assert info.misses == 1
+    assert info.hits > 0
+
+
+@pytest.mark.parametrize(
+    "check, text, expected",
+    [
+        ("has_type", "feat: ok", True),
+        ("has_type", "no colon here", False),
+        ("has_type", "two words: summary", False),
+        ("type_empty", ": summary", False),
+        ("type_empty", "feat: summary", True),
+        ("type_in_type_set", "Feat: summary", True),
+        ("type_in_type_set", "docs: summary", False),
+        ("type_case", "Feat: summary", False),
+        ("has_scope", "feat(core): summary", True),
+        ("has_scope", "feat: summary", False),
+        ("scope_chars", "feat(co_re): summary", False),
+        ("scope_chars", "feat: summary", True),
+        ("scope_case", "feat(Core): summary", False),
+        ("scope_length", "feat(longer): summary", False),
+        ("has_summary", "feat:   ", False),
+        ("summary_case", "feat: Add", False),
+        ("summary_case", "feat: add", True),
+        ("length", "feat: " + "a" * 47, False),
+    ],
+)
+def test_header_checks(header, check, text, expected):
+    """Verifies the result of each header check."""
+    success, message = getattr(header, check)(text)
+
+    assert success is expected
+    assert bool(message) is not expected
+
+
+@pytest.mark.parametrize("check", ["length", "has_type", "type_empty", "type_in_type_set"])
+def test_header_batch_checks_match_single_checks(header, check):
+    """Verifies that the batch version of a check agrees with the check itself."""
+    headers = ["feat: ok", "no colon", "two words: x", ": x", "Docs: x", "feat!(a): x"]
+    headers.append("fix: " + "a" * 60)
+
+    passed = getattr(header, f"{check}_many")(headers)
+
+    assert passed == [getattr(header, check)(text)[0] for text in headers]
@@ -0,0 +1,68 @@
+import os
+import subprocess
+
+import pytest
+
+
+def _git(repo, *args, date=None, env=None) -> str:
+    """Run git in `repo` as a fixed user, and return its stripped output.
+
+    `date` sets the author and committer date of new commits, and `env` adds environment
+    variables.
+    """
+    env = dict(env or {})
+    if date:
+        env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    return subprocess.run(
+        ["git", "-c", "user.name=comeit", "-c", "user.email=comeit@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, **env} if env else None,
+    ).stdout.strip()
+
+
+def _commit(repo, message, date=None) -> str:
+    """Add an empty commit with the given message to `repo`, and return its hash."""
+    _git(repo, "commit", "-q", "--allow-empty", "--allow-empty-message", "-m", message, date=date)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+def _init(path, *messages) -> str:
+    """Create a repository with a `main` branch and a commit per message at `path`."""
+    path.mkdir(parents=True, exist_ok=True)
+    _git(path, "init", "-q", "-b", "main")
+    for message in messages:
+        _commit(path, message)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keeps the precompiled rules and the result cache of every test out of the user's cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def git():
+    """Runs git in a repository: `git(repo, *args, date=None, env=None) -> str`."""
+    return _git
+
+
+@pytest.fixture
+def commit():
+    """Adds an empty commit to a repository: `commit(repo, message, date=None) -> str`."""
+    return _commit
+
+
+@pytest.fixture
+def init_repo():
+    """Creates a repository with a commit per message: `init_repo(path, *messages) -> Path`."""
+    return _init
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """An empty repository with a `main` branch."""
+    return _init(tmp_path)
@@ -0,0 +1,86 @@
+import socket
+import threading
+
+import pytest
+from comeit import Linter, RuleLoader
+from comeit.client import lint, main
+from comeit.daemon import CommitLintServer
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    return tmp_path / "comeit_config.yml"
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return tmp_path / "comeit" / "daemon.sock"
+
+
+@pytest.fixture
+def server(socket_path, config_file):
+    def create_linter():
+        return Linter(types={"feat", "fix"}, max_header_length=20, user_rules_yml=config_file)
+
+    config_files = RuleLoader(user_rules_yml=config_file).config_files()
+    server = CommitLintServer(socket_path, create_linter, config_files)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_client_receives_report(server, socket_path):
+    """Verifies that the daemon lints the message sent by the client, ignoring comments."""
+    assert lint(socket_path, b"feat: ok\n# Please enter the commit message\n") == (0, "")
+
+    exit_code, report = lint(socket_path, b"feat: this header is too long")
+    assert exit_code == 1
+    assert report == "❌ Error   01 - Check header length: Exceeded header length 29/20.\n"
+
+
+def test_daemon_reloads_changed_config(server, socket_path, config_file):
+    """Verifies that the rules are loaded again when the config file appears."""
+    assert lint(socket_path, b"feat: this header is too long")[0] == 1
+
+    config_file.write_text('"01": WARNING\n')
+
+    exit_code, report = lint(socket_path, b"feat: this header is too long")
+    assert exit_code == 0
+    assert report.startswith("🚧 Warning 01")
+
+
+def test_socket_is_removed_on_close(server, socket_path):
+    """Verifies that the daemon cleans up its socket."""
+    assert socket_path.exists()
+    server.server_close()
+    assert not socket_path.exists()
+
+
+@pytest.mark.parametrize("reply", [b"", b"Traceback (most recent call last):\n"])
+def test_client_reports_a_failed_daemon(tmp_path, capsys, reply):
+    """Verifies that a missing or malformed reply is reported as a daemon failure."""
+    socket_path = tmp_path / "daemon.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    listener.listen(1)
+
+    def reply_and_close():
+        connection, _ = listener.accept()
+        with connection:
+            connection.recv(65536)
+            connection.sendall(reply)
+
+    thread = threading.Thread(target=reply_and_close)
+    thread.start()
+    message_file = tmp_path / "COMMIT_EDITMSG"
+    message_file.write_text("feat: ok\n")
+
+    exit_code = main(["--socket", str(socket_path), str(message_file)])
+
+    thread.join()
+    listener.close()
+    assert exit_code == 1
+    assert "failed to lint the message" in capsys.readouterr().err
@@ -0,0 +1,119 @@
+import subprocess
+
+import pytest
+from comeit import git_objects
+from comeit.git import GitError, iter_commits
+
+
+@pytest.fixture
+def repo(repo, git, commit):
+    """A history with branches, a merge, an annotated tag and commits sharing a timestamp."""
+    for index in range(5):
+        body = "\n\n" + "A long body line repeated to make deltas worthwhile.\n" * 20
+        commit(repo, f"feat: main {index}{body}", date=f"2024-01-0{index + 1}T12:00:00")
+    git(repo, "checkout", "-q", "-b", "topic", "HEAD~2")
+    for index in range(3):
+        commit(repo, f"fix: topic {index}", date="2024-01-04T12:00:00")
+    git(repo, "tag", "-a", "v1", "-m", "Release", "HEAD~1")
+    git(repo, "checkout", "-q", "main")
+    git(repo, "merge", "-q", "--no-ff", "topic", "-m", "Merge topic\n\nWith ünïcode.",
+        date="2024-01-09T12:00:00")
+    commit(repo, "docs: last", date="2024-01-10T12:00:00")
+    return repo
+
+
+REVISIONS = [
+    ([], False),
+    ([], True),
+    (["topic"], False),
+    (["main~1..main"], False),
+    (["v1..main"], False),
+    (["topic..main"], False),
+    (["main..topic"], False),
+    (["HEAD~1^2"], False),
+    (["main", "^topic~2"], False),
+]
+
+
+def _compare(repo, revisions, all_refs):
+    for details in (False, True):
+        kwargs = dict(revisions=revisions, all_refs=all_refs, cwd=repo, details=details)
+        assert list(git_objects.iter_commits(**kwargs)) == list(iter_commits(**kwargs))
+
+
+@pytest.mark.parametrize("revisions, all_refs", REVISIONS)
+def test_loose_objects_match_git_log(repo, revisions, all_refs):
+    """Verifies that loose objects and refs are read like git log reads them."""
+    _compare(repo, revisions, all_refs)
+
+
+@pytest.mark.parametrize("revisions, all_refs", REVISIONS)
+def test_packed_objects_match_git_log(repo, git, revisions, all_refs):
+    """Verifies that deltified pack entries and packed refs are read like git log reads them."""
+    git(repo, "repack", "-adfq", "--depth=50", "--window=250")
+    git(repo, "pack-refs", "--all")
+
+    _compare(repo, revisions, all_refs)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_abbreviated_hashes_are_resolved(repo, git, packed):
+    """Verifies that unique abbreviated hashes name the objects they start."""
+    if packed:
+        git(repo, "repack", "-adq")
+    short = git(repo, "rev-parse", "--short=7", "main~2")
+    tag = git(repo, "rev-parse", "v1")
+
+    _compare(repo, [f"{short}..main", tag[:10]], False)
+    # Like git, fewer than 4 digits are not taken as a hash
+    with pytest.raises(GitError, match="bad revision"):
+        list(git_objects.iter_commits(revisions=[short[:3]], cwd=repo))
+
+
+def test_clock_skew_matches_git_log(tmp_path, init_repo, git, commit):
+    """Verifies that excluded commits dated before their parents still exclude them."""
+    repo = init_repo(tmp_path / "skewed")
+    commit(repo, "feat: shared", date="2024-01-15T12:00:00")
+    commit(repo, "feat: new", date="2024-01-20T12:00:00")
+    git(repo, "checkout", "-q", "-b", "old", "HEAD~1")
+    # The excluded side reaches the shared commit only through commits dated before it
+    for day in range(8, 11):
+        commit(repo, f"fix: skewed {day}", date=f"2024-01-{day:02}T12:00:00")
+    commit(repo, "fix: old", date="2024-01-30T12:00:00")
+
+    commits = list(git_objects.iter_commits(revisions=["old..main"], cwd=repo))
+
+    assert [commit.message for commit in commits] == ["feat: new"]
+    _compare(repo, ["old..main"], False)
+
+
+def test_delta_chains_are_resolved_through_the_cache(repo, git):
+    """Verifies that commits stored as deltas are inflated, reusing the cached bases."""
+    git(repo, "repack", "-adfq", "--depth=50", "--window=250")
+    indexes = [str(path) for path in (repo / ".git" / "objects" / "pack").glob("*.idx")]
+    listing = git(repo, "verify-pack", "-v", *indexes)
+    # Deltified entries list their depth and base after the sizes and offset
+    deltified = [
+        line.split()[0]
+        for line in listing.splitlines()
+        if " commit " in line and len(line.split()) > 5
+    ]
+    assert deltified, "expected git to store some commits as deltas"
+
+    with git_objects.ObjectReader(repo / ".git", delta_cache_size=1024 * 1024) as reader:
+        for sha in deltified:
+            expected = subprocess.run(
+                ["git", "cat-file", "commit", sha], cwd=repo, check=True, capture_output=True
+            ).stdout
+            assert reader.read_object(sha) == ("commit", expected)
+        assert reader._delta_cache
+
+
+def test_reader_errors(repo):
+    """Verifies that unknown revisions and missing repositories raise a GitError."""
+    with pytest.raises(GitError, match="bad revision"):
+        list(git_objects.iter_commits(revisions=["nope..main"], cwd=repo))
+    with pytest.raises(GitError, match="not supported"):
+        list(git_objects.iter_commits(revisions=["main...topic"], cwd=repo))
+    with pytest.raises(GitError, match="Not a git repository"):
+        git_objects.find_git_dir(repo.parent)
@@ -0,0 +1,32 @@
+import pytest
+from comeit.git import GitCommit, GitError, iter_commits
+
+
+@pytest.fixture
+def repo(tmp_path, init_repo):
+    return init_repo(tmp_path, "feat: first", "fix: second\n\nWith a body.", "docs: third")
+
+
+def test_iter_commits_streams_history_newest_first(repo, git):
+    """Verifies that all commits are read with their full messages in git log order."""
+    commits = list(iter_commits(cwd=repo))
+
+    assert [commit.message for commit in commits] == [
+        "docs: third",
+        "fix: second\n\nWith a body.",
+        "feat: first",
+    ]
+    assert commits[0] == GitCommit(sha=git(repo, "rev-parse", "HEAD"), message="docs: third")
+
+
+def test_iter_commits_range(repo):
+    """Verifies that only the commits in the given revision range are read."""
+    commits = list(iter_commits(revisions=["HEAD~2..HEAD"], cwd=repo))
+
+    assert [commit.message for commit in commits] == ["docs: third", "fix: second\n\nWith a body."]
+
+
+def test_iter_commits_bad_revision(repo):
+    """Verifies that a failing git command raises a GitError."""
+    with pytest.raises(GitError, match="bad revision"):
+        list(iter_commits(revisions=["nope..HEAD"], cwd=repo))
@@ -0,0 +1,86 @@
+import dataclasses
+import pickle
+
+import pytest
+from comeit import Linter, RuleConfig, RuleResult, Severity
+from comeit.rules.rule_manager import NO_MESSAGES
+
+RULE_CONFIGS = [
+    RuleConfig(
+        id="01",
+        description="Check header length",
+        check="length",
+        component="HEADER",
+        severity=Severity.ERROR,
+        dependencies=None,
+    ),
+    RuleConfig(
+        id="02",
+        description="Tries to find a colon ':' in the header preceded by exactly one word",
+        check="has_type",
+        component="HEADER",
+        severity=Severity.WARNING,
+        dependencies=None,
+    ),
+]
+
+
+@pytest.fixture
+def linter():
+    return Linter(types={"feat", "fix"}, max_header_length=20, rule_configs=RULE_CONFIGS)
+
+
+def test_lint_valid_message(linter):
+    """Verifies that a valid message passes all rules."""
+    lint_result = linter.lint("feat: short\n\nA body that is longer than the header limit.")
+
+    assert lint_result.results == {"01": RuleResult.SUCCESS, "02": RuleResult.SUCCESS}
+    assert lint_result.messages == {}
+    assert not lint_result.has_errors
+
+
+def test_lint_reuses_rules_across_messages(linter):
+    """Verifies that the same rules give independent results for different messages."""
+    rules = linter.rules
+    too_long, no_type, valid = linter.lint_many(
+        ["feat: this header is too long", "no type", "fix: short"]
+    )
+
+    assert linter.rules is rules
+    assert too_long.results["01"] == RuleResult.FAILED
+    assert too_long.messages == {"01": "Exceeded header length 29/20."}
+    assert too_long.has_errors
+    assert no_type.results == {"01": RuleResult.SUCCESS, "02": RuleResult.FAILED}
+    assert not no_type.has_errors
+    assert not valid.messages
+
+
+def test_lint_empty_message(linter):
+    """Verifies that an empty message cannot be linted."""
+    with pytest.raises(ValueError, match="Commit message is empty."):
+        linter.lint("")
+
+
+def test_lint_batch_matches_lint(linter):
+    """Verifies that linting a batch gives the same results as linting each message."""
+    messages = ["feat: this header is too long", "no type", "", "fix: short"]
+
+    outcomes = linter.lint_batch(messages)
+
+    assert isinstance(outcomes[2], ValueError)
+    del messages[2], outcomes[2]
+    assert outcomes == [linter.lint(message) for message in messages]
+
+
+def test_clean_results_are_shared(linter):
+    """Verifies that messages without failed rules share one read-only outcome."""
+    first, second, failed = linter.lint_batch(["feat: one", "fix: two", "no type"])
+
+    assert first is second is linter.lint("feat: three")
+    assert first.messages is NO_MESSAGES
+    with pytest.raises(TypeError, match="cannot be changed"):
+        first.messages["01"] = "Changed."
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.has_errors = True
+    assert failed is not linter.lint("no type")
+    assert pickle.loads(pickle.dumps(first)).messages is NO_MESSAGES
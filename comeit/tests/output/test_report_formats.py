@@ -0,0 +1,189 @@
+import io
+import json
+
+import pytest
+from comeit import Linter, RuleConfig, Severity
+from comeit.__main__ import lint_history
+from comeit.git import GitCommit, GitError
+from comeit.output import AGGREGATE_FORMATS, AggregateReport, create_report
+
+RULE_CONFIGS = [
+    RuleConfig(
+        id="01",
+        description="Check header length",
+        check="length",
+        component="HEADER",
+        severity=Severity.ERROR,
+        dependencies=None,
+    ),
+    RuleConfig(
+        id="02",
+        description="Tries to find a colon ':' in the header preceded by exactly one word",
+        check="has_type",
+        component="HEADER",
+        severity=Severity.WARNING,
+        dependencies=None,
+    ),
+]
+
+COMMITS = [
+    GitCommit("a" * 40, "feat: short"),
+    GitCommit("b" * 40, "no type but a header that is too long"),
+]
+
+
+@pytest.fixture
+def linter():
+    return Linter(types={"feat", "fix"}, max_header_length=20, rule_configs=RULE_CONFIGS)
+
+
+def test_jsonl_writes_a_record_per_commit_as_it_is_reported(linter):
+    """Verifies that every commit is written as a JSON line before the next one is reported."""
+    stream = io.StringIO()
+    report = create_report("jsonl", linter.rules, stream)
+
+    report.commit(COMMITS[0], linter.lint(COMMITS[0].message))
+    first = json.loads(stream.getvalue())
+    report.commit(COMMITS[1], linter.lint(COMMITS[1].message))
+    report.commit(GitCommit("c" * 40, ""), ValueError("Commit message is empty."))
+    report.summary(checked=3, failed=2)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first == {
+        "type": "commit",
+        "sha": "a" * 40,
+        "header": "feat: short",
+        "ok": True,
+        "violations": [],
+    }
+    assert [(v["rule"], v["severity"]) for v in records[1]["violations"]] == [
+        ("01", "ERROR"),
+        ("02", "WARNING"),
+    ]
+    assert records[2]["error"] == "Commit message is empty."
+    assert records[3] == {"type": "summary", "checked": 3, "failed": 2}
+
+
+def test_sarif_streams_a_valid_log(linter):
+    """Verifies that SARIF results are written as they come and summary completes the log."""
+    stream = io.StringIO()
+    report = create_report("sarif", linter.rules, stream)
+
+    for commit in COMMITS:
+        report.commit(commit, linter.lint(commit.message))
+    written_before_summary = stream.getvalue()
+    report.summary(checked=2, failed=1)
+
+    assert '"ruleId": "02"' in written_before_summary
+    run = json.loads(stream.getvalue())["runs"][0]
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == ["01", "02"]
+    assert [(r["ruleId"], r["level"]) for r in run["results"]] == [
+        ("01", "error"),
+        ("02", "warning"),
+    ]
+    location = run["results"][0]["locations"][0]["logicalLocations"][0]
+    assert location["fullyQualifiedName"] == "b" * 40
+    assert run["properties"] == {"checked": 2, "failed": 1}
+
+
+def test_sarif_single_message_without_failures(linter):
+    """Verifies that a single message without failures is a complete log without results."""
+    stream = io.StringIO()
+
+    create_report("sarif", linter.rules, stream).message(linter.lint("feat: short"))
+
+    assert json.loads(stream.getvalue())["runs"][0]["results"] == []
+
+
+def test_only_aggregate_formats_report_scans_and_stats(linter):
+    """Verifies that sarif has no scan or stats reports, and the other formats implement them."""
+    assert not isinstance(create_report("sarif", linter.rules, io.StringIO()), AggregateReport)
+    for format in AGGREGATE_FORMATS:
+        assert isinstance(create_report(format, linter.rules, io.StringIO()), AggregateReport)
+    with pytest.raises(TypeError, match="abstract"):
+        type("Partial", (AggregateReport,), {"message": lambda self, result: None})(linter.rules)
+
+
+@pytest.mark.parametrize("format", ["jsonl", "sarif"])
+def test_git_error_midway_still_completes_the_output(repo, commit, monkeypatch, linter, format):
+    """Verifies that the summary is written even when git fails while the history is read."""
+    commit(repo, "feat: short")
+    monkeypatch.chdir(repo)
+    stream = io.StringIO()
+
+    with pytest.raises(GitError, match="bad revision"):
+        lint_history(linter, create_report(format, linter.rules, stream), ["nope"], False)
+
+    if format == "jsonl":
+        assert json.loads(stream.getvalue()) == {"type": "summary", "checked": 0, "failed": 0}
+    else:
+        assert json.loads(stream.getvalue())["runs"][0]["properties"]["checked"] == 0
+
+
+def test_scan_reports_each_repository_and_the_rule_totals(linter):
+    """Verifies that a fleet scan is written as a record per repository and a summary."""
+    from pathlib import Path
+
+    from comeit.scan import RepoScan, ScanStats, ScanSummary
+
+    summary = ScanSummary()
+    stats = ScanStats()
+    for commit in COMMITS:
+        stats.record(linter.lint(commit.message))
+    stats.record(ValueError("Commit message is empty."))
+    scans = [
+        RepoScan(Path("/repos/app"), None, stats),
+        RepoScan(Path("/repos/empty"), None, ScanStats(), error="bad revision 'HEAD'"),
+    ]
+    jsonl, plain = io.StringIO(), io.StringIO()
+    reports = [create_report("jsonl", linter.rules, jsonl), create_report("plain", linter.rules, plain)]
+
+    for scan in scans:
+        summary.add(scan)
+        for report in reports:
+            report.repo(scan)
+    for report in reports:
+        report.scan_summary(summary)
+
+    records = [json.loads(line) for line in jsonl.getvalue().splitlines()]
+    assert records[0] == {
+        "type": "repo",
+        "path": "/repos/app",
+        "config": None,
+        "checked": 3,
+        "failed": 2,
+        "invalid": 1,
+        "rules": {"01": 1, "02": 1},
+    }
+    assert records[1]["error"] == "bad revision 'HEAD'"
+    assert records[2] == {
+        "type": "scan_summary",
+        "repositories": 2,
+        "errors": 1,
+        "checked": 3,
+        "failed": 2,
+        "invalid": 1,
+        "rules": {"01": 1, "02": 1},
+    }
+    assert plain.getvalue().splitlines() == [
+        "❌ /repos/app: 3 commits, 2 failed",
+        "❌ /repos/empty: bad revision 'HEAD'",
+        "         1 01 - Check header length",
+        "         1 02 - Tries to find a colon ':' in the header preceded by exactly one word",
+        "Scanned 2 repositories, 3 commits, 2 failed. 1 repositories could not be scanned.",
+    ]
+
+
+def test_rich_shows_descriptions_and_messages_verbatim(monkeypatch):
+    """Verifies that square brackets in descriptions and messages are not parsed as markup."""
+    monkeypatch.setenv("COLUMNS", "200")
+    linter = Linter(types={"feat", "fix"}, max_header_length=20)
+    lint_result = linter.lint(": no type")
+    lint_result.messages["03"] = "[bold]Not markup[/bold]."
+    stream = io.StringIO()
+
+    create_report("rich", linter.rules, stream).message(lint_result)
+
+    output = stream.getvalue()
+    assert "Cannot have a ':' with no [a-z] char preceding it" in output
+    assert "[bold]Not markup[/bold]." in output
@@ -0,0 +1,37 @@
+from comeit import Linter, RuleConfig, Severity
+from comeit.git import GitCommit
+from comeit.parallel import lint_commits, lint_commits_parallel
+
+LINTER_KWARGS = dict(
+    types={"feat", "fix"},
+    max_header_length=20,
+    rule_configs=[
+        RuleConfig(
+            id="01",
+            description="Check header length",
+            check="length",
+            component="HEADER",
+            severity=Severity.ERROR,
+            dependencies=None,
+        ),
+    ],
+)
+
+
+def test_parallel_results_match_serial_results_in_order():
+    """Verifies that linting in a process pool gives the serial results in commit order."""
+    commits = [
+        GitCommit(sha=f"{i:040x}", message="feat: ok" if i % 3 else "feat: a header that is too long")
+        for i in range(50)
+    ]
+    commits.append(GitCommit(sha="f" * 40, message=""))
+
+    serial = list(lint_commits(Linter(**LINTER_KWARGS), commits))
+    parallel = list(
+        lint_commits_parallel(commits, jobs=2, linter_kwargs=LINTER_KWARGS, batch_size=7)
+    )
+
+    assert [commit for commit, _ in parallel] == commits
+    assert [result for _, result in parallel[:-1]] == [result for _, result in serial[:-1]]
+    assert isinstance(parallel[-1][1], ValueError)
+    assert str(parallel[-1][1]) == str(serial[-1][1])
@@ -0,0 +1,31 @@
+import pytest
+from comeit.parse_args import ConfigArgs, parse_args
+
+
+def test_every_field_is_set_without_a_command():
+    """Verifies that the options of the commands default to None when no command is given."""
+    args = parse_args(["--format", "plain"])
+
+    assert isinstance(args, ConfigArgs)
+    assert (args.command, args.format, args.top, args.paths) == (None, "plain", None, None)
+    assert parse_args(["stats"]).top == 10
+
+
+@pytest.mark.parametrize("argv", [["stats", "--format", "plain"], ["serve", "--bogus"]])
+def test_unknown_option_after_a_command_is_a_usage_error(argv, capsys):
+    """Verifies that argparse reports unknown options of a command instead of crashing."""
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(argv)
+
+    assert exit_info.value.code == 2
+    assert "unrecognized arguments" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("command", [["scan", "."], ["stats"]])
+def test_sarif_aggregates_are_a_usage_error(command, capsys):
+    """Verifies that scan and stats reject the sarif format before anything is linted."""
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(["--format", "sarif", *command])
+
+    assert exit_info.value.code == 2
+    assert "does not support --format sarif" in capsys.readouterr().err
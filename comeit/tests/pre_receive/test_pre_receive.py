@@ -0,0 +1,105 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import comeit
+import pytest
+from comeit import Linter
+from comeit.__main__ import CONVENTIONAL_TYPES, lint_pre_receive
+from comeit.output import PlainReport
+from comeit.pre_receive import RefUpdate, iter_pushed_commits, parse_ref_updates, pushed_revisions
+
+NULL_SHA = "0" * 40
+
+
+@pytest.fixture
+def base(repo, commit):
+    return commit(repo, "feat: base")
+
+
+def test_parse_ref_updates():
+    """Verifies that the lines git passes to the hook are parsed, and bad lines rejected."""
+    updates = parse_ref_updates([f"{NULL_SHA} {'a' * 40} refs/heads/main\n", "\n"])
+
+    assert updates == [RefUpdate(NULL_SHA, "a" * 40, "refs/heads/main")]
+    with pytest.raises(ValueError, match="Expected"):
+        parse_ref_updates(["not a ref update\n"])
+
+
+def test_pushed_revisions_skip_deletions_and_duplicates():
+    """Verifies that deleted refs are ignored and shared revisions are listed once."""
+    old, new = "a" * 40, "b" * 40
+    updates = [
+        RefUpdate(old, new, "refs/heads/main"),
+        RefUpdate(NULL_SHA, new, "refs/tags/v1"),
+        RefUpdate(old, NULL_SHA, "refs/heads/gone"),
+    ]
+
+    assert pushed_revisions(updates) == [new, f"^{old}"]
+
+
+def test_iter_pushed_commits_reads_new_commits_once(repo, base, git, commit):
+    """Verifies that only commits not reachable from existing refs are read, once each."""
+    git(repo, "checkout", "-q", "-b", "topic")
+    first = commit(repo, "fix: first")
+    second = commit(repo, "fix: second")
+    # Nothing but main exists on the server yet, as if topic and the tag were being pushed
+    git(repo, "checkout", "-q", "main")
+    git(repo, "branch", "-q", "-D", "topic")
+    updates = [
+        RefUpdate(NULL_SHA, second, "refs/heads/topic"),
+        RefUpdate(NULL_SHA, first, "refs/tags/v1"),
+        RefUpdate(base, base, "refs/heads/main"),
+    ]
+
+    commits = list(iter_pushed_commits(updates, cwd=repo))
+
+    assert [commit.sha for commit in commits] == [second, first]
+    assert list(iter_pushed_commits([RefUpdate(base, NULL_SHA, "refs/heads/x")], cwd=repo)) == []
+
+
+def test_lint_pre_receive_rejects_too_many_commits(repo, base, git, commit, monkeypatch):
+    """Verifies that a push over the commit limit is rejected without reading all of it."""
+    new = [commit(repo, f"fix: change {i}") for i in range(3)]
+    git(repo, "update-ref", "refs/heads/main", base)
+    monkeypatch.chdir(repo)
+    linter = Linter(types=CONVENTIONAL_TYPES, max_header_length=52)
+    stream = io.StringIO()
+
+    def lint(max_commits):
+        return lint_pre_receive(
+            linter,
+            PlainReport(linter.rules, stream),
+            [f"{base} {new[-1]} refs/heads/main\n"],
+            max_commits=max_commits,
+        )
+
+    assert lint(max_commits=3) == 0
+    assert lint(max_commits=2) == 1
+    assert stream.getvalue().splitlines()[-1] == "Checked 2 commits, 1 failed."
+
+
+def test_pre_receive_hook_rejects_bad_push(tmp_path, git, commit, init_repo):
+    """Verifies that the hook accepts a conventional push and rejects one with a bad message."""
+    server = tmp_path / "server.git"
+    git(tmp_path, "init", "-q", "--bare", str(server))
+    hook = server / "hooks" / "pre-receive"
+    hook.write_text(
+        f"#!/bin/sh\nexec {sys.executable} -m comeit --format plain pre-receive --max-commits 100\n"
+    )
+    hook.chmod(0o755)
+    env = {"PYTHONPATH": str(Path(comeit.__file__).parents[1])}
+
+    client = init_repo(tmp_path / "client")
+    git(client, "remote", "add", "origin", str(server))
+    commit(client, "feat: add the first feature")
+    git(client, "push", "-q", "origin", "main", env=env)
+
+    commit(client, "Added stuff")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        git(client, "push", "-q", "origin", "main", env=env)
+
+    assert "Added stuff" in error.value.stderr
+    assert "Checked 1 commits, 1 failed." in error.value.stderr
+    assert git(server, "log", "--format=%s", "main") == "feat: add the first feature"
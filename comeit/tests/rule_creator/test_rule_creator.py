@@ -32,7 +32,7 @@ def test_rule_creator():
         ),
     ]
 
-    header = Header(types=["feat", "fix"], max_length=52, commit_msg="")
+    header = Header(types=["feat", "fix"], max_length=52)
     body = Body()
     footer = Footer()
 
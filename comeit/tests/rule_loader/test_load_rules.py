@@ -1,6 +1,8 @@
 from pathlib import Path
 
+import pytest
 from comeit import RuleConfig, RuleLoader, Severity
+from comeit.rules import rule_loader as rule_loader_module
 
 def test_load_rules_from_yml_file():
     """Verifies that rules can be loaded from the rules yaml file."""
@@ -29,3 +31,30 @@ def test_load_rules_from_yml_file():
     ]
 
     assert rules == expected_list
+
+
+def test_default_rules_are_precompiled(tmp_path, monkeypatch):
+    """Verifies that the default rules are only parsed from yaml on first use."""
+    first = RuleLoader(cache_dir=tmp_path).load_rules()
+    assert len(list(tmp_path.glob("default_rules-*.marshal"))) == 1
+
+    monkeypatch.setattr(rule_loader_module, "_parse_yaml", pytest.fail)
+    second = RuleLoader(cache_dir=tmp_path).load_rules()
+
+    assert second == first
+
+
+def test_changed_default_rules_are_compiled_again(tmp_path):
+    """Verifies that changing the yaml file compiles it again and removes the stale file."""
+    rules_yml = tmp_path / "rules.yml"
+    rules_yml.write_bytes((Path(__file__).parent / "rules.yml").read_bytes())
+    cache_dir = tmp_path / "cache"
+
+    rule_loader = RuleLoader(cache_dir=cache_dir)
+    rule_loader._DEFAULT_RULES_YML = rules_yml
+    assert rule_loader.load_rules()[1].severity == Severity.WARNING
+
+    rules_yml.write_text(rules_yml.read_text().replace("WARNING", "ERROR"))
+
+    assert rule_loader.load_rules()[1].severity == Severity.ERROR
+    assert len(list(cache_dir.glob("default_rules-*.marshal"))) == 1
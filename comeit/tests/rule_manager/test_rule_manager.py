@@ -0,0 +1,364 @@
+import pickle
+import threading
+
+import pytest
+from comeit import (
+    Component,
+    DependencyPolicy,
+    Rule,
+    RuleManager,
+    RuleProfile,
+    RuleResult,
+    Severity,
+)
+from comeit.rules.rule_manager import decode_results, encode_results
+
+
+def _rule(id, check, severity=Severity.ERROR, dependencies=None):
+    return Rule(
+        id=id,
+        description=f"Rule {id}",
+        check=check,
+        component=Component.HEADER,
+        severity=severity,
+        dependencies=dependencies,
+    )
+
+
+def _passes(header):
+    return True, ""
+
+
+def _fails(header):
+    return False, f"'{header}' is wrong."
+
+
+def test_apply_rules_in_dependency_order():
+    """Verifies that rules run after their dependencies and are passed the header."""
+    calls = []
+
+    def record(id):
+        def check(header):
+            calls.append((id, header))
+            return True, ""
+
+        return check
+
+    rules = {
+        "02": _rule("02", record("02"), dependencies=["01"]),
+        "01": _rule("01", record("01")),
+    }
+
+    results = RuleManager(rules).apply_rules(("feat: x", None, None))
+
+    assert calls == [("01", "feat: x"), ("02", "feat: x")]
+    assert results == {"01": RuleResult.SUCCESS, "02": RuleResult.SUCCESS}
+
+
+def test_apply_rules_ignores_dependents_of_ignored_rules():
+    """Verifies that a rule depending on an ignored rule is ignored as well."""
+    rules = {
+        "01": _rule("01", _passes, severity=Severity.IGNORE),
+        "02": _rule("02", _fails, dependencies=["01"]),
+        "03": _rule("03", _fails),
+    }
+
+    results = RuleManager(rules).apply_rules(("feat: x", None, None))
+
+    assert results == {
+        "01": RuleResult.IGNORED,
+        "02": RuleResult.IGNORED,
+        "03": RuleResult.FAILED,
+    }
+    assert results.messages == {"03": "'feat: x' is wrong."}
+
+
+def test_execution_plan_is_built_once(monkeypatch):
+    """Verifies that the rule order is computed at construction, not for every message."""
+    rule_manager = RuleManager({"01": _rule("01", _passes), "02": _rule("02", _fails, ["01"])})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The rule graph was rebuilt.")
+
+    monkeypatch.setattr(rule_manager, "_validate_and_build_graph", fail)
+    monkeypatch.setattr(rule_manager, "_topological_sort", fail)
+
+    for header in ["feat: a", "fix: b"]:
+        results = rule_manager.apply_rules((header, None, None))
+        assert results == {"01": RuleResult.SUCCESS, "02": RuleResult.FAILED}
+
+
+@pytest.mark.parametrize(
+    "rules, error",
+    [
+        ({"01": _rule("01", _passes, dependencies=["02"])}, "non-existent rule 02"),
+        (
+            {
+                "01": _rule("01", _passes, dependencies=["02"]),
+                "02": _rule("02", _passes, dependencies=["01"]),
+            },
+            "Circular dependency",
+        ),
+    ],
+)
+def test_invalid_dependencies_fail_at_construction(rules, error):
+    """Verifies that invalid dependencies are rejected when the manager is created."""
+    with pytest.raises(ValueError, match=error):
+        RuleManager(rules)
+
+
+def test_apply_rules_many_matches_apply_rules():
+    """Verifies that a batch gives the same results as applying the rules to each message."""
+    batch_calls = []
+
+    def fails_many(headers):
+        batch_calls.append(list(headers))
+        return [False] * len(headers)
+
+    rules = {
+        "01": _rule("01", _passes, severity=Severity.IGNORE),
+        "02": _rule("02", _fails, dependencies=["01"]),
+        "03": Rule(
+            id="03",
+            description="Rule 03",
+            check=_fails,
+            component=Component.HEADER,
+            check_many=fails_many,
+        ),
+        "04": _rule("04", lambda header: (header.startswith("feat"), "Not a feature.")),
+    }
+    commit_msgs = [("feat: x", None, None), ("fix: y", None, None)]
+    rule_manager = RuleManager(rules)
+
+    batch = rule_manager.apply_rules_many(commit_msgs)
+
+    assert batch_calls == [["feat: x", "fix: y"]]
+    assert batch == [
+        rule_manager.apply_rules(commit_msg) for commit_msg in commit_msgs
+    ]
+    assert [results.messages for results in batch] == [
+        {"03": "'feat: x' is wrong."},
+        {"03": "'fix: y' is wrong.", "04": "Not a feature."},
+    ]
+
+
+def test_apply_rules_records_profile():
+    """Verifies that a profile counts the calls and results of each rule, single and batched."""
+    rules = {
+        "01": _rule("01", _passes, severity=Severity.IGNORE),
+        "02": _rule("02", _fails, dependencies=["01"]),
+        "03": _rule("03", _fails),
+        "04": _rule("04", _passes),
+    }
+    profile = RuleProfile()
+    rule_manager = RuleManager(rules, profile=profile)
+
+    results = rule_manager.apply_rules(("feat: x", None, None))
+    batch = rule_manager.apply_rules_many([("feat: y", None, None), ("fix: z", None, None)])
+
+    assert results == RuleManager(rules).apply_rules(("feat: x", None, None))
+    assert batch[1].messages == {"03": "'fix: z' is wrong."}
+    stats = profile.stats
+    assert (stats["01"].ignored, stats["02"].ignored, stats["02"].calls) == (3, 3, 0)
+    assert (stats["03"].calls, stats["03"].failed, stats["04"].passed) == (3, 3, 3)
+    assert stats["03"].total_time >= stats["03"].max_time > 0
+
+
+def test_apply_rules_without_profile_is_not_instrumented():
+    """Verifies that rules are applied by the plain loops when profiling is disabled."""
+    rule_manager = RuleManager({"01": _rule("01", _passes)})
+
+    assert rule_manager.profile is None
+    assert "apply_rules" not in vars(rule_manager)
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        (
+            DependencyPolicy.SKIP,
+            {
+                "01": RuleResult.FAILED,
+                "02": RuleResult.SKIPPED,
+                "03": RuleResult.SKIPPED,
+                "04": RuleResult.IGNORED,
+            },
+        ),
+        (
+            DependencyPolicy.RUN,
+            {
+                "01": RuleResult.FAILED,
+                "02": RuleResult.FAILED,
+                "03": RuleResult.SUCCESS,
+                "04": RuleResult.IGNORED,
+            },
+        ),
+    ],
+)
+def test_apply_rules_dependency_policy(policy, expected):
+    """Verifies that dependents of a failed rule are skipped, transitively, unless run is chosen."""
+    calls = []
+
+    def record(check):
+        def recorded(header):
+            calls.append(check.__name__)
+            return check(header)
+
+        recorded.__name__ = check.__name__
+        return recorded
+
+    rules = {
+        "01": _rule("01", _fails),
+        "02": _rule("02", record(_fails), dependencies=["01"]),
+        "03": _rule("03", record(_passes), dependencies=["02"]),
+        "04": _rule("04", _passes, severity=Severity.IGNORE, dependencies=["01"]),
+    }
+    rule_manager = RuleManager(rules, dependency_policy=policy)
+
+    results = rule_manager.apply_rules(("feat: x", None, None))
+    [batch_results] = rule_manager.apply_rules_many([("feat: x", None, None)])
+
+    assert results == expected
+    assert batch_results == expected
+    assert set(batch_results.messages) == {rule_id for rule_id, r in expected.items() if r.is_failed()}
+    assert len(calls) == (0 if policy == DependencyPolicy.SKIP else 4)
+
+
+def test_apply_rules_with_multiple_dependencies():
+    """Verifies that a rule runs after all its dependencies and is blocked by any of them."""
+    calls = []
+
+    def record(id, check):
+        def recorded(header):
+            calls.append(id)
+            return check(header)
+
+        return recorded
+
+    rules = {
+        "04": _rule("04", record("04", _passes), dependencies=["02", "03"]),
+        "05": _rule("05", record("05", _passes), dependencies=["01", "03"]),
+        "06": _rule("06", record("06", _passes), dependencies=["01", "02"]),
+        "03": _rule("03", record("03", _fails), dependencies=["01"]),
+        "02": _rule("02", record("02", _passes), severity=Severity.IGNORE),
+        "01": _rule("01", record("01", _passes)),
+    }
+    rule_manager = RuleManager(rules)
+
+    results = rule_manager.apply_rules(("feat: x", None, None))
+    assert calls == ["01", "03"]
+    [batch_results] = rule_manager.apply_rules_many([("feat: x", None, None)])
+
+    assert results == batch_results
+    assert results == {
+        "01": RuleResult.SUCCESS,
+        "02": RuleResult.IGNORED,
+        "03": RuleResult.FAILED,
+        "04": RuleResult.IGNORED,
+        "05": RuleResult.SKIPPED,
+        "06": RuleResult.IGNORED,
+    }
+    assert list(results).index("01") < list(results).index("03") < list(results).index("05")
+
+
+def test_circular_dependency_across_several_rules():
+    """Verifies that a cycle through a rule with several dependencies is rejected."""
+    rules = {
+        "01": _rule("01", _passes),
+        "02": _rule("02", _passes, dependencies=["01", "03"]),
+        "03": _rule("03", _passes, dependencies=["02"]),
+    }
+
+    with pytest.raises(ValueError, match="Circular dependency"):
+        RuleManager(rules)
+
+
+def test_apply_rules_with_threads_runs_each_level_concurrently():
+    """Verifies that rules of the same level run at once and give the single thread results."""
+    # Each check of the first level waits for the other, so they only pass if run concurrently
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wait(header):
+        barrier.wait()
+        return True, ""
+
+    def wait_many(headers):
+        barrier.wait()
+        return [True] * len(headers)
+
+    rules = {
+        "01": Rule("01", "Rule 01", wait, Component.HEADER, check_many=wait_many),
+        "02": Rule("02", "Rule 02", wait, Component.HEADER, check_many=wait_many),
+        "03": _rule("03", _fails, dependencies=["01"]),
+        "04": _rule("04", _passes, dependencies=["02", "03"]),
+        "05": _rule("05", _passes, severity=Severity.IGNORE),
+    }
+    commit_msgs = [("feat: x", None, None), ("fix: y", None, None)]
+    rule_manager = RuleManager(rules, threads=2)
+    try:
+        results = rule_manager.apply_rules(commit_msgs[0])
+        batch = rule_manager.apply_rules_many(commit_msgs)
+    finally:
+        rule_manager.close()
+
+    assert list(results.items()) == [
+        ("01", RuleResult.SUCCESS),
+        ("02", RuleResult.SUCCESS),
+        ("05", RuleResult.IGNORED),
+        ("03", RuleResult.FAILED),
+        ("04", RuleResult.SKIPPED),
+    ]
+    assert [list(results.items()) for results in batch] == [list(results.items())] * 2
+    assert [results.messages for results in batch] == [
+        {"03": "'feat: x' is wrong."},
+        {"03": "'fix: y' is wrong."},
+    ]
+
+
+def test_rules_are_immutable():
+    """Verifies that a rule cannot be changed or given new attributes once created."""
+    rule = _rule("01", _passes, dependencies=["02"])
+
+    with pytest.raises(AttributeError):
+        rule.severity = Severity.IGNORE
+    with pytest.raises(AttributeError):
+        rule.message = "Not stored on the rule."
+    assert rule.dependencies == ("02",)
+    assert not hasattr(rule, "__dict__")
+    assert pickle.loads(pickle.dumps(rule)) == rule
+
+
+def test_results_store_one_byte_per_rule():
+    """Verifies that the results read like a dict while storing a byte per rule."""
+    rules = {
+        "01": _rule("01", _passes),
+        "02": _rule("02", _fails, dependencies=["01"]),
+        "03": _rule("03", _passes, dependencies=["02"]),
+    }
+    rule_manager = RuleManager(rules)
+
+    first = rule_manager.apply_rules(("feat: x", None, None))
+    second = rule_manager.apply_rules(("fix: y", None, None))
+
+    assert dict(first) == {
+        "01": RuleResult.SUCCESS,
+        "02": RuleResult.FAILED,
+        "03": RuleResult.SKIPPED,
+    }
+    assert first["02"].is_failed()
+    assert "04" not in first
+    assert first.get("04") is None
+    assert len(first._codes) == 3
+    assert first._positions is second._positions
+    assert second.messages == {"02": "'fix: y' is wrong."}
+
+    copy = pickle.loads(pickle.dumps(first))
+    assert copy == first
+    assert copy.messages == first.messages
+
+    rule_ids, codes = encode_results([first, second])
+    assert codes == first._codes + second._codes
+    assert decode_results(rule_ids, codes, [first.messages, second.messages]) == [first, second]
+    other = RuleManager({"01": _rule("01", _passes)}).apply_rules(("feat: x", None, None))
+    with pytest.raises(ValueError, match="same rules"):
+        encode_results([first, other])
@@ -0,0 +1,71 @@
+import pytest
+from comeit.__main__ import CONVENTIONAL_TYPES
+from comeit.scan import find_repositories, scan_repositories
+
+LINTER_KWARGS = dict(types=CONVENTIONAL_TYPES, max_header_length=52)
+
+
+@pytest.fixture
+def fleet(tmp_path, init_repo):
+    changes = [f"feat: change {index}" for index in range(6)]
+    init_repo(tmp_path / "big", *changes, "Not conventional")
+    init_repo(tmp_path / "team" / "small", "fix: a bug")
+    configured = init_repo(tmp_path / "team" / "configured", "No type at all")
+    # Ignoring the failed rule makes its dependents ignored too
+    (configured / "comeit_config.yml").write_text('"02": IGNORE\n')
+    init_repo(tmp_path / ".hidden" / "skipped", "fix: never scanned")
+    return tmp_path
+
+
+def test_find_repositories(fleet):
+    """Verifies that repositories are found in directories and list files, once each."""
+    listing = fleet / "repos.txt"
+    listing.write_text("# The small one\nteam/small\n\n")
+
+    repos = find_repositories([fleet, listing])
+
+    assert repos == [fleet / "big", fleet / "team" / "configured", fleet / "team" / "small"]
+    assert find_repositories([fleet / "big"]) == [fleet / "big"]
+    with pytest.raises(FileNotFoundError):
+        find_repositories([fleet / "missing"])
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_scan_repositories_counts_per_repo_and_rule(fleet, jobs):
+    """Verifies the counts of each repository, linted with its own rules file."""
+    repos = find_repositories([fleet])
+
+    scans = {
+        scan.path.name: scan
+        for scan in scan_repositories(repos, LINTER_KWARGS, jobs=jobs, batch_size=2)
+    }
+
+    assert {name: (scan.stats.checked, scan.stats.failed) for name, scan in scans.items()} == {
+        "big": (7, 1),
+        "small": (1, 0),
+        "configured": (1, 0),
+    }
+    assert scans["big"].stats.rule_failures == {"02": 1}
+    assert scans["configured"].config == fleet / "team" / "configured" / "comeit_config.yml"
+    assert scans["small"].config is None
+
+
+def test_large_repository_does_not_hold_up_small_ones(fleet):
+    """Verifies that the repositories take turns batch by batch, so small ones finish first."""
+    repos = [fleet / "big", fleet / "team" / "small"]
+
+    scans = scan_repositories(repos, LINTER_KWARGS, jobs=1, batch_size=1)
+
+    assert [scan.path.name for scan in scans] == ["small", "big"]
+
+
+def test_broken_repository_does_not_stop_the_scan(fleet):
+    """Verifies that a repository with an invalid rules file is reported and skipped."""
+    (fleet / "big" / "comeit_config.yml").write_text('"02": NOT_A_SEVERITY\n')
+    repos = [fleet / "big", fleet / "team" / "small"]
+
+    scans = {scan.path.name: scan for scan in scan_repositories(repos, LINTER_KWARGS, jobs=2)}
+
+    assert "NOT_A_SEVERITY" in scans["big"].error
+    assert scans["small"].error is None
+    assert scans["small"].stats.checked == 1
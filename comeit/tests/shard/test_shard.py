@@ -0,0 +1,100 @@
+import gzip
+import io
+
+import pytest
+from comeit import Linter
+from comeit.__main__ import CONVENTIONAL_TYPES, lint_history, lint_merge
+from comeit.output import create_report
+from comeit.shard import MergedShards, PartialError, Shard
+
+SHARDS = 3
+
+
+@pytest.fixture
+def repo(tmp_path, init_repo, monkeypatch):
+    messages = [
+        "Not conventional" if index % 4 == 0 else f"feat: change {index}" for index in range(30)
+    ]
+    repo = init_repo(tmp_path / "repo", *messages, "")
+    monkeypatch.chdir(repo)
+    return repo
+
+
+@pytest.fixture
+def linter():
+    return Linter(types=CONVENTIONAL_TYPES, max_header_length=52)
+
+
+def _lint(linter, format, **kwargs) -> tuple[int, str]:
+    stream = io.StringIO()
+    exit_code = lint_history(
+        linter, create_report(format, linter.rules, stream), [], all_refs=True, **kwargs
+    )
+    return exit_code, stream.getvalue()
+
+
+def _shards(linter, tmp_path, format="jsonl", **kwargs):
+    partials = []
+    for index in range(1, SHARDS + 1):
+        partials.append(tmp_path / f"shard{index}.gz")
+        _lint(linter, format, shard=(index, SHARDS), partial=partials[-1], **kwargs)
+    return partials
+
+
+def _merge(linter, partials, format="jsonl") -> tuple[int, str]:
+    stream = io.StringIO()
+    report = create_report(format, linter.rules, stream)
+    exit_code = lint_merge(report, partials, linter.fingerprint)
+    return exit_code, stream.getvalue()
+
+
+def test_shards_partition_the_history():
+    """Verifies that every commit belongs to exactly one shard."""
+    shas = [f"{index:040x}" for index in range(0, 2**32, 2**32 // 997)]
+
+    for sha in shas:
+        assert sum(Shard(index, 4).contains(sha) for index in range(1, 5)) == 1
+
+
+@pytest.mark.parametrize("format", ["plain", "jsonl", "sarif"])
+def test_merged_shards_match_an_unsharded_run(repo, tmp_path, linter, format):
+    """Verifies that merging the shards gives the report and exit code of a single run."""
+    partials = _shards(linter, tmp_path, format)
+
+    # Given in any order
+    assert _merge(linter, partials[::-1], format) == _lint(linter, format)
+
+
+def test_parallel_shards_keep_the_positions(repo, tmp_path, linter):
+    """Verifies that the positions stay with their commits when the shard is linted in batches."""
+    linter_kwargs = dict(types=CONVENTIONAL_TYPES, max_header_length=52)
+    partials = _shards(linter, tmp_path, jobs=2, linter_kwargs=linter_kwargs)
+
+    assert _merge(linter, partials) == _lint(linter, "jsonl")
+
+
+def test_merge_rejects_incomplete_runs(repo, tmp_path, linter):
+    """Verifies that missing, duplicated and truncated shards are not merged silently."""
+    partials = _shards(linter, tmp_path)
+
+    with pytest.raises(PartialError, match=r"Missing: \[3\], duplicated: \[2\]"):
+        MergedShards([partials[0], partials[1], partials[1]], linter.fingerprint)
+
+    other_rules = Linter(types=CONVENTIONAL_TYPES, max_header_length=72)
+    with pytest.raises(PartialError, match="other rules"):
+        MergedShards(partials, other_rules.fingerprint)
+
+    # A shard whose runner stopped before writing its totals
+    with gzip.open(partials[2], "rt") as file:
+        lines = file.readlines()
+    with gzip.open(partials[2], "wt") as file:
+        file.writelines(lines[:-1])
+    assert _merge(linter, partials)[0] == 1
+
+
+def test_unwritable_partial_is_an_error(repo, tmp_path, linter, caplog):
+    """Verifies that a partial file that cannot be created fails the run without a traceback."""
+    partial = tmp_path / "missing" / "shard1.gz"
+
+    assert _lint(linter, "jsonl", shard=(1, SHARDS), partial=partial) == (1, "")
+    assert "Cannot write the partial results" in caplog.text
@@ -0,0 +1,95 @@
+import io
+import json
+import random
+from collections import Counter
+
+import pytest
+from comeit import Linter
+from comeit.__main__ import CONVENTIONAL_TYPES, lint_stats
+from comeit.git import GitCommit
+from comeit.output import create_report
+from comeit.stats import NO_TYPE, HistoryStats, SpaceSaving
+
+# 2024-01-15 and 2024-02-15 in UTC
+JANUARY = 1705320000
+FEBRUARY = 1707998400
+
+
+def test_space_saving_is_exact_below_its_size():
+    """Verifies that the counts are exact while every item has its own counter."""
+    sketch = SpaceSaving(size=3)
+    for item in "abacab":
+        sketch.add(item)
+
+    assert sketch.top(2) == [("a", 3, 0), ("b", 2, 0)]
+    assert len(sketch) == 3
+
+
+def test_space_saving_keeps_frequent_items_in_bounded_memory():
+    """Verifies the guarantees of the sketch on a skewed stream of many more items than counters."""
+    rng = random.Random(0)
+    stream = [f"rare{rng.randrange(5000)}" for _ in range(10_000)]
+    stream += ["hot"] * 3000 + ["warm"] * 1500
+    rng.shuffle(stream)
+    size = 20
+    sketch = SpaceSaving(size=size)
+    for item in stream:
+        sketch.add(item)
+
+    exact = Counter(stream)
+    assert len(sketch) == size
+    assert [item for item, _, _ in sketch.top(2)] == ["hot", "warm"]
+    for item, count, error in sketch.top(size):
+        # Never underestimated, and overestimated by at most the reported error
+        assert exact[item] <= count <= exact[item] + error
+        assert error <= len(stream) // size
+
+
+def test_history_stats_aggregates_failures():
+    """Verifies the counts per rule, month, author and type of failed commits."""
+    linter = Linter(types=CONVENTIONAL_TYPES, max_header_length=52)
+    commits = [
+        GitCommit("a" * 40, "feat: a feature", "Ada <ada@example.com>", JANUARY),
+        GitCommit("b" * 40, "No type", "Ada <ada@example.com>", JANUARY),
+        GitCommit("c" * 40, f"docs: {'x' * 60}", "Bob <bob@example.com>", FEBRUARY),
+        GitCommit("d" * 40, "", "Bob <bob@example.com>", FEBRUARY),
+    ]
+    stats = HistoryStats()
+    for commit, outcome in zip(commits, linter.lint_batch([c.message for c in commits])):
+        stats.record(commit, outcome)
+
+    assert (stats.checked, stats.failed) == (4, 3)
+    assert stats.months == {"2024-01": [2, 1], "2024-02": [2, 2]}
+    assert stats.rule_failures == {"02": 1, "01": 1}
+    assert {item: count for item, count, _ in stats.authors.top(10)} == {
+        "Ada <ada@example.com>": 1,
+        "Bob <bob@example.com>": 2,
+    }
+    assert {item for item, _, _ in stats.types.top(10)} == {"docs", NO_TYPE}
+
+
+@pytest.mark.parametrize("reader", ["git", "python"])
+def test_lint_stats_reports_the_history(repo, commit, monkeypatch, reader):
+    """Verifies that the stats command reads the details of the history and reports aggregates."""
+    for message, date in [("feat: one", JANUARY), ("Not conventional", FEBRUARY)]:
+        commit(repo, message, date=f"{date} +0000")
+    monkeypatch.chdir(repo)
+    linter = Linter(types=CONVENTIONAL_TYPES, max_header_length=52)
+    stream = io.StringIO()
+
+    exit_code = lint_stats(
+        linter, create_report("jsonl", linter.rules, stream), [], False, top=5, reader=reader
+    )
+
+    record = json.loads(stream.getvalue())
+    assert exit_code == 1
+    assert record["type"] == "stats"
+    assert (record["checked"], record["failed"]) == (2, 1)
+    assert record["months"] == {
+        "2024-01": {"checked": 1, "failed": 0},
+        "2024-02": {"checked": 1, "failed": 1},
+    }
+    assert record["authors"] == [
+        {"name": "comeit <comeit@example.com>", "failed": 1, "overestimate": 0}
+    ]
+    assert record["types"] == [{"name": NO_TYPE, "failed": 1, "overestimate": 0}]
@@ -290,3 +290,59 @@ This feature allows users to do things.BREAKING CHANGE: Changes the API."""
     assert summary == commit_msg.partition("\n")[0]
     assert body == "\nThis feature allows users to do things.BREAKING CHANGE: Changes the API."
     assert footer is None
+
+
+def test_parsed_commit_spans():
+    """Test that the parsed parts are spans into the original message.
+
+    This test verifies that the offsets of the summary, body and footer slice
+    exactly the parsed strings out of the original commit message.
+    """
+    commit_msg = """feat(core): add new feature
+
+This feature allows users to do amazing things.
+
+BREAKING CHANGE: This will change the API."""
+    parsed = parse_commit_message(commit_msg)
+
+    for span, part in [
+        (parsed.summary_span, parsed.summary),
+        (parsed.body_span, parsed.body),
+        (parsed.footer_span, parsed.footer),
+    ]:
+        assert commit_msg[span[0] : span[1]] == part
+    assert parsed.message is commit_msg
+    assert parsed == (parsed.summary, parsed.body, parsed.footer)
+
+
+def test_summary_only_has_no_body_or_footer_span():
+    """Test that a summary-only commit message has no body or footer spans."""
+    parsed = parse_commit_message("feat(core): add new feature")
+
+    assert parsed.summary_span == (0, 27)
+    assert parsed.body_span is None
+    assert parsed.footer_span is None
+    assert parsed.trailers == []
+
+
+def test_trailers():
+    """Test that each footer line is split into its token and value.
+
+    This test checks that both the ': ' and ' #' separators are recognized,
+    and that lines continuing a trailer are not treated as trailers themselves.
+    """
+    commit_msg = """fix(bug): fix issue with feature
+
+BREAKING CHANGE: The API changes.
+  This line continues the breaking change.
+Refs #123
+Signed-off-by: John Doe"""
+    parsed = parse_commit_message(commit_msg)
+
+    assert parsed.trailers == [
+        ("BREAKING CHANGE", "The API changes."),
+        ("Refs", "123"),
+        ("Signed-off-by", "John Doe"),
+    ]
+    (token_start, token_end), _ = parsed.trailer_spans[1]
+    assert commit_msg[token_start:token_end] == "Refs"
@@ -0,0 +1,75 @@
+"""Cold start budgets, measured with `python -X importtime` in a fresh interpreter."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import comeit
+import pytest
+
+# Cumulative import time budgets in microseconds. They are generous to stay stable on slow CI
+# runners, but still an order of magnitude below importing rich or yaml.
+CLIENT_IMPORT_BUDGET_US = 50_000
+PACKAGE_IMPORT_BUDGET_US = 30_000
+
+
+def _import_times(args, cwd=None, env=None) -> dict[str, int]:
+    """Run python with -X importtime and return the cumulative import time of each module."""
+    # Make the package importable from any working directory, even when it is not installed
+    env = dict(os.environ, **(env or {}), PYTHONPATH=str(Path(comeit.__file__).parents[1]))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.removeprefix("import time:").split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_package_import_is_lazy():
+    """Verifies that importing the package does not load the rule machinery or dependencies."""
+    times = _import_times(["-c", "import comeit"])
+
+    assert not [name for name in times if name.startswith(("rich", "yaml", "comeit."))]
+    assert times["comeit"] < PACKAGE_IMPORT_BUDGET_US
+
+
+def test_client_import_budget():
+    """Verifies that the daemon client only needs a few standard library modules."""
+    times = _import_times(["-c", "import comeit.client"])
+
+    assert not [name for name in times if name.startswith(("rich", "yaml", "comeit.rules"))]
+    assert times["comeit.client"] < CLIENT_IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize("args", [["--help"], ["--format", "plain", "--range", "HEAD"]])
+def test_plain_cli_does_not_import_rich(tmp_path, init_repo, args):
+    """Verifies that rich is never imported unless the rich output format is used."""
+    repo = init_repo(tmp_path, "feat: first")
+
+    times = _import_times(["-m", "comeit", *args], cwd=repo)
+
+    assert "comeit.parse_args" in times
+    assert not [name for name in times if name.startswith("rich")]
+
+
+def test_precompiled_rules_skip_yaml(tmp_path, init_repo):
+    """Verifies that yaml is not imported once the default rules are precompiled."""
+    repo = init_repo(tmp_path / "repo", "feat: first")
+    args = ["-m", "comeit", "--format", "plain", "--range", "HEAD"]
+    env = {"XDG_CACHE_HOME": str(tmp_path / "cache")}
+
+    first_run = _import_times(args, cwd=repo, env=env)
+    second_run = _import_times(args, cwd=repo, env=env)
+
+    assert "yaml" in first_run
+    assert "comeit.rules.rule_loader" in second_run
+    assert "yaml" not in second_run
@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import comeit
+from comeit import trace
+
+
+def test_span_records_nothing_when_disabled(tmp_path):
+    """Verifies that spans are no-ops until tracing is enabled."""
+    with trace.span("parse_commit_message"):
+        pass
+
+    assert not trace.is_enabled()
+    trace.write(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert [event["ph"] for event in events] == ["M"]
+
+
+def test_cli_writes_chrome_trace(tmp_path):
+    """Verifies that --trace writes a span for each stage of linting a message."""
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(Path(comeit.__file__).parents[1]),
+        XDG_CACHE_HOME=str(tmp_path / "cache"),
+    )
+    subprocess.run(
+        [sys.executable, "-m", "comeit", "--format", "plain", "--trace", "trace.json"],
+        cwd=tmp_path,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert {"import", "load_rules", "create_rules", "parse_commit_message", "apply_rules"} <= set(
+        spans
+    )
+    assert all(event["dur"] >= 0 and event["ts"] >= 0 for event in spans.values())
+    main = spans["main"]
+    assert main["ts"] <= spans["apply_rules"]["ts"] <= main["ts"] + main["dur"]
@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from comeit import Linter
+from comeit.__main__ import CONVENTIONAL_TYPES, lint_incremental, run
+from comeit.output import PlainReport
+from comeit.parse_args import parse_args
+from comeit.watermark import WatermarkStore, default_watermark_path, unvalidated_revisions
+
+
+def test_store_round_trip(tmp_path):
+    """Verifies that watermarks are stored per branch."""
+    store = WatermarkStore(tmp_path / "comeit" / "watermarks.json")
+    assert store.get("main") is None
+
+    store.set("main", "a" * 40)
+    store.set("dev", "b" * 40)
+
+    assert WatermarkStore(tmp_path / "comeit" / "watermarks.json").get("main") == "a" * 40
+    assert store.get("dev") == "b" * 40
+
+
+def test_no_watermark_lints_everything(repo, commit):
+    """Verifies that the whole history is linted on the first run."""
+    head = commit(repo, "feat: first")
+    assert unvalidated_revisions(None, head, cwd=repo) == [head]
+
+
+def test_unchanged_head_lints_nothing(repo, commit):
+    """Verifies that nothing is linted when no commits were added."""
+    head = commit(repo, "feat: first")
+    assert unvalidated_revisions(head, head, cwd=repo) is None
+
+
+def test_new_commits_since_watermark(repo, commit):
+    """Verifies that only the commits after the watermark are linted."""
+    watermark = commit(repo, "feat: first")
+    head = commit(repo, "feat: second")
+    assert unvalidated_revisions(watermark, head, cwd=repo) == [f"{watermark}..{head}"]
+
+
+def test_rewritten_history_falls_back_to_merge_base(repo, git, commit):
+    """Verifies that commits after the merge base are linted after a rebase or force push."""
+    base = commit(repo, "feat: first")
+    watermark = commit(repo, "feat: second")
+    git(repo, "reset", "-q", "--hard", base)
+    head = commit(repo, "feat: amended second")
+
+    assert unvalidated_revisions(watermark, head, cwd=repo) == [f"{base}..{head}"]
+
+
+def test_missing_watermark_commit_lints_everything(repo, commit):
+    """Verifies that a watermark that is no longer in the repository is not trusted."""
+    head = commit(repo, "feat: first")
+    assert unvalidated_revisions("0" * 40, head, cwd=repo) == [head]
+
+
+@pytest.mark.parametrize("advance_on_failure", [True, False])
+def test_incremental_run_with_an_old_failure(repo, commit, monkeypatch, advance_on_failure):
+    """Verifies that an old failing commit is linted again only if the watermark is kept."""
+    commit(repo, "Not conventional")
+    head = commit(repo, "feat: second")
+    monkeypatch.chdir(repo)
+    linter = Linter(types=CONVENTIONAL_TYPES, max_header_length=52)
+
+    def lint():
+        stream = io.StringIO()
+        exit_code = lint_incremental(
+            linter, PlainReport(linter.rules, stream), advance_on_failure=advance_on_failure
+        )
+        return exit_code, stream.getvalue()
+
+    exit_code, output = lint()
+
+    assert exit_code == 1
+    assert output.endswith("Checked 2 commits, 1 failed.\n")
+    store = WatermarkStore(default_watermark_path(repo))
+    if advance_on_failure:
+        assert store.get("main") == head
+        assert lint() == (0, "Checked 0 commits, 0 failed.\n")
+    else:
+        assert store.get("main") is None
+        assert lint()[0] == 1
+
+
+def test_retried_run_fails_again_by_default(repo, commit, monkeypatch, capsys):
+    """Verifies that re-running a failed --incremental job fails again, as no commit passed."""
+    commit(repo, "feat: first")
+    commit(repo, "Not conventional")
+    monkeypatch.chdir(repo)
+    args = ["--incremental", "--format", "plain"]
+
+    assert run(parse_args(args)) == 1
+    assert run(parse_args(args)) == 1
+    assert capsys.readouterr().out.endswith("Checked 2 commits, 1 failed.\n")
+    assert WatermarkStore(default_watermark_path(repo)).get("main") is None
@@ -0,0 +1,97 @@
+"""Optional span tracing of the stages of a run, written as Chrome trace-event JSON.
+
+Tracing is disabled until `enable()` is called. Until then `span()` returns a shared no-op
+context manager, so instrumented code costs a function call per span and nothing is recorded.
+The trace file can be opened offline in https://ui.perfetto.dev or chrome://tracing.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from pathlib import Path
+
+# The recorded events while tracing is enabled, otherwise None
+_events: list[dict] | None = None
+_origin = 0.0
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("_name", "_category", "_args", "_start")
+
+    def __init__(self, name: str, category: str, args: dict):
+        self._name = name
+        self._category = category
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        add_span(self._name, self._start, time.perf_counter(), self._category, **self._args)
+
+
+def enable(origin: float | None = None):
+    """Start recording spans.
+
+    Args:
+        origin (float, optional): The `time.perf_counter()` value the timestamps of the trace
+            are relative to. Defaults to now.
+    """
+    global _events, _origin
+    _events = []
+    _origin = time.perf_counter() if origin is None else origin
+
+
+def is_enabled() -> bool:
+    return _events is not None
+
+
+def span(name: str, category: str = "comeit", **args):
+    """A context manager recording the time spent in its block as a span.
+
+    Args:
+        name (str): The name of the span, e.g. the stage of the run.
+        category (str): The category of the span. Defaults to "comeit".
+        **args: Details shown with the span, e.g. the number of messages.
+    """
+    if _events is None:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def add_span(name: str, start: float, end: float, category: str = "comeit", **args):
+    """Record a span that has already ended, from two `time.perf_counter()` values."""
+    if _events is None:
+        return
+    _events.append(
+        {
+            "name": name,
+            "cat": category,
+            "ph": "X",  # A complete event, with a start and a duration
+            "ts": (start - _origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "args": args,
+        }
+    )
+
+
+def write(path: Path):
+    """Write the recorded spans to a trace-event JSON file and stop recording."""
+    global _events
+    import json
+
+    events, _events = _events or [], None
+    process_name = {
+        "name": "process_name",
+        "ph": "M",  # Metadata naming the process in the viewer
+        "pid": os.getpid(),
+        "args": {"name": "comeit"},
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": [process_name, *events], "displayTimeUnit": "ms"}, file)
@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+from .git import commit_exists, git_dir, is_ancestor, merge_base
+
+logger = logging.getLogger(__name__)
+
+# Key used for the watermark when HEAD is detached, as is common on CI runners
+DETACHED_HEAD = "HEAD"
+
+
+def default_watermark_path(cwd: Path | None = None) -> Path:
+    """Return the location of the watermarks inside the git directory of the current repository."""
+    return git_dir(cwd) / "comeit" / "watermarks.json"
+
+
+class WatermarkStore:
+    """Remembers the last fully validated commit of each branch.
+
+    The watermarks are kept in a small JSON file mapping branch names to commit hashes.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+
+    def get(self, branch: str) -> str | None:
+        """Return the watermark of a branch, or None if the branch was never validated."""
+        return self._load().get(branch)
+
+    def set(self, branch: str, sha: str):
+        """Move the watermark of a branch to the given commit."""
+        watermarks = self._load()
+        watermarks[branch] = sha
+
+        # Write to a temporary file first, so a crash never leaves a truncated file behind
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(watermarks, indent=2, sort_keys=True))
+        os.replace(tmp_path, self._path)
+        logger.debug("Moved watermark of %s to %s", branch, sha)
+
+    def _load(self) -> dict[str, str]:
+        try:
+            return json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring corrupt watermarks file '{self._path}'. {e}")
+            return {}
+
+
+def unvalidated_revisions(
+    watermark: str | None, head: str, cwd: Path | None = None
+) -> list[str] | None:
+    """Return the revisions that still need to be linted to validate everything up to `head`.
+
+    Normally only the commits between the watermark and `head` are new. If the branch was force
+    pushed or rebased, the watermark is no longer an ancestor of `head`, and everything after the
+    merge base of the two is linted instead. Without a usable watermark the whole history is linted.
+
+    Args:
+        watermark (str, optional): The last fully validated commit, if any.
+        head (str): The commit to validate up to.
+        cwd (Path, optional): The repository. Defaults to the current directory.
+
+    Returns:
+        list[str] | None: The revisions to pass to `git log`, or None if there is nothing to lint.
+    """
+    if watermark == head:
+        return None
+
+    if watermark is None or not commit_exists(watermark, cwd=cwd):
+        logger.info("No usable watermark. Linting the whole history up to %s", head)
+        return [head]
+
+    if is_ancestor(watermark, head, cwd=cwd):
+        return [f"{watermark}..{head}"]
+
+    base = merge_base(watermark, head, cwd=cwd)
+    if base is None:
+        logger.info("Watermark %s shares no history with %s. Linting everything", watermark, head)
+        return [head]
+
+    logger.info("Watermark %s was rewritten. Linting from merge base %s", watermark, base)
+    return [f"{base}..{head}"] if base != head else None